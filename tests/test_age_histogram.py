@@ -0,0 +1,60 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'werewolves'))
+# The stand-in unless WEREWOLF_INTRAHOST asks for the DTK wheels; the engine loads it on import
+os.environ.setdefault("WEREWOLF_INTRAHOST", "standin")
+from werewolf import age_histogram
+from werewolf import werewolf_params
+from werewolf import engine
+
+
+class TestAgeHistogram(unittest.TestCase):
+    def test_crossings_and_moves(self):
+        histogram = age_histogram.AgeHistogram(band_years=1, band_count=3, days_year=10)
+        histogram.add("a", 8, today=1)
+        histogram.add("b", 15, today=1, weight=2.0)
+        self.assertEqual([1.0, 2.0, 0.0], histogram.snapshot()["humans"])
+        histogram.advance(3)
+        self.assertEqual([0.0, 3.0, 0.0], histogram.snapshot()["humans"])
+        histogram.move("b", "werewolves")
+        histogram.advance(6)
+        # b stopped aging when it turned, so its crossing is stale
+        self.assertEqual([0.0, 2.0, 0.0], histogram.snapshot()["werewolves"])
+        histogram.advance(13)
+        histogram.advance(23)
+        # The last band is open-ended
+        self.assertEqual([0.0, 0.0, 1.0], histogram.snapshot()["humans"])
+        self.assertEqual({}, histogram.calendar)
+        histogram.remove("a")
+        self.assertEqual(0.0, histogram.snapshot()["humans"][2])
+
+    def test_matches_a_full_recount(self):
+        engine.dgi.reset()
+        parameters = werewolf_params.WerewolfParameters(0.5, wolf_waiting_period=30, incubation="queue",
+                                                        enable_reporting=True, age_band_years=5, age_band_count=8,
+                                                        enable_vital_dynamics=True, annual_mortality_rate=0.01,
+                                                        daily_conception_probability=0.001)
+        demo = engine.WerewolfDemo(parameters=parameters, seed=2)
+        for x in range(500):
+            demo.create_person_callback(1.0, 5 * engine.DAYS_YEAR + 11 * x, x % 2)
+        demo.run(2 * engine.DAYS_YEAR)
+        waiting = set(demo.waiting_wolves)
+        compartments = [[h for h in demo.humans if h not in waiting], demo.waiting_wolves, list(demo.werewolves),
+                        demo.graves]
+        histogram = demo.age_histogram
+        recount = np.zeros_like(histogram.counts)
+        for c, agents in enumerate(compartments):
+            bands = engine.batch.get_ages(agents) // histogram.band_days
+            np.add.at(recount[:, c], np.minimum(bands, histogram.band_count - 1).astype(int), 1)
+        np.testing.assert_array_equal(recount, histogram.counts)
+        self.assertGreater(recount[:, 3].sum(), 0)
+        self.assertEqual(len(demo.report["timestep"]), len(demo.report["age_histogram"]["graves"]))
+        self.assertEqual(list(range(0, 40, 5)), demo.report["age_bands"])
+
+
+if __name__ == "__main__":
+    unittest.main()
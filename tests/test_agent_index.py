@@ -0,0 +1,64 @@
+import os
+import random
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'werewolves'))
+from werewolf import agent_index
+
+
+class TestAgentIndex(unittest.TestCase):
+    def test_agent_set_matches_a_set(self):
+        agents = agent_index.AgentSet(range(100))
+        expected = set(range(100))
+        shuffled = list(range(100))
+        random.Random(3).shuffle(shuffled)
+        for h in shuffled[:60]:
+            agents.remove(h)
+            expected.remove(h)
+            self.assertEqual(expected, set(agents))
+            self.assertEqual(len(expected), len(agents))
+        agents.discard(shuffled[0])
+        self.assertNotIn(shuffled[0], agents)
+        with self.assertRaises(KeyError):
+            agents.remove(shuffled[0])
+
+    def test_stands_in_for_a_list(self):
+        agents = agent_index.AgentSet()
+        agents.append(7)
+        agents.extend([3, 9])
+        self.assertEqual([7, 3, 9], agents[:])
+        self.assertEqual(9, agents[2])
+        np.testing.assert_array_equal([7, 3, 9], np.array(agents))
+        self.assertEqual(np.int64, np.asarray(agents, dtype=np.int64).dtype)
+
+    def test_choice_is_uniform(self):
+        agents = agent_index.AgentSet(range(4))
+        rng = np.random.default_rng(5)
+        draws = [agents.choice(rng) for x in range(4000)]
+        for h in range(4):
+            self.assertAlmostEqual(1000, draws.count(h), delta=150)
+        self.assertIn(random.choice(agents), range(4))
+
+    def test_stratified(self):
+        wolves = agent_index.StratifiedAgentSet(["civilian", "hunter"])
+        for h in range(10):
+            wolves.add(h, "hunter" if h < 3 else "civilian")
+        self.assertEqual(3, wolves.count("hunter"))
+        self.assertEqual(10, len(wolves))
+        self.assertEqual(set(range(10)), {wolves[i] for i in range(10)})
+        rng = np.random.default_rng(1)
+        self.assertIn(wolves.choice(rng, "hunter"), {0, 1, 2})
+        wolves.remove(1)
+        wolves.add(4, "hunter")
+        self.assertEqual(3, wolves.count("hunter"))
+        self.assertEqual(6, wolves.count("civilian"))
+        self.assertEqual("hunter", wolves.stratum_of[4])
+        with self.assertRaises(IndexError):
+            wolves[9]
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import json
+import os
+import sys
+import types
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'werewolves'))
+from werewolf import calibration
+from werewolf import intrahost
+from werewolf import werewolf_params
+
+GI_PARAMS = {
+    "Incubation_Period_Distribution": "GAUSSIAN_DISTRIBUTION",
+    "Incubation_Period_Gaussian_Mean": 30,
+    "Incubation_Period_Gaussian_Std_Dev": 5,
+    "Infectious_Period_Distribution": "CONSTANT_DISTRIBUTION",
+    "Infectious_Period_Constant": 10000
+}
+POPULATION = [(1.0, 20 * 365 + x, x % 2) for x in range(100)]
+BASE = werewolf_params.WerewolfParameters(feed_death_probability=0.5)
+
+
+class TestCalibration(unittest.TestCase):
+    def tearDown(self):
+        # simulate() reconfigures the intrahost module of this process
+        dgi = intrahost.load_intrahost()
+        if hasattr(dgi, "configure"):
+            dgi.configure()
+        dgi.reset()
+
+    def test_incubation_params(self):
+        self.assertEqual(12, calibration.incubation_params(GI_PARAMS, 12)["Incubation_Period_Gaussian_Mean"])
+        constant = calibration.incubation_params({}, 12)
+        self.assertEqual(("CONSTANT_DISTRIBUTION", 12), (constant["Incubation_Period_Distribution"],
+                                                         constant["Incubation_Period_Constant"]))
+
+    def test_dtk_configure_reuses_one_scratch_directory(self):
+        # A module without configure() reads gi.json from the working directory, like the DTK one
+        dtk_like = types.SimpleNamespace(reset=lambda: None)
+        cwd = os.getcwd()
+        try:
+            intrahost.configure(dtk_like, calibration.incubation_params(GI_PARAMS, 10))
+            scratch = os.getcwd()
+            intrahost.configure(dtk_like, calibration.incubation_params(GI_PARAMS, 20))
+            self.assertEqual(scratch, os.getcwd())
+            self.assertEqual(["gi.json"], os.listdir(scratch))
+            with open("gi.json") as infile:
+                self.assertEqual(20, json.load(infile)["Incubation_Period_Gaussian_Mean"])
+        finally:
+            os.chdir(cwd)
+
+    def test_early_rejection(self):
+        observed = [50.0] * 400
+        calibration.init_worker(observed, BASE, GI_PARAMS, POPULATION)
+        distance, days = calibration.simulate({"feed_death_probability": 0.9}, 1, max_sq_error=100 * 50 ** 2)
+        self.assertEqual(float("inf"), distance)
+        self.assertEqual(101, days, msg="Nobody dies before Halloween, so day 101 tips the error over.")
+        distance, days = calibration.simulate({"feed_death_probability": 0.9}, 1)
+        self.assertEqual(400, days)
+        self.assertLess(distance, 50)
+
+    def test_calibrate(self):
+        observed = [0.0] * 303 + [1.0] * 60
+        result = calibration.calibrate(observed, priors={"feed_death_probability": (0.0, 1.0)},
+                                       base_parameters=BASE, gi_params=GI_PARAMS, population=POPULATION,
+                                       particles=8, generations=2, processes=2, seed=4)
+        self.assertLessEqual(len(result.generations), 2)
+        posterior = result.posterior
+        self.assertEqual((8, 1), posterior.thetas.shape)
+        self.assertAlmostEqual(1.0, posterior.weights.sum())
+        self.assertTrue((posterior.thetas >= 0).all() and (posterior.thetas <= 1).all())
+        summary = result.summary()
+        self.assertIn("feed_death_probability", summary["posterior"])
+        if len(result.generations) == 2:
+            self.assertTrue((result.generations[1].distances <= result.generations[1].tolerance).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
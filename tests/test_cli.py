@@ -0,0 +1,71 @@
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'werewolves'))
+from werewolf import cli
+
+
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.config = os.path.join(self.workdir.name, "werewolf_config.json")
+        with open(self.config, "w") as outfile:
+            json.dump({"parameters": {"feed_death_probability": 0.9, "wolf_waiting_period": 30}}, outfile)
+
+    def tearDown(self):
+        self.workdir.cleanup()
+
+    def test_parse_override(self):
+        self.assertEqual(("feed_death_probability", 0.5), cli.parse_override("feed_death_probability=0.5"))
+        self.assertEqual(("incubation", "queue"), cli.parse_override("incubation=queue"))
+        with self.assertRaises(Exception):
+            cli.parse_override("feed_death_probability")
+
+    def test_batch(self):
+        specs = os.path.join(self.workdir.name, "runs.jsonl")
+        reports = [os.path.join(self.workdir.name, f"report_{i}.json") for i in range(3)]
+        with open(specs, "w") as outfile:
+            outfile.write(json.dumps({"config": self.config, "days": 400, "seed": 1, "population": 200,
+                                      "report": reports[0]}) + "\n")
+            outfile.write("# same run, queue incubation and fewer deaths\n")
+            outfile.write(json.dumps({"config": self.config, "days": 400, "seed": 1, "population": 200,
+                                      "incubation": "queue", "parameters": {"feed_death_probability": 0.1},
+                                      "report": reports[1]}) + "\n")
+            outfile.write(json.dumps({"config": self.config, "parameters": {"feed_death_probability": 2},
+                                      "report": reports[2]}) + "\n")
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertEqual(1, cli.main(["batch", specs, "--keep-going"]))
+        results = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(3, len(results))
+        for result, report in zip(results[:2], reports):
+            with open(report) as infile:
+                self.assertEqual(result["stop_day"] or 401, json.load(infile)["timestep"][-1])
+        self.assertGreater(results[0]["graves"], results[1]["graves"])
+        self.assertIn("ValueError", results[2]["error"])
+
+    def test_surrogate(self):
+        save = os.path.join(self.workdir.name, "surrogate.json")
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertEqual(0, cli.main(["surrogate", "--config", self.config, "--days", "200", "--population", "100",
+                                          "--bounds", "feed_death_probability=0.1:0.9", "--output", "final_graves",
+                                          "--initial", "3", "--budget", "4", "--processes", "1", "--seed", "2",
+                                          "--save", save]))
+        self.assertEqual(4, json.loads(output.getvalue())["runs"])
+        with open(save) as infile:
+            self.assertEqual(["feed_death_probability"], json.load(infile)["emulator"]["names"])
+        with self.assertRaises(SystemExit), contextlib.redirect_stderr(io.StringIO()):
+            cli.main(["surrogate", "--bounds", "feed_death_probability=0.5", "--output", "final_graves"])
+
+    def test_cli_import_is_light(self):
+        self.assertEqual([], cli.heavy_imports())
+
+
+if __name__ == "__main__":
+    unittest.main()
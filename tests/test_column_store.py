@@ -0,0 +1,81 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'werewolves'))
+# The stand-in unless WEREWOLF_INTRAHOST asks for the DTK wheels; the engine loads it on import
+os.environ.setdefault("WEREWOLF_INTRAHOST", "standin")
+from werewolf import column_store
+from werewolf import population
+from werewolf import standin_intrahost
+from werewolf import werewolf_params
+from werewolf import engine
+
+
+class TestColumnStore(unittest.TestCase):
+    def setUp(self):
+        self.scratch = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        standin_intrahost.reset()
+        standin_intrahost.use_column_store(None)
+        self.scratch.cleanup()
+
+    def test_grows_on_disk(self):
+        store = column_store.ColumnStore({"age": np.float64, "sex": np.int8}, capacity=4,
+                                         directory=self.scratch.name, chunk_size=3)
+        store.columns["age"][:] = [1, 2, 3, 4]
+        store.grow(10)
+        self.assertIsInstance(store.columns["age"], np.memmap)
+        np.testing.assert_array_equal([1, 2, 3, 4] + [0] * 6, store.columns["age"])
+        self.assertEqual(10 * 8 + 10, store.disk_bytes())
+        self.assertEqual(0, store.nbytes())
+        self.assertEqual([(0, 3), (3, 6), (6, 7)], list(store.chunks(7)))
+        store.close()
+        self.assertEqual([], os.listdir(self.scratch.name))
+        # A store nobody closes still takes its files with it
+        store = column_store.ColumnStore({"age": np.float64}, directory=self.scratch.name)
+        del store
+        self.assertEqual([], os.listdir(self.scratch.name))
+
+    def run_people(self):
+        standin_intrahost.configure({"Incubation_Period_Constant": 3, "Infectious_Period_Constant": 5})
+        people = standin_intrahost.create_many(np.arange(50) % 2, 5000.0 + np.arange(50), np.ones(50))
+        standin_intrahost.force_infect_many(people[::3])
+        # Out of order, and not everyone, like the engine's humans list
+        order = np.random.default_rng(1).permutation(people)[:40]
+        for day in range(10):
+            standin_intrahost.update_many(order)
+        standin_intrahost.configure({})
+        return {name: np.array(getattr(standin_intrahost._population, name)[:50])
+                for name in standin_intrahost.COLUMNS}
+
+    def test_streamed_update_matches_in_memory(self):
+        standin_intrahost.reset()
+        in_memory = self.run_people()
+        standin_intrahost.reset()
+        standin_intrahost.use_column_store(self.scratch.name, chunk_size=7)
+        self.assertTrue(standin_intrahost._population.store.on_disk)
+        out_of_core = self.run_people()
+        for name in in_memory:
+            np.testing.assert_array_equal(in_memory[name], out_of_core[name], err_msg=name)
+
+    def test_simulation_matches_in_memory(self):
+        parameters = werewolf_params.WerewolfParameters(0.5, wolf_waiting_period=30, enable_reporting=True,
+                                                        enable_vital_dynamics=True, annual_mortality_rate=0.01,
+                                                        daily_conception_probability=0.001)
+        reports = []
+        for directory in (None, self.scratch.name):
+            demo = engine.simulate(parameters._replace(column_directory=directory, column_chunk_size=64),
+                                   days=500, seed=5, population_strategy=population.GaussianPopulation(300))
+            reports.append(demo.report)
+            self.assertEqual([], os.listdir(self.scratch.name), msg="The column files should go with the run.")
+        self.assertEqual(reports[0], reports[1])
+        self.assertGreater(reports[1]["graves"][-1], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import asyncio
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'werewolves'))
+from werewolf import daemon
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "needs Unix domain sockets")
+class TestDaemon(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.workdir = tempfile.TemporaryDirectory()
+        cls.config = os.path.join(cls.workdir.name, "werewolf_config.json")
+        with open(cls.config, "w") as outfile:
+            json.dump({"parameters": {"feed_death_probability": 0.9, "wolf_waiting_period": 30}}, outfile)
+        cls.socket_path = os.path.join(cls.workdir.name, "werewolf.sock")
+        ready = threading.Event()
+        server = daemon.SimulationDaemon(cls.socket_path, workers=2)
+        cls.server = threading.Thread(target=asyncio.run, args=(server.serve(ready),))
+        cls.server.start()
+        ready.wait(30)
+
+    @classmethod
+    def tearDownClass(cls):
+        daemon.request({"command": "shutdown"}, cls.socket_path)
+        cls.server.join(30)
+        cls.workdir.cleanup()
+
+    def spec(self, **fields):
+        return dict({"config": self.config, "days": 400, "seed": 1, "population": 200}, **fields)
+
+    def test_run_streams_progress(self):
+        progress = []
+        result = daemon.submit(self.spec(progress_interval_days=100, return_report=True), self.socket_path,
+                               progress.append)
+        self.assertEqual("result", result["type"])
+        self.assertEqual([100, 200, 300, 400][:len(progress)], [message["day"] for message in progress])
+        self.assertEqual(result["stop_day"] or 401, result["report"]["timestep"][-1])
+        # Same seed, same run, whichever warm worker takes it
+        again = daemon.submit(self.spec(progress_interval_days=0), self.socket_path)
+        self.assertEqual(result["graves"], again["graves"])
+
+    def test_report_is_finished_once(self):
+        filename = os.path.join(self.workdir.name, "daemon_report.json")
+        result = daemon.submit(self.spec(report=filename, return_report=True,
+                                         parameters={"memory_interval_days": 100, "memory_top_allocations": 0}),
+                               self.socket_path)
+        with open(filename) as infile:
+            saved = json.load(infile)
+        self.assertEqual(result["report"], saved)
+        days = [sample["day"] for sample in saved["memory"]["samples"]]
+        self.assertEqual(sorted(set(days)), days, msg="The final memory sample should only be taken once.")
+
+    def test_demographics_come_from_the_client_directory(self):
+        with open(os.path.join(self.workdir.name, "demographics.json"), "w") as outfile:
+            json.dump({"Nodes": [{"NodeAttributes": {"InitialPopulation": 150},
+                                  "IndividualAttributes": {"AgeDistributionFlag": 0, "AgeDistribution1": 9000}}]},
+                      outfile)
+        result = daemon.submit(self.spec(population=None, directory=self.workdir.name, days=10), self.socket_path)
+        self.assertEqual("result", result["type"])
+        self.assertEqual(150, result["humans"] + result["werewolves"] + result["graves"])
+
+    def test_relative_paths_are_refused(self):
+        result = daemon.request({"spec": self.spec(report="daemon_report.json")}, self.socket_path)
+        self.assertEqual("error", result["type"])
+        self.assertIn("absolute", result["error"])
+        self.assertFalse(os.path.exists(os.path.join(os.getcwd(), "daemon_report.json")))
+
+    def test_default_socket_is_private(self):
+        with mock.patch.dict(os.environ, {"XDG_RUNTIME_DIR": self.workdir.name}):
+            self.assertEqual(os.path.join(self.workdir.name, "werewolf.sock"), daemon.default_socket())
+        with mock.patch.dict(os.environ, {"XDG_RUNTIME_DIR": "", "TMPDIR": self.workdir.name}), \
+                mock.patch.object(daemon.tempfile, "tempdir", None):
+            directory = os.path.dirname(daemon.default_socket())
+        self.assertEqual(self.workdir.name, os.path.dirname(directory))
+        self.assertEqual(0o700, os.stat(directory).st_mode & 0o777)
+
+    def test_errors_are_reported(self):
+        result = daemon.submit(self.spec(parameters={"feed_death_probability": 2}), self.socket_path)
+        self.assertEqual("error", result["type"])
+        self.assertIn("ValueError", result["error"])
+        self.assertEqual("error", daemon.request({"command": "restart"}, self.socket_path)["type"])
+        self.assertEqual(2, daemon.request({"command": "status"}, self.socket_path)["workers"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import sys
+import types
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'werewolves'))
+from werewolf import dgi_batch
+from werewolf import standin_intrahost
+
+
+def scalar_only(module):
+    # Same backend with the batch entry points hidden, like the DTK module
+    names = ['update', 'get_age', 'is_infected', 'is_incubating', 'is_possible_mother',
+             'get_infectiousness', 'force_infect', 'serialize']
+    return types.SimpleNamespace(**{name: getattr(module, name) for name in names})
+
+
+class TestBatchIntrahost(unittest.TestCase):
+    def setUp(self):
+        standin_intrahost.reset()
+        standin_intrahost.configure({"Incubation_Period_Constant": 5})
+
+    def tearDown(self):
+        standin_intrahost.configure({})
+
+    def make_people(self, count):
+        return np.array([standin_intrahost.create((x % 2, 6000 + x, 1.0)) for x in range(count)])
+
+    def check_backend(self, batch):
+        people = self.make_people(10)
+        np.testing.assert_array_equal(6000 + np.arange(10), batch.get_ages(people))
+        np.testing.assert_array_equal(np.arange(10) % 2, batch.get_sexes(people))
+        batch.force_infect_many(people[:4])
+        for day in range(3):
+            batch.update_many(people)
+        np.testing.assert_array_equal(6003 + np.arange(10), batch.get_ages(people))
+        np.testing.assert_array_equal([True] * 4 + [False] * 6, batch.infected_mask(people))
+        np.testing.assert_array_equal([True] * 4 + [False] * 6, batch.incubating_mask(people))
+        for day in range(2):
+            batch.update_many(people)
+        self.assertFalse(batch.incubating_mask(people).any())
+        np.testing.assert_array_equal([1.0] * 4 + [0.0] * 6, batch.get_infectiousness(people))
+        np.testing.assert_array_equal([False, True] * 5, batch.possible_mother_mask(people))
+
+    def test_native_backend(self):
+        self.check_backend(dgi_batch.BatchIntrahost(standin_intrahost))
+
+    def test_scalar_fallback(self):
+        self.check_backend(dgi_batch.BatchIntrahost(scalar_only(standin_intrahost)))
+
+    def test_empty_batch(self):
+        batch = dgi_batch.BatchIntrahost(standin_intrahost)
+        batch.update_many([])
+        self.assertEqual(0, batch.get_ages([]).size)
+
+    def test_reuse(self):
+        batch = dgi_batch.BatchIntrahost(standin_intrahost)
+        people = self.make_people(3).tolist()
+        free = list(people)
+        self.assertEqual([], batch.create_many(np.zeros(0), np.zeros(0), np.zeros(0), reuse=free))
+        self.assertEqual(3, len(free), msg="An empty batch should leave the free slots alone.")
+        handles = batch.create_many(np.zeros(2), np.zeros(2), np.ones(2), reuse=free)
+        self.assertEqual(people[1:], handles)
+        self.assertEqual(people[:1], free)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'werewolves'))
+from werewolf import ensemble, population, werewolf_params
+
+
+class TestEnsembleAggregator(unittest.TestCase):
+    def test_matches_the_full_ensemble(self):
+        rng = np.random.default_rng(3)
+        aggregator = ensemble.EnsembleAggregator(compartments=("skewed", "normal"))
+        runs = np.stack([np.column_stack([rng.exponential(10, 20) + np.arange(20), rng.normal(0, 1, 20)])
+                         for x in range(2000)])
+        for run in runs:
+            aggregator.add_run(run)
+        np.testing.assert_allclose(runs.mean(axis=0), aggregator.mean)
+        np.testing.assert_allclose(runs.var(axis=0, ddof=1), aggregator.variance())
+        for index, p in enumerate(aggregator.quantiles):
+            exact = np.quantile(runs, p, axis=0)
+            # P-square is an estimate; a few percent of the spread is what it promises
+            self.assertLess(np.abs(aggregator.quantile(index) - exact).max(), 0.1 * runs.std(axis=0).max())
+
+    def test_few_runs_are_exact(self):
+        aggregator = ensemble.EnsembleAggregator(compartments=("graves",))
+        for r in range(4):
+            aggregator.add_run(np.arange(3)[:, None] * r)
+        self.assertEqual([0.0, 1.5, 3.0], aggregator.summary()["graves"]["q50"])
+
+    def test_stopped_runs_carry_forward(self):
+        aggregator = ensemble.EnsembleAggregator(compartments=("graves",), days=4)
+        aggregator.add_run([[1], [2]])
+        aggregator.add_run([[1], [2], [3], [4], [5]])
+        self.assertEqual([2, 2, 2, 2], aggregator.count.tolist())
+        self.assertEqual([1.0, 2.0, 2.5, 3.0], aggregator.mean[:, 0].tolist())
+        ragged = ensemble.EnsembleAggregator(compartments=("graves",))
+        ragged.add_run([[1], [2]])
+        ragged.add_run([[1], [2], [3]])
+        self.assertEqual([2, 2, 1], ragged.count.tolist())
+
+    def test_run_ensemble(self):
+        parameters = werewolf_params.WerewolfParameters(0.9, wolf_waiting_period=30, incubation="queue")
+        aggregator = ensemble.run_ensemble(parameters, 6, 400, population.GaussianPopulation(200))
+        summary = aggregator.summary()
+        self.assertEqual(6, summary["runs"])
+        self.assertEqual(400, len(summary["humans"]["mean"]))
+        totals = np.sum([summary[compartment]["mean"] for compartment in ensemble.COMPARTMENTS], axis=0)
+        # Nobody is born or dies of old age without vital dynamics
+        np.testing.assert_allclose(200, totals)
+
+
+if __name__ == "__main__":
+    unittest.main()
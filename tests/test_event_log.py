@@ -0,0 +1,47 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'werewolves'))
+from werewolf import event_log
+
+
+class TestEventLog(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tempdir.name, "events.bin")
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_records_are_fixed_width(self):
+        self.assertEqual(13, event_log.RECORD.size)
+        self.assertEqual(event_log.RECORD.size, event_log.RECORD_DTYPE.itemsize)
+
+    def test_round_trip_across_batches(self):
+        with event_log.EventLog(self.filename, batch_size=4) as log:
+            for day in range(10):
+                log.log(day, event_log.BITTEN, 100 + day, day)
+            self.assertEqual(8, log.total, msg="Two full batches should have been flushed.")
+            self.assertEqual(10, log.count())
+        self.assertEqual(10 * event_log.RECORD.size, os.path.getsize(self.filename))
+        events = event_log.read_events(self.filename)
+        self.assertEqual(list(range(10)), events['day'].tolist())
+        self.assertEqual(list(range(100, 110)), events['agent'].tolist())
+        self.assertTrue((events['event'] == event_log.BITTEN).all())
+
+    def test_transmission_chain(self):
+        with event_log.EventLog(self.filename) as log:
+            log.log(304, event_log.SPAWNED, 1)
+            log.log(308, event_log.BITTEN, 2, 1)
+            log.log(308, event_log.KILLED, 3, 1)
+            log.log(340, event_log.TURNED, 2)
+            log.log(364, event_log.BITTEN, 4, 2)
+        tree = event_log.transmission_tree(event_log.read_events(self.filename))
+        self.assertEqual({2: (1, 308), 4: (2, 364)}, tree)
+        self.assertEqual([4, 2, 1], event_log.infection_chain(tree, 4))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,10 @@
-import json
+import os
+import sys
 import unittest
 
 from DtkModuleTest import DtkModuleTest
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'werewolves'))
+from werewolf import intrahost
 #######
 # break
 #######
@@ -14,7 +17,7 @@ class TestGenericModules(DtkModuleTest):
         super().setUp()
         self.gene = {}
         self.gina = {}
-        import dtk_generic_intrahost as test
+        test = intrahost.load_intrahost()  # WEREWOLF_INTRAHOST=standin to test the stand-in
         self.namespace_under_test = test
         test.reset()
 
@@ -0,0 +1,42 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'werewolves'))
+from werewolf import incidence
+
+
+class TestRollingIncidence(unittest.TestCase):
+    def test_matches_window_sums(self):
+        rng = np.random.default_rng(4)
+        tracker = incidence.RollingIncidence(windows=(3, 7, 28))
+        days = rng.poisson(2.0, size=(100, 3)).astype(float)
+        for day, counts in enumerate(days):
+            for event, count in zip(incidence.EVENTS, counts):
+                tracker.record(event, count / 2)
+                tracker.record(event, count / 2)
+            tracker.end_day()
+            for window in (3, 7, 28):
+                expected = days[max(0, day + 1 - window):day + 1].sum(axis=0)
+                for e, event in enumerate(incidence.EVENTS):
+                    self.assertAlmostEqual(expected[e], tracker.total(event, window))
+        self.assertTrue(tracker.full(28))
+        self.assertAlmostEqual(days[-7:, 0].mean(), tracker.rate("deaths", 7))
+        self.assertEqual(28, tracker.buffer.shape[1], msg="The buffer should only hold the longest window.")
+        self.assertEqual(9, len(tracker.snapshot()))
+        with self.assertRaises(ValueError):
+            tracker.total("deaths", 365)
+
+    def test_rate_while_filling(self):
+        tracker = incidence.RollingIncidence()
+        tracker.record("bites", 6)
+        tracker.end_day()
+        tracker.end_day()
+        self.assertFalse(tracker.full(7))
+        self.assertEqual(3.0, tracker.rate("bites", 7))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'werewolves'))
+from werewolf import incubation_profile
+
+
+class TestIncubationProfile(unittest.TestCase):
+    def test_constant_incubation(self):
+        profile = incubation_profile.profile_incubation({
+            "Incubation_Period_Distribution": "CONSTANT_DISTRIBUTION",
+            "Incubation_Period_Constant": 3
+        }, agents=50, processes=2)
+        self.assertEqual(50, profile.turn_days.size)
+        self.assertTrue((profile.turn_days == 3).all())
+        self.assertEqual(50, profile.histogram()[3])
+        self.assertEqual(1.0, profile.fraction_incubating(2))
+        self.assertEqual(0.0, profile.fraction_incubating(3))
+
+    def test_gaussian_incubation(self):
+        profile = incubation_profile.profile_incubation({
+            "Incubation_Period_Distribution": "GAUSSIAN_DISTRIBUTION",
+            "Incubation_Period_Gaussian_Mean": 30,
+            "Incubation_Period_Gaussian_Std_Dev": 5
+        }, agents=20000, processes=2, seed=42)
+        summary = profile.summary()
+        self.assertEqual(0, summary["not_turned"])
+        # Whole days of incubation, so the continuous draw is rounded up
+        self.assertAlmostEqual(30.5, summary["mean"], delta=0.2)
+        self.assertAlmostEqual(5.0, summary["std_dev"], delta=0.2)
+
+    def test_max_days(self):
+        profile = incubation_profile.profile_incubation({"Incubation_Period_Constant": 100},
+                                                        agents=10, processes=1, max_days=50)
+        self.assertTrue((profile.turn_days == incubation_profile.NOT_TURNED).all())
+        self.assertEqual(1.0, profile.fraction_incubating(1000))
+
+
+if __name__ == "__main__":
+    unittest.main()
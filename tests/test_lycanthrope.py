@@ -0,0 +1,153 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'werewolves'))
+# The stand-in unless WEREWOLF_INTRAHOST asks for the DTK wheels; the engine loads it on import
+os.environ.setdefault("WEREWOLF_INTRAHOST", "standin")
+from werewolf import population
+from werewolf import werewolf_params
+from werewolf import engine
+
+
+class TestWerewolfDemo(unittest.TestCase):
+    def setUp(self):
+        engine.dgi.reset()
+
+    def make_demo(self, population=200, age_years=20, **parameters):
+        parameters.setdefault("feed_death_probability", 0.9)
+        parameters.setdefault("enable_reporting", True)
+        demo = engine.WerewolfDemo(parameters=werewolf_params.WerewolfParameters(**parameters))
+        for x in range(population):
+            demo.create_person_callback(1.0, age_years * engine.DAYS_YEAR + x, x % 2)
+        return demo
+
+    def test_outbreak_runs_to_human_extinction(self):
+        demo = self.make_demo()
+        self.assertEqual("human_extinction", demo.run(20 * engine.DAYS_YEAR))
+        self.assertLessEqual(len(demo.humans), 1)
+        self.assertEqual(demo.stop_day, demo.report["timestep"][-1])
+        self.assertEqual(200, len(demo.humans) + len(demo.werewolves) + len(demo.graves))
+        # The last row is the state the run stopped in, after that night's feed
+        self.assertEqual(demo.count_compartment("humans"), demo.report["humans"][-1])
+        self.assertEqual(len(demo.graves), demo.report["graves"][-1])
+
+    def test_too_young_for_an_outbreak(self):
+        demo = self.make_demo(age_years=1)
+        self.assertEqual("extinction", demo.run(20 * engine.DAYS_YEAR))
+        self.assertEqual(2, demo.stop_day, msg="Nobody can be patient zero, so the run should end at once.")
+
+    def test_vital_dynamics(self):
+        demo = self.make_demo(population=2000, age_years=30, enable_vital_dynamics=True,
+                              daily_conception_probability=0.001, annual_mortality_rate=0.05,
+                              stop_conditions=[{"type": "threshold", "compartment": "werewolves", "threshold": 1}])
+        demo.run(engine.DAYS_YEAR)
+        self.assertGreater(demo.births, 0)
+        self.assertGreater(demo.natural_deaths, 0)
+        self.assertEqual(2000 + demo.births - demo.natural_deaths,
+                         len(demo.humans) + len(demo.werewolves) + len(demo.graves))
+        if engine.batch.can_recycle():
+            self.assertEqual(2000 + demo.births - demo.natural_deaths + len(demo.free_slots),
+                             engine.dgi._population.count,
+                             msg="Newborns should reuse the slots of the dead before growing the population.")
+
+    def test_hunters(self):
+        demo = self.make_demo(population=2000, hunter_fraction=0.1, hunter_kill_probability=0.05)
+        self.assertAlmostEqual(200, len(demo.hunters), delta=50)
+        demo.run(10 * engine.DAYS_YEAR)
+        counts = demo.role_counts()
+        slain = sum(counts["slain_werewolves"].values())
+        self.assertGreater(slain, 0)
+        self.assertEqual(len(demo.hunters), counts["humans"][engine.HUNTER])
+        self.assertEqual(len(demo.graves), sum(counts["graves"].values()))
+        self.assertEqual(2000, len(demo.humans) + len(demo.werewolves) + len(demo.graves) + slain)
+        for h in demo.hunters:
+            self.assertIn(h, demo.humans)
+
+    def test_event_log_changes_nothing(self):
+        results = []
+        with tempfile.TemporaryDirectory() as scratch:
+            for filename in (None, os.path.join(scratch, "events.bin")):
+                engine.dgi.reset()
+                demo = engine.WerewolfDemo(parameters=werewolf_params.WerewolfParameters(
+                    0.9, hunter_fraction=0.1, hunter_kill_probability=0.002), seed=1, event_log_filename=filename)
+                for x in range(2000):
+                    demo.create_person_callback(1.0, 20 * engine.DAYS_YEAR + x, x % 2)
+                demo.run(10 * engine.DAYS_YEAR)
+                if demo.event_log:
+                    demo.event_log.close()
+                results.append((len(demo.graves), demo.stop_day, demo.role_counts()))
+        self.assertEqual(results[0], results[1], msg="Logging should not draw from the simulation's random numbers.")
+
+    def test_spatial_feeding(self):
+        demo = self.make_demo(population=3000, spatial_extent=20.0, feeding_radius=1.0)
+        self.assertEqual(3000, len(demo.feeding.grid))
+        demo.run(5 * engine.DAYS_YEAR)
+        self.assertGreater(len(demo.graves), 0)
+        self.assertEqual(len(demo.humans), len(demo.feeding.grid), msg="The grid should only hold the living humans.")
+        for wolf in demo.werewolves:
+            self.assertIn(wolf, demo.feeding.homes)
+            self.assertNotIn(wolf, demo.feeding.grid)
+
+    def test_weighted_sampling(self):
+        demo = self.make_demo(population=5000, sampling_rate=0.1, adaptive_weights=True, rare_fraction=1.0)
+        self.assertAlmostEqual(500, len(demo.humans), delta=70)
+        people = demo.total(demo.humans)
+        self.assertAlmostEqual(10 * len(demo.humans), people)
+        demo.run(2 * engine.DAYS_YEAR)
+        self.assertGreater(len(demo.graves), 0)
+        for h in demo.graves:
+            self.assertEqual(1.0, demo.weight(h), msg="While the outbreak is rare every bite hits one person.")
+        self.assertAlmostEqual(people, demo.count_compartment("humans") + demo.count_compartment("waiting_wolves")
+                               + demo.count_compartment("werewolves") + demo.count_compartment("graves"))
+        self.assertEqual(demo.report["graves"][-1], len(demo.graves))
+
+    def test_running_totals(self):
+        # Splits, merges, births and natural deaths all change who is in which set with what weight
+        if hasattr(engine.dgi, "seed"):
+            engine.dgi.seed(1)
+        demo = engine.WerewolfDemo(parameters=werewolf_params.WerewolfParameters(
+            0.5, sampling_rate=0.2, adaptive_weights=True, rare_fraction=0.05, hunter_fraction=0.1,
+            hunter_kill_probability=0.0005, enable_vital_dynamics=True, annual_mortality_rate=0.05,
+            daily_conception_probability=0.001), seed=1)
+        for x in range(3000):
+            demo.create_person_callback(1.0, 20 * engine.DAYS_YEAR + x, x % 2)
+        demo.run(3 * engine.DAYS_YEAR)
+        self.assertGreater(len({demo.weight(h) for h in demo.graves}), 1)
+        for agents in (demo.humans, demo.waiting_wolves, demo.hunters, demo.werewolves, demo.werewolves.strata[engine.HUNTER]):
+            self.assertAlmostEqual(sum(demo.weight(h) for h in agents), demo.total(agents))
+        self.assertAlmostEqual(sum(demo.weight(h) for h in demo.graves), demo.count_compartment("graves"))
+
+    def test_merge(self):
+        demo = self.make_demo(population=0, sampling_rate=0.1)
+        demo.weights.update({h: 2.5 for h in range(1, 2001)})
+        kept = demo.merge(list(range(1, 2001)))
+        self.assertAlmostEqual(500, len(kept), delta=70)
+        self.assertAlmostEqual(5000, demo.total(kept), delta=700, msg="Merging should keep the expected total.")
+        self.assertEqual({10.0}, {demo.weight(h) for h in kept})
+
+    def test_queue_incubation(self):
+        demo = self.make_demo(incubation="queue", wolf_waiting_period=10)
+        bitten = demo.humans[:5]
+        demo.waiting_wolves.extend(bitten)
+        demo.incubation.start(demo, bitten)
+        demo.remove_dead(bitten[:1])
+        for day in range(9):
+            demo.update()
+        self.assertEqual(4, len(demo.waiting_wolves))
+        demo.update()
+        self.assertEqual(0, len(demo.waiting_wolves))
+        self.assertEqual(set(bitten[1:]), set(demo.werewolves))
+
+    def test_gaussian_population(self):
+        demo = self.make_demo(population=0)
+        population.GaussianPopulation(2000, age_gaussian_mean=30, age_gaussian_sigma=5).populate(demo)
+        self.assertEqual(2000, len(demo.humans))
+        ages = engine.batch.get_ages(demo.humans) / engine.DAYS_YEAR
+        self.assertAlmostEqual(30, ages.mean(), delta=0.5)
+        self.assertAlmostEqual(5, ages.std(), delta=0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
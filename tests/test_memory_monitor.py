@@ -0,0 +1,55 @@
+import os
+import sys
+import types
+import unittest
+from collections import deque
+from unittest import mock
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'werewolves'))
+from werewolf import agent_index
+from werewolf import memory_monitor
+from werewolf import standin_intrahost
+
+
+class TestMemoryMonitor(unittest.TestCase):
+    def test_deep_size(self):
+        small = memory_monitor.deep_size(list(range(1000, 1010)))
+        large = memory_monitor.deep_size(list(range(1000, 11000)))
+        self.assertGreater(large, 100 * small)
+        self.assertGreater(memory_monitor.deep_size(np.zeros(1000)), 8000)
+        shared = list(range(1000, 2000))
+        self.assertLess(memory_monitor.deep_size([shared, shared]), 1.1 * memory_monitor.deep_size(shared),
+                        msg="An object referenced twice should only be counted once.")
+
+    def test_sample(self):
+        model = types.SimpleNamespace(graves=list(range(1000, 5000)), death_queue=deque([0] * 100),
+                                      werewolves=agent_index.AgentSet(range(50)), time=10)
+        monitor = memory_monitor.MemoryMonitor(interval_days=5, top_allocations=3, intrahost=standin_intrahost)
+        with monitor:
+            with monitor.phase("run"):
+                ballast = [object() for x in range(10000)]
+                sample = monitor.sample(10, model)
+        self.assertTrue(monitor.due(10))
+        self.assertFalse(monitor.due(11))
+        self.assertEqual(["graves", "werewolves", "death_queue"], list(sample["structures"]))
+        self.assertLessEqual(len(sample["top_allocations"]), 3)
+        self.assertIn("intrahost_bytes", sample)
+        self.assertGreater(monitor.phases["run"]["traced_peak_bytes"], 0)
+        self.assertIn("rss_delta_bytes", monitor.phases["run"])
+        self.assertEqual(1, len(monitor.summary()["samples"]))
+        del ballast
+
+    def test_phase_without_reset_peak(self):
+        # tracemalloc.reset_peak is 3.9+; before that a phase still gets the traced peak so far
+        old_tracemalloc = types.SimpleNamespace(is_tracing=lambda: True, get_traced_memory=lambda: (10, 20))
+        monitor = memory_monitor.MemoryMonitor()
+        with mock.patch.object(memory_monitor, "tracemalloc", old_tracemalloc):
+            with monitor.phase("population"):
+                pass
+        self.assertEqual(20, monitor.phases["population"]["traced_peak_bytes"])
+
+
+if __name__ == "__main__":
+    unittest.main()
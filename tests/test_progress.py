@@ -0,0 +1,41 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'werewolves'))
+from werewolf import progress
+
+
+class TestProgressReporter(unittest.TestCase):
+    def test_logs_latest_snapshot_only(self):
+        reporter = progress.ProgressReporter(interval_seconds=60)
+        with self.assertLogs("werewolves.progress", level="INFO") as logs:
+            with reporter:
+                for day in range(1, 1000):
+                    reporter.update(day, humans=1000 - day, werewolves=day)
+        self.assertEqual(1, len(logs.records), msg="Only the final snapshot should be logged.")
+        self.assertEqual(999, logs.records[0].day)
+        self.assertEqual({"humans": 1, "werewolves": 999}, logs.records[0].fields)
+
+    def test_events_are_rate_limited(self):
+        reporter = progress.ProgressReporter(interval_seconds=60, max_events_per_interval=5)
+        with self.assertLogs("werewolves.progress", level="INFO") as logs:
+            with reporter:
+                for victim in range(100):
+                    reporter.event("Someone survived a bite!", victim=victim)
+        messages = [record.getMessage() for record in logs.records]
+        self.assertEqual(5, messages.count("Someone survived a bite!"))
+        self.assertEqual("95 events were not logged.", messages[-1])
+
+    def test_background_thread_flushes(self):
+        reporter = progress.ProgressReporter(interval_seconds=0.01)
+        with self.assertLogs("werewolves.progress", level="INFO") as logs:
+            reporter.start()
+            reporter.event("Happy Halloween!", day=304)
+            reporter.thread.join(0.2)
+            self.assertIn("Happy Halloween!", [record.getMessage() for record in logs.records])
+            reporter.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
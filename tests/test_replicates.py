@@ -0,0 +1,35 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'werewolves'))
+from werewolf import population, replicates, werewolf_params
+
+
+class TestReplicates(unittest.TestCase):
+    def test_parse(self):
+        self.assertEqual(("final", "waiting_wolves"), replicates.parse_output("final_waiting_wolves"))
+        self.assertEqual((0.02, True), replicates.parse_target("2%"))
+        self.assertEqual((5.0, False), replicates.parse_target(5))
+        with self.assertRaises(ValueError):
+            replicates.parse_output("mean_graves")
+        self.assertAlmostEqual(1.959964, replicates.normal_quantile(0.975), places=6)
+        self.assertAlmostEqual(0.0, replicates.normal_quantile(0.5), places=9)
+
+    def test_compute_goes_to_the_noisy_point(self):
+        people = population.record_people(population.GaussianPopulation(200))
+        base = werewolf_params.WerewolfParameters(0.9, wolf_waiting_period=30, incubation="queue")
+        # Nobody is ever old enough to be patient zero at the first point, so it never varies
+        quiet, noisy = replicates.allocate([{"min_age_werewolf_years": 200}, {}], {"final_graves": 1.0},
+                                           base_parameters=base, population=people, days=700, budget=40,
+                                           min_replicates=4, processes=2, seed=5)
+        self.assertTrue(quiet["converged"])
+        self.assertEqual(4, quiet["replicates"])
+        self.assertEqual(0.0, quiet["outputs"]["final_graves"]["mean"])
+        self.assertEqual(36, noisy["replicates"])
+        self.assertFalse(noisy["converged"])
+        self.assertGreater(noisy["outputs"]["final_graves"]["half_width"], 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'werewolves'))
+# The stand-in unless WEREWOLF_INTRAHOST asks for the DTK wheels; the engine loads it on import
+os.environ.setdefault("WEREWOLF_INTRAHOST", "standin")
+from werewolf import population
+from werewolf import report_encoding
+from werewolf import results_store
+from werewolf import werewolf_params
+from werewolf import engine
+
+
+class TestReportEncoding(unittest.TestCase):
+    def test_round_trip(self):
+        steps = [5, 5, 5, 6, 7, 8, 8, 3]
+        encoded = report_encoding.encode_series(steps)
+        self.assertEqual([[5, 0, 3], [6, 1, 3], [8, -5, 2]], encoded["runs"])
+        self.assertEqual(steps, report_encoding.decode_series(encoded))
+        # Float steps that don't add up exactly start a new run instead of drifting
+        floats = [0.1 * k for k in range(50)] + [2.5] * 10
+        self.assertEqual(floats, report_encoding.decode_series(json.loads(json.dumps(
+            report_encoding.encode_series(floats)))))
+        rows = [[1, 2], [1, 3], [2, 4]]
+        self.assertEqual(rows, report_encoding.decode_series(report_encoding.encode_series(rows)))
+        self.assertEqual([], report_encoding.decode_series(report_encoding.encode_series([])))
+
+    def test_fill_days(self):
+        report = {"timestep": report_encoding.encode_series([2, 5, 6]),
+                  "graves": report_encoding.encode_series([0, 3, 4]),
+                  "age_bands": [0, 10], "stop_reason": None}
+        daily = report_encoding.decode_report(report)
+        self.assertEqual([2, 3, 4, 5, 6], daily["timestep"])
+        self.assertEqual([0, 0, 0, 3, 4], daily["graves"])
+        self.assertEqual([0, 10], daily["age_bands"])
+        self.assertEqual([0, 3, 4], report_encoding.decode_report(report, daily=False)["graves"])
+
+    def run_report(self, **changes):
+        parameters = werewolf_params.WerewolfParameters(0.5, wolf_waiting_period=30, incubation="queue",
+                                                        enable_reporting=True, age_band_years=10, age_band_count=4,
+                                                        enable_vital_dynamics=True, annual_mortality_rate=0.01,
+                                                        daily_conception_probability=0.001)
+        demo = engine.simulate(parameters._replace(**changes), days=600, seed=8,
+                               population_strategy=population.GaussianPopulation(300))
+        return json.loads(json.dumps(demo.finish_report()))
+
+    def test_engine_reports(self):
+        dense = self.run_report()
+        delta = self.run_report(report_encoding="delta")
+        self.assertTrue(report_encoding.is_encoded(delta["graves"]))
+        self.assertLess(len(json.dumps(delta)), len(json.dumps(dense)) / 2)
+        self.assertEqual(dense, report_encoding.decode_report(delta))
+        # Only the days where something moved are kept, and decoding fills the rest back in
+        changes = self.run_report(report_encoding="delta", report_changes_only=True)
+        recorded = report_encoding.decode_report(changes, daily=False)
+        self.assertLess(len(recorded["timestep"]), len(dense["timestep"]))
+        self.assertEqual(dense, report_encoding.decode_report(changes))
+        weekly = self.run_report(report_interval_days=7)
+        self.assertEqual(dense["timestep"][-1], weekly["timestep"][-1])
+        self.assertEqual(dense["graves"][-1], weekly["graves"][-1])
+        self.assertTrue(all(day % 7 == 0 for day in weekly["timestep"][:-1]))
+        # A dense weekly report decodes to daily rows too, each week carrying its recorded values
+        daily = report_encoding.decode_report(weekly)
+        self.assertEqual(list(range(7, dense["timestep"][-1] + 1)), daily["timestep"])
+        self.assertEqual(len(daily["timestep"]), len(daily["graves"]))
+        self.assertEqual(len(daily["timestep"]), len(daily["age_histogram"]["humans"]))
+        self.assertEqual(weekly["age_bands"], daily["age_bands"])
+        for day, graves in zip(daily["timestep"], daily["graves"]):
+            if day % 7 == 0 or day == daily["timestep"][-1]:
+                self.assertEqual(dense["graves"][dense["timestep"].index(day)], graves)
+
+    def test_store_decodes(self):
+        delta = self.run_report(report_encoding="delta")
+        with tempfile.TemporaryDirectory() as scratch:
+            with results_store.ResultsStore(os.path.join(scratch, "runs.db")) as store:
+                run_id = store.add_run(werewolf_params.WerewolfParameters(0.5), delta)
+                graves = report_encoding.decode_series(delta["graves"])
+                self.assertEqual(graves, store.series(run_id, "graves").tolist())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'werewolves'))
+from werewolf import results_store, werewolf_params
+
+
+class TestResultsStore(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.store = results_store.ResultsStore(os.path.join(self.workdir.name, "results.db"))
+
+    def tearDown(self):
+        self.store.close()
+        self.workdir.cleanup()
+
+    def add(self, feed_death_probability, seed, days, incubation="intrahost"):
+        parameters = werewolf_params.WerewolfParameters(feed_death_probability, incubation=incubation)
+        report = {
+            "timestep": list(range(1, days + 1)),
+            "graves": [day * feed_death_probability for day in range(days)],
+            "stop_reason": None,
+            "stop_day": None
+        }
+        return self.store.add_run(parameters, report, seed=seed, version="test")
+
+    def test_range_queries(self):
+        for p in (0.5, 0.6, 0.7, 0.8, 0.9):
+            for seed in (1, 2):
+                self.add(p, seed, 10, incubation="queue" if p > 0.75 else "intrahost")
+        runs = self.store.runs(where={"feed_death_probability": (0.6, 0.8)})
+        self.assertEqual(6, len(runs))
+        self.assertEqual(3, len({run["parameter_key"] for run in runs}))
+        self.assertEqual(2, len(self.store.runs(where={"feed_death_probability": (0.6, 0.8),
+                                                       "incubation": "queue"})))
+        self.assertEqual(1, len(self.store.runs(where={"feed_death_probability": 0.5}, seed=2)))
+        self.assertEqual([], self.store.runs(version="other"))
+        run = self.store.runs(key=runs[0]["parameter_key"], seed=1, with_parameters=True)[0]
+        self.assertEqual(0.6, run["parameters"]["feed_death_probability"])
+        self.assertEqual({"stop_day": None, "stop_reason": None}, run["extra"])
+
+    def test_aggregate(self):
+        for seed in (1, 2, 3):
+            self.add(0.5, seed, 10)
+        self.add(0.9, 1, 10)
+        low, high = sorted(self.store.aggregate("graves"), key=lambda row: row["mean"])
+        self.assertEqual((3, 1), (low["runs"], high["runs"]))
+        self.assertAlmostEqual(4.5, low["mean"])
+        self.assertAlmostEqual(0, low["variance"])
+        self.assertAlmostEqual(8.1, high["max"])
+        self.assertEqual(3, self.store.aggregate("graves", where={"feed_death_probability": 0.5},
+                                                 group_by="code_version")[0]["runs"])
+        with self.assertRaises(ValueError):
+            self.store.aggregate("graves", group_by="parameters")
+        # Large finals with a small spread, where E[x^2] - E[x]^2 loses every digit
+        parameters = werewolf_params.WerewolfParameters(0.7)
+        for seed in (1, 2, 3):
+            self.store.add_run(parameters, {"timestep": [1], "graves": [1e9 + seed]}, seed=seed, version="test")
+        row = self.store.aggregate("graves", where={"feed_death_probability": 0.7})[0]
+        self.assertAlmostEqual(1e9 + 2, row["mean"])
+        self.assertAlmostEqual(2 / 3, row["variance"])
+        seeds = self.store.aggregate("graves", group_by="seed")
+        self.assertEqual([1, 2, 3], [row["seed"] for row in seeds])
+
+    def test_chunked_series(self):
+        days = 2 * results_store.CHUNK_LENGTH + 10
+        long_run = self.add(0.5, 1, days)
+        short_run = self.add(0.5, 2, 5)
+        graves = self.store.series(long_run, "graves")
+        self.assertEqual(days, len(graves))
+        np.testing.assert_allclose(0.5 * np.arange(days), graves)
+        self.assertEqual(np.int64, self.store.series(long_run, "timestep").dtype)
+        window = self.store.series(long_run, "graves", results_store.CHUNK_LENGTH - 3, results_store.CHUNK_LENGTH + 2)
+        np.testing.assert_allclose(0.5 * np.arange(results_store.CHUNK_LENGTH - 3, results_store.CHUNK_LENGTH + 2),
+                                   window)
+        mean = self.store.mean_series([long_run, short_run], "graves")
+        self.assertEqual(days, len(mean))
+        np.testing.assert_allclose(0.5 * np.arange(5), mean[:5])
+        self.assertEqual(0.5 * (days - 1), mean[-1])
+
+    def test_parameter_key_ignores_reporting(self):
+        parameters = werewolf_params.WerewolfParameters(0.5)
+        self.assertEqual(results_store.parameter_key(parameters),
+                         results_store.parameter_key(parameters.override(enable_reporting=True)))
+        self.assertNotEqual(results_store.parameter_key(parameters),
+                            results_store.parameter_key(parameters.override(feed_death_probability=0.6)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'werewolves'))
+from werewolf import spatial_index
+
+
+class TestSpatialGrid(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(11)
+        self.grid = spatial_index.SpatialGrid(extent=100.0, cell_size=5.0)
+        self.points = self.rng.random((5000, 2)) * 100.0
+        for h, (x, y) in enumerate(self.points):
+            self.grid.add(h, x, y)
+
+    def test_draws_stay_within_radius(self):
+        for trial in range(500):
+            x, y = self.rng.random(2) * 100.0
+            h = self.grid.choose_near(x, y, 5.0, self.rng)
+            if h is not None:
+                self.assertLessEqual(np.hypot(*(self.points[h] - (x, y))), 5.0)
+
+    def test_draws_are_uniform_over_neighbours(self):
+        distances = np.hypot(*(self.points - (50.0, 50.0)).T)
+        neighbours = set(np.flatnonzero(distances <= 5.0).tolist())
+        draws = [self.grid.choose_near(50.0, 50.0, 5.0, self.rng) for x in range(len(neighbours) * 200)]
+        self.assertEqual(neighbours, set(draws))
+        counts = np.array([draws.count(h) for h in neighbours])
+        self.assertLess(counts.max(), 300)
+        self.assertGreater(counts.min(), 120)
+
+    def test_removal_is_incremental(self):
+        distances = np.hypot(*(self.points - (50.0, 50.0)).T)
+        for h in np.flatnonzero(distances <= 5.0).tolist():
+            self.grid.remove(h)
+        self.assertEqual(5000 - np.count_nonzero(distances <= 5.0), len(self.grid))
+        self.assertIsNone(self.grid.choose_near(50.0, 50.0, 5.0, self.rng))
+        self.assertIsNotNone(self.grid.choose_near(50.0, 50.0, 10.0, self.rng))
+
+    def test_points_on_the_far_edge(self):
+        self.grid.add("edge", 100.0, 100.0)
+        self.assertEqual((19, 19), self.grid.cell_of(100.0, 100.0))
+        self.assertIn("edge", self.grid)
+
+
+if __name__ == "__main__":
+    unittest.main()
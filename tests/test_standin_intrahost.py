@@ -0,0 +1,75 @@
+import json
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'werewolves'))
+from werewolf import intrahost
+from werewolf import standin_intrahost
+
+
+class TestStandinIntrahost(unittest.TestCase):
+    def setUp(self):
+        standin_intrahost.reset()
+        standin_intrahost.seed(1234)
+
+    def tearDown(self):
+        standin_intrahost.configure({})
+
+    def test_constant_incubation(self):
+        standin_intrahost.configure({"Incubation_Period_Constant": 3})
+        wolf = standin_intrahost.create((0, 7300, 1.0))
+        standin_intrahost.force_infect(wolf)
+        days_incubating = 0
+        while standin_intrahost.is_incubating(wolf):
+            standin_intrahost.update(wolf)
+            days_incubating += 1
+        self.assertEqual(3, days_incubating)
+        self.assertTrue(standin_intrahost.is_infected(wolf))
+        self.assertEqual(1.0, standin_intrahost.get_infectiousness(wolf))
+
+    def test_gaussian_incubation(self):
+        standin_intrahost.configure({
+            "Incubation_Period_Distribution": "GAUSSIAN_DISTRIBUTION",
+            "Incubation_Period_Gaussian_Mean": 30,
+            "Incubation_Period_Gaussian_Std_Dev": 5
+        })
+        people = [standin_intrahost.create((x % 2, 7300, 1.0)) for x in range(200)]
+        for person in people:
+            standin_intrahost.force_infect(person)
+        for day in range(30):
+            for person in people:
+                standin_intrahost.update(person)
+        incubating = sum(standin_intrahost.is_incubating(person) for person in people)
+        self.assertTrue(60 < incubating < 140, msg=f"About half should still incubate, got {incubating}.")
+
+    def test_infection_clears_after_infectious_period(self):
+        standin_intrahost.configure({"Incubation_Period_Constant": 1, "Infectious_Period_Constant": 2})
+        person = standin_intrahost.create((1, 7300, 1.0))
+        standin_intrahost.force_infect(person)
+        for day in range(4):
+            standin_intrahost.update(person)
+        self.assertFalse(standin_intrahost.is_infected(person))
+
+    def test_serialize_infection(self):
+        person = standin_intrahost.create((1, 3650, 0.5))
+        standin_intrahost.force_infect(person)
+        individual = json.loads(standin_intrahost.serialize(person))['individual']
+        self.assertTrue(individual['m_is_infected'])
+        self.assertEqual(1, len(individual['infections']))
+
+    def test_unknown_handle(self):
+        with self.assertRaises(ValueError):
+            standin_intrahost.get_age(1)
+
+    def test_backend_selected_by_environment(self):
+        with mock.patch.dict(os.environ, {intrahost.BACKEND_VARIABLE: "standin"}):
+            self.assertIs(standin_intrahost, intrahost.load_intrahost())
+        with mock.patch.dict(os.environ, {intrahost.BACKEND_VARIABLE: "wolfsbane"}):
+            with self.assertRaises(ValueError):
+                intrahost.load_intrahost()
+
+
+if __name__ == "__main__":
+    unittest.main()
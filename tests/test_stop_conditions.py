@@ -0,0 +1,94 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'werewolves'))
+from werewolf import incidence, stop_conditions
+
+
+class FakeDemo(object):
+    def __init__(self, humans=10, waiting_wolves=0, werewolves=0, graves=0, oldest_age=0):
+        self.time = 1
+        self.humans = list(range(humans))
+        self.waiting_wolves = list(range(waiting_wolves))
+        self.werewolves = list(range(werewolves))
+        self.graves = list(range(graves))
+        self.oldest_age = oldest_age
+        self.age_scans = 0
+        self.incidence = incidence.RollingIncidence(windows=(7, 28))
+
+    def days_until_halloween(self):
+        return -self.time % 304
+
+    def has_patient_zero_candidate(self, days_ahead=0):
+        self.age_scans += 1
+        return self.oldest_age + days_ahead > 16 * 365
+
+    def count_compartment(self, compartment):
+        if compartment == "humans":
+            return len(self.humans) - len(self.waiting_wolves)
+        return len(getattr(self, compartment))
+
+
+class TestStopConditions(unittest.TestCase):
+    def test_human_extinction(self):
+        condition = stop_conditions.HumanExtinction()
+        self.assertIsNone(condition.check(FakeDemo(humans=2)))
+        self.assertEqual("human_extinction", condition.check(FakeDemo(humans=1)))
+
+    def test_extinction_needs_no_eligible_patient_zero(self):
+        self.assertIsNone(stop_conditions.Extinction().check(FakeDemo(werewolves=1)))
+        self.assertIsNone(stop_conditions.Extinction().check(FakeDemo(oldest_age=20 * 365)))
+        self.assertEqual("extinction", stop_conditions.Extinction().check(FakeDemo(oldest_age=5 * 365)))
+
+    def test_extinction_scans_ages_once_per_halloween(self):
+        condition = stop_conditions.Extinction()
+        demo = FakeDemo(oldest_age=20 * 365)
+        for day in range(1, 300):
+            demo.time = day
+            self.assertIsNone(condition.check(demo))
+        self.assertEqual(1, demo.age_scans)
+
+    def test_absorbing_state(self):
+        condition = stop_conditions.AbsorbingState(window_days=30)
+        demo = FakeDemo(werewolves=3)
+        for day in range(1, 31):
+            demo.time = day
+            self.assertIsNone(condition.check(demo))
+        demo.time = 31
+        self.assertEqual("absorbing_state", condition.check(demo))
+
+    def test_threshold(self):
+        above = stop_conditions.CompartmentThreshold("graves", 5)
+        below = stop_conditions.CompartmentThreshold("humans", 4, below=True)
+        self.assertIsNone(above.check(FakeDemo(graves=4)))
+        self.assertEqual("graves_reached_5", above.check(FakeDemo(graves=5)))
+        self.assertEqual("humans_below_4", below.check(FakeDemo(humans=10, waiting_wolves=6)))
+
+    def test_incidence(self):
+        demo = FakeDemo()
+        dying_out = stop_conditions.IncidenceThreshold("deaths", 7, 0.5)
+        surge = stop_conditions.IncidenceThreshold("bites", 7, 2, below=False)
+        for day in range(6):
+            demo.incidence.record("bites", 3)
+            demo.incidence.end_day()
+        self.assertIsNone(dying_out.check(demo), msg="Nothing should fire before the window has filled.")
+        demo.incidence.end_day()
+        self.assertEqual("deaths_7d_below_0.5", dying_out.check(demo))
+        self.assertEqual("bites_7d_reached_2", surge.check(demo))
+        with self.assertRaises(ValueError):
+            stop_conditions.IncidenceThreshold("births", 7, 1)
+
+    def test_build_from_config(self):
+        conditions = stop_conditions.build_stop_conditions([
+            {"type": "extinction"},
+            {"type": "threshold", "compartment": "graves", "threshold": 500}
+        ])
+        self.assertIsInstance(conditions[0], stop_conditions.Extinction)
+        self.assertEqual(500, conditions[1].threshold)
+        with self.assertRaises(ValueError):
+            stop_conditions.build_stop_conditions([{"type": "zombies"}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'werewolves'))
+from werewolf import surrogate, werewolf_params
+
+
+class TestSurrogate(unittest.TestCase):
+    def test_latin_hypercube(self):
+        points = surrogate.latin_hypercube(10, 3, np.random.default_rng(1))
+        for d in range(3):
+            self.assertEqual(list(range(10)), sorted((points[:, d] * 10).astype(int)))
+
+    def test_gaussian_process(self):
+        rng = np.random.default_rng(2)
+        f = lambda x: np.sin(6 * x[:, 0]) + 0.5 * x[:, 1] ** 2
+        x = surrogate.latin_hypercube(30, 2, rng)
+        process = surrogate.GaussianProcess(x, f(x) + rng.normal(0, 0.05, 30), rng=rng)
+        test = rng.random((200, 2))
+        mean, std = process.predict(test)
+        self.assertLess(np.sqrt(np.mean((mean - f(test)) ** 2)), 0.1)
+        self.assertGreater(np.mean(np.abs(mean - f(test)) < 3 * std), 0.9)
+        # Far outside the design the emulator should admit it does not know
+        self.assertGreater(process.predict([[3.0, 3.0]])[1][0], 5 * std.mean())
+
+    def test_picks_spread_away_from_the_design(self):
+        emulator = surrogate.Emulator({"feed_death_probability": (0.0, 1.0)}, ["final_graves"])
+        emulator.add([{"feed_death_probability": p} for p in (0.0, 0.1, 0.2, 0.3)], [[0], [1], [2], [3]])
+        emulator.fit()
+        picks = [point["feed_death_probability"] for point in emulator.most_uncertain(2, np.random.default_rng(3))]
+        self.assertGreater(min(picks), 0.5)
+        self.assertGreater(abs(picks[0] - picks[1]), 0.2)
+
+    def test_explore(self):
+        base = werewolf_params.WerewolfParameters(0.5, wolf_waiting_period=30, incubation="queue")
+        result = surrogate.explore({"feed_death_probability": (0.1, 0.9), "population": (100, 300)},
+                                   ["final_graves"], base, days=700, initial=6, budget=10, batch=2,
+                                   processes=2, seed=4)
+        self.assertEqual(10, len(result.emulator.x))
+        self.assertEqual([6, 8], [entry["runs"] for entry in result.rounds])
+        copy = surrogate.Emulator.from_dict(result.summary()["emulator"])
+        point = [{"feed_death_probability": 0.5, "population": 200}]
+        np.testing.assert_allclose(result.emulator.predict(point), copy.predict(point))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import sys
+import types
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'werewolves'))
+# The stand-in unless WEREWOLF_INTRAHOST asks for the DTK wheels; the engine loads it on import
+os.environ.setdefault("WEREWOLF_INTRAHOST", "standin")
+from werewolf import dgi_batch
+from werewolf import standin_intrahost
+from werewolf import testing_campaign
+from werewolf import werewolf_params
+from werewolf import engine
+
+
+class TestTestingCampaign(unittest.TestCase):
+    def setUp(self):
+        standin_intrahost.reset()
+        self.batch = dgi_batch.BatchIntrahost(standin_intrahost)
+        ages = np.repeat([5, 20, 40], 1000) * 365.0
+        self.humans = self.batch.create_many(np.zeros(ages.size, dtype=int), ages, np.ones(ages.size))
+        self.demo = types.SimpleNamespace(humans=self.humans, werewolves=[], waiting_wolves=[],
+                                          rng=np.random.default_rng(7))
+
+    def test_age_band_and_coverage(self):
+        campaign = testing_campaign.TestingCampaign(coverage=0.5, min_age_years=16, max_age_years=30)
+        targets = campaign.select_targets(self.humans, self.batch, self.demo.rng)
+        ages = self.batch.get_ages(targets)
+        self.assertTrue((ages == 20 * 365).all())
+        self.assertAlmostEqual(500, targets.size, delta=60)
+        self.assertEqual(targets.size, np.unique(targets).size, msg="Nobody should be tested twice in a day.")
+
+    def test_results_follow_compartments(self):
+        infected = self.humans[:1500]
+        self.demo.waiting_wolves = list(infected)
+        campaign = testing_campaign.TestingCampaign(coverage=1.0)
+        tested, positives = campaign.distribute(self.demo, self.batch)
+        self.assertEqual(3000, tested.size)
+        self.assertEqual(sorted(infected), sorted(positives.tolist()))
+        self.assertEqual(1, standin_intrahost._population.interventions[0])
+
+    def test_wolves_without_dgi_infection_test_positive(self):
+        parameters = werewolf_params.WerewolfParameters(
+            0.5, wolf_waiting_period=5, incubation="queue",
+            testing_campaigns=(tuple(sorted({"coverage": 1.0, "compartment": "werewolves"}.items())),))
+        engine.dgi.reset()
+        demo = engine.WerewolfDemo(parameters=parameters, seed=3)
+        for x in range(300):
+            demo.create_person_callback(1.0, 20 * engine.DAYS_YEAR + x, x % 2)
+        # Patient zero is spawned, and everyone it bites incubates in the queue
+        demo.spawn_werewolf(demo.humans[0])
+        demo.run(120)
+        self.assertGreater(len(demo.werewolves), 1)
+        self.assertFalse(engine.batch.infected_mask(list(demo.werewolves)).any())
+        self.assertGreater(demo.tests_given, 0)
+        self.assertEqual(demo.tests_given, demo.positive_tests)
+
+    def test_schedule(self):
+        campaign = testing_campaign.TestingCampaign(start_day=10, end_day=30, interval_days=7)
+        self.assertEqual([10, 17, 24], [day for day in range(50) if campaign.is_active(day)])
+
+    def test_empty_compartment(self):
+        campaign = testing_campaign.TestingCampaign(coverage=1.0, compartment="werewolves")
+        tested, positives = campaign.distribute(self.demo, self.batch)
+        self.assertEqual(0, tested.size)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import json
+import os
+import pickle
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'werewolves'))
+from werewolf import werewolf_params
+
+
+class TestWerewolfParameters(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.config_filename = os.path.join(self.tempdir.name, "werewolf_config.json")
+        self.write_config(feed_death_probability=0.9, enable_reporting=1, debug=0, wolf_waiting_period=30)
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def write_config(self, **parameters):
+        with open(self.config_filename, 'w') as outfile:
+            json.dump({"parameters": parameters}, outfile)
+
+    def test_load_is_cached_by_mtime(self):
+        first = werewolf_params.load_parameters(self.config_filename)
+        self.assertIs(first, werewolf_params.load_parameters(self.config_filename))
+        self.write_config(feed_death_probability=0.5)
+        stat = os.stat(self.config_filename)
+        os.utime(self.config_filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000))
+        second = werewolf_params.load_parameters(self.config_filename)
+        self.assertEqual(0.5, second.feed_death_probability)
+
+    def test_overrides_use_the_cache(self):
+        werewolf_params.load_parameters(self.config_filename)
+        with mock.patch("builtins.open", side_effect=AssertionError("config re-read")):
+            params = werewolf_params.load_parameters(self.config_filename, {"feed_death_probability": 0.2,
+                                                                            "debug": 1})
+        self.assertEqual((0.2, True, 30), (params.feed_death_probability, params.debug, params.wolf_waiting_period))
+        with self.assertRaises(ValueError):
+            werewolf_params.load_parameters(self.config_filename, {"feed_death_probability": 2.0})
+        with self.assertRaises(ValueError):
+            werewolf_params.load_parameters(self.config_filename, {"no_such_parameter": 1})
+
+    def test_hashable_and_picklable(self):
+        params = werewolf_params.WerewolfParameters.from_dict({
+            "feed_death_probability": 0.9,
+            "stop_conditions": [{"type": "threshold", "compartment": "graves", "threshold": 5}]
+        })
+        self.assertEqual(params, pickle.loads(pickle.dumps(params)))
+        results = {params: "cached"}
+        self.assertEqual("cached", results[params._replace()])
+        self.assertEqual([{"type": "threshold", "compartment": "graves", "threshold": 5}],
+                         params.stop_condition_specs())
+
+    def test_flags_are_booleans(self):
+        params = werewolf_params.load_parameters(self.config_filename)
+        self.assertIs(True, params.enable_reporting)
+        self.assertIs(False, params.debug)
+
+    def test_override_keeps_file_values_for_none(self):
+        params = werewolf_params.load_parameters(self.config_filename)
+        self.assertIs(params, params.override(feed_death_probability=None, debug=None))
+        changed = params.override(feed_death_probability=0.75, debug=True)
+        self.assertEqual(0.75, changed.feed_death_probability)
+        self.assertTrue(changed.debug)
+        self.assertEqual(30, changed.wolf_waiting_period)
+
+    def test_validation(self):
+        with self.assertRaises(ValueError):
+            werewolf_params.WerewolfParameters.from_dict({"feed_death_probability": 1.5})
+        with self.assertRaises(ValueError):
+            werewolf_params.WerewolfParameters.from_dict({"enable_reporting": 1})
+        with self.assertRaises(ValueError):
+            werewolf_params.WerewolfParameters.from_dict({"feed_death_probability": 0.5, "hunger": 2})
+        with self.assertRaises(ValueError):
+            werewolf_params.WerewolfParameters.from_dict({"feed_death_probability": 0.5,
+                                                          "wolf_waiting_period": 0})
+        for name in ("sensitivity", "specificity"):
+            with self.assertRaises(ValueError):
+                werewolf_params.WerewolfParameters.from_dict({"feed_death_probability": 0.5,
+                                                              "testing_campaigns": [{name: 1.2}]})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,74 +1,19 @@
-import dtk_generic_intrahost as dgi
-
-
-people = []
-
-# First, make 100 people. Half men half women, age all 20
-for x in range(100):
-    sex = x%2
-    person = dgi.create((sex, 7300, 1.0))
-    people.append(person)
-    pass
-print("Created people.")
-# Now, touch each one with an infection before we spin time
-for victim in people:
-    dgi.force_infect(victim)
-    pass
-
-print("Forced infections.")
-
-for x in range(25):
-    for person in people:
-        dgi.update(person)
-        pass
-    pass
-
-incubating = 0
-infected = 0
-for person in people:
-    if dgi.is_incubating(person):
-        incubating += 1
-        pass
-    if dgi.is_infected(person):
-        infected += 1
-        pass
-    pass
-print(f"25 days later... incubating: {incubating}\tinfected: {infected}")
-
-for x in range(5):
-    for person in people:
-        dgi.update(person)
-        pass
-    pass
-
-incubating = 0
-infected = 0
-for person in people:
-    if dgi.is_incubating(person):
-        incubating += 1
-        pass
-    if dgi.is_infected(person):
-        infected += 1
-        pass
-    pass
-print(f"5 days later... incubating: {incubating}\tinfected: {infected}")
-
-for x in range(5):
-    for person in people:
-        dgi.update(person)
-        pass
-    pass
-
-incubating = 0
-infected = 0
-for person in people:
-    if dgi.is_incubating(person):
-        incubating += 1
-        pass
-    if dgi.is_infected(person):
-        infected += 1
-        pass
-    pass
-print(f"5 days later... incubating: {incubating}\tinfected: {infected}")
-print("Okay, didn't throw an exception.")
-
+import json
+
+from werewolf import incubation_profile
+
+# Make 100 people, half men half women, age all 20, touch each one with an
+# infection and watch how many are still incubating 25, 30 and 35 days later.
+# The guard matters: profiling runs in worker processes, which re-import this
+# script where processes are spawned (Windows, macOS).
+if __name__ == "__main__":
+    with open("gi.json") as infile:
+        gi_params = json.load(infile)
+    profile = incubation_profile.profile_incubation(gi_params, agents=100, processes=1)
+    print("Created people and forced infections.")
+
+    for day in [25, 30, 35]:
+        incubating = round(profile.fraction_incubating(day) * profile.turn_days.size)
+        print(f"{day} days later... incubating: {incubating}\tinfected: {profile.infected}")
+    print(json.dumps(profile.summary(), indent=4))
+    print("Okay, didn't throw an exception.")
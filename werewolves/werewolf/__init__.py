@@ -0,0 +1,3 @@
+# The werewolf model: one engine (engine.WerewolfDemo) with pluggable incubation,
+# population and feeding strategies, plus the helper modules it runs on. The
+# numbered scripts next to this package pick a variant and call engine.main().
@@ -0,0 +1,86 @@
+# Age band x compartment counts kept up to date as agents move, so the report
+# can carry the age structure without asking the intrahost module for everyone's
+# age every day. Only humans (incubating or not) age, one day per update, so an
+# agent's next band crossing is known the day it is added: a calendar maps each
+# day to the agents crossing a boundary then. A compartment move adjusts two
+# cells, a crossing two more; a stale calendar entry (the agent has since turned,
+# died or had its handle reused) is dropped when its day comes round. Werewolves
+# and graves keep the band they were in when they left the humans.
+
+import math
+
+import numpy as np
+
+COMPARTMENTS = ("humans", "waiting_wolves", "werewolves", "graves")
+AGING = {0, 1}  # humans and waiting_wolves
+
+
+class AgeHistogram(object):
+    def __init__(self, band_years=10, band_count=10, days_year=365):
+        # The last band is open-ended: band_count - 1 bands of band_years, then everyone older
+        self.band_days = band_years * days_year
+        self.band_count = band_count
+        self.edges_years = [band * band_years for band in range(band_count)]
+        self.counts = np.zeros((band_count, len(COMPARTMENTS)))
+        # handle -> [band, compartment, weight, day of the next crossing or None]
+        self.agents = {}
+        self.calendar = {}
+
+    def schedule(self, h, record, band_start_age, today):
+        # band_start_age is the age in days at today; agents in the last band never cross again
+        record[3] = None
+        if record[0] < self.band_count - 1:
+            day = today + math.ceil((record[0] + 1) * self.band_days - band_start_age)
+            record[3] = day
+            self.calendar.setdefault(day, []).append(h)
+
+    def add(self, h, age, today, weight=1.0, compartment="humans"):
+        band = min(int(age // self.band_days), self.band_count - 1)
+        c = COMPARTMENTS.index(compartment)
+        record = self.agents[h] = [band, c, weight, None]
+        self.counts[band, c] += weight
+        if c in AGING:
+            self.schedule(h, record, age, today)
+
+    def copy(self, h, clone, weight):
+        # A clone split off h: same band and crossing day; h keeps the rest of its weight
+        band, c, h_weight, day = self.agents[h]
+        self.reweight(h, h_weight - weight)
+        self.agents[clone] = [band, c, weight, day]
+        self.counts[band, c] += weight
+        if day is not None:
+            self.calendar.setdefault(day, []).append(clone)
+
+    def move(self, h, compartment):
+        record = self.agents[h]
+        c = COMPARTMENTS.index(compartment)
+        self.counts[record[0], record[1]] -= record[2]
+        self.counts[record[0], c] += record[2]
+        record[1] = c
+        if c not in AGING:
+            record[3] = None
+
+    def reweight(self, h, weight):
+        record = self.agents[h]
+        self.counts[record[0], record[1]] += weight - record[2]
+        record[2] = weight
+
+    def remove(self, h):
+        record = self.agents.pop(h, None)
+        if record is not None:
+            self.counts[record[0], record[1]] -= record[2]
+
+    def advance(self, today):
+        # Everyone whose crossing falls today moves up a band; call after the day's aging
+        for h in self.calendar.pop(today, ()):
+            record = self.agents.get(h)
+            if record is None or record[3] != today:
+                continue
+            self.counts[record[0], record[1]] -= record[2]
+            record[0] += 1
+            self.counts[record[0], record[1]] += record[2]
+            self.schedule(h, record, record[0] * self.band_days, today)
+
+    def snapshot(self):
+        # {compartment: counts per band}, for the report
+        return {compartment: self.counts[:, c].tolist() for c, compartment in enumerate(COMPARTMENTS)}
@@ -0,0 +1,125 @@
+# Agent collections with O(1) add, remove and uniform random draw.
+# AgentSet keeps handles in a dense list plus a handle -> position dict; removal
+# swaps the last handle into the hole, so iteration order is not insertion order.
+# StratifiedAgentSet keeps one AgentSet per property value (e.g. hunter / civilian)
+# so draws within a stratum never filter the whole population. AgentSet also
+# takes append/extend and converts to a numpy array, so it can stand in for the
+# plain lists the model used to keep its compartments in. Given a weigh function,
+# a set also keeps the running total of the people its agents stand for, so the
+# weighted compartment counts cost O(1); weights that change while an agent is a
+# member have to be passed on with reweight().
+
+import numpy as np
+
+
+class AgentSet(object):
+    def __init__(self, agents=(), weigh=None):
+        self.items = []
+        self.positions = {}
+        self.weigh = weigh
+        self.people = 0
+        for h in agents:
+            self.add(h)
+
+    def add(self, h):
+        if h not in self.positions:
+            self.positions[h] = len(self.items)
+            self.items.append(h)
+            self.people += self.weigh(h) if self.weigh else 1
+
+    def remove(self, h):
+        position = self.positions.pop(h)
+        last = self.items.pop()
+        if position < len(self.items):
+            self.items[position] = last
+            self.positions[last] = position
+        # Starting over when empty keeps rounding from piling up over a long run
+        self.people = self.people - (self.weigh(h) if self.weigh else 1) if self.items else 0
+
+    def reweight(self, h, change):
+        if h in self.positions:
+            self.people += change
+
+    def discard(self, h):
+        if h in self.positions:
+            self.remove(h)
+
+    def append(self, h):
+        self.add(h)
+
+    def extend(self, agents):
+        for h in agents:
+            self.add(h)
+
+    def choice(self, rng):
+        return self.items[int(rng.integers(len(self.items)))]
+
+    def __contains__(self, h):
+        return h in self.positions
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def __array__(self, dtype=None, copy=None):
+        return np.array(self.items, dtype=dtype)
+
+
+class StratifiedAgentSet(object):
+    def __init__(self, strata, weigh=None):
+        self.strata = {value: AgentSet(weigh=weigh) for value in strata}
+        self.stratum_of = {}
+
+    def add(self, h, value):
+        self.discard(h)
+        self.strata[value].add(h)
+        self.stratum_of[h] = value
+
+    def remove(self, h):
+        self.strata[self.stratum_of.pop(h)].remove(h)
+
+    def discard(self, h):
+        if h in self.stratum_of:
+            self.remove(h)
+
+    def reweight(self, h, change):
+        if h in self.stratum_of:
+            self.strata[self.stratum_of[h]].reweight(h, change)
+
+    @property
+    def people(self):
+        return sum(stratum.people for stratum in self.strata.values())
+
+    def count(self, value):
+        return len(self.strata[value])
+
+    def choice(self, rng, value=None):
+        # Uniform over the stratum, or over everyone when value is None
+        if value is not None:
+            return self.strata[value].choice(rng)
+        return self[int(rng.integers(len(self)))]
+
+    def __contains__(self, h):
+        return h in self.stratum_of
+
+    def __len__(self):
+        return len(self.stratum_of)
+
+    def __iter__(self):
+        for stratum in self.strata.values():
+            yield from stratum
+
+    def __getitem__(self, index):
+        # Position across the strata in order; O(number of strata)
+        if index < 0:
+            index += len(self)
+        for stratum in self.strata.values():
+            if index < len(stratum):
+                return stratum[index]
+            index -= len(stratum)
+        raise IndexError("StratifiedAgentSet index out of range")
@@ -0,0 +1,59 @@
+# Throughput of every model variant on one core: same seed, same Gaussian
+# population, same number of days. Run it before and after a performance change.
+#
+#   python -m werewolf.benchmark --population 10000 --days 3650
+
+import argparse
+import json
+import time
+
+from . import engine
+from . import population
+from . import werewolf_params
+
+# name -> parameter overrides on top of base_parameters()
+VARIANTS = {
+    "queue": {"incubation": "queue"},
+    "intrahost": {"incubation": "intrahost"},
+    "intrahost_spatial": {"incubation": "intrahost", "spatial_extent": 100.0, "feeding_radius": 5.0}
+}
+
+
+def base_parameters():
+    return werewolf_params.WerewolfParameters(feed_death_probability=0.9, wolf_waiting_period=30)
+
+
+def benchmark(variant, population_count=10000, days=10 * engine.DAYS_YEAR, seed=1):
+    parameters = base_parameters()._replace(**VARIANTS[variant]).validate()
+    engine.dgi.reset()
+    if hasattr(engine.dgi, "seed"):
+        engine.dgi.seed(seed)
+    demo = engine.WerewolfDemo(parameters=parameters, seed=seed)
+    population.GaussianPopulation(population_count).populate(demo)
+    started = time.perf_counter()
+    agent_days = 0
+    for day in range(days):
+        agent_days += len(demo.humans)
+        if demo.step():
+            break
+    seconds = time.perf_counter() - started
+    return {
+        "variant": variant,
+        "days": day + 1,
+        "seconds": seconds,
+        "days_per_second": (day + 1) / seconds,
+        "agent_days_per_second": agent_days / seconds,
+        "graves": demo.count_compartment("graves"),
+        "stop_reason": demo.stop_reason
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time every werewolf model variant.")
+    parser.add_argument("--population", type=int, default=10000)
+    parser.add_argument("--days", type=int, default=10 * engine.DAYS_YEAR)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--variant", action="append", choices=sorted(VARIANTS))
+    args = parser.parse_args()
+    for variant in args.variant or VARIANTS:
+        print(json.dumps(benchmark(variant, args.population, args.days, args.seed)))
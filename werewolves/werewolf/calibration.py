@@ -0,0 +1,265 @@
+# Approximate Bayesian computation (ABC-SMC) of model parameters against an
+# observed graves time series. Each generation proposes particles from the last
+# one, runs WerewolfDemo for them on a process pool and keeps those whose RMSE
+# to the observations is within the tolerance. The squared error is summed day
+# by day, so a run is dropped as soon as it can no longer get under the
+# tolerance. Each tolerance is a quantile of the previous generation's distances.
+#
+#   python -m werewolf.calibration werewolf_report.json --particles 200 --generations 6 --processes 8
+
+import argparse
+import json
+import math
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from . import intrahost
+from . import population as populations
+from . import werewolf_params
+
+# Uniform priors as (low, high); wolf_waiting_period is the mean incubation period in days
+DEFAULT_PRIORS = {
+    "feed_death_probability": (0.0, 1.0),
+    "wolf_waiting_period": (5, 60),
+    "feeds_per_werewolf": (0.1, 1.5)
+}
+INTEGER_PARAMETERS = {"wolf_waiting_period"}
+
+
+def incubation_params(gi_params, wolf_waiting_period):
+    # Moves the mean of the incubation distribution and keeps its shape
+    params = dict(gi_params)
+    distribution = params.get("Incubation_Period_Distribution")
+    if distribution == "GAUSSIAN_DISTRIBUTION":
+        params["Incubation_Period_Gaussian_Mean"] = wolf_waiting_period
+    elif distribution == "EXPONENTIAL_DISTRIBUTION":
+        params["Incubation_Period_Exponential"] = wolf_waiting_period
+    else:
+        params["Incubation_Period_Distribution"] = "CONSTANT_DISTRIBUTION"
+        params["Incubation_Period_Constant"] = wolf_waiting_period
+    return params
+
+
+_worker = {}
+
+
+def init_worker(observed, base_parameters, gi_params, population):
+    # Runs once per worker process so the tasks only carry a particle
+    _worker.update(observed=observed, base_parameters=base_parameters,
+                   gi_params=gi_params, population=populations.ReplayPopulation(population))
+
+
+class GravesDistance(object):
+    # WerewolfDemo.run observer summing the squared error against the observed graves;
+    # returns True, which ends the run, once the error is over max_sq_error
+    def __init__(self, observed, max_sq_error=math.inf):
+        self.observed = observed
+        self.max_sq_error = max_sq_error
+        self.sq_error = 0.0
+        self.days = 0
+        self.rejected = False
+
+    def __call__(self, demo):
+        self.sq_error += (demo.count_compartment("graves") - self.observed[self.days]) ** 2
+        self.days += 1
+        self.rejected = self.sq_error > self.max_sq_error
+        return self.rejected
+
+
+def simulate(theta, seed, max_sq_error=math.inf):
+    # Returns (distance, days simulated); distance is inf for a run rejected early
+    # Imported here so the parent process never loads the intrahost module
+    from . import engine as model
+    observed = _worker["observed"]
+    parameters = _worker["base_parameters"]._replace(
+        **{name: value for name, value in theta.items() if name in werewolf_params.WerewolfParameters._fields})
+    gi_params = _worker["gi_params"]
+    if parameters.wolf_waiting_period is not None:
+        gi_params = incubation_params(gi_params, parameters.wolf_waiting_period)
+    intrahost.configure(model.dgi, gi_params)
+    distance = GravesDistance(observed, max_sq_error)
+    demo = model.simulate(parameters.validate(), len(observed), seed, _worker["population"], observer=distance)
+    # After a stop the graves stay as they are for the rest of the series
+    while not distance.rejected and distance.days < len(observed):
+        distance(demo)
+    if distance.rejected:
+        return math.inf, distance.days
+    return math.sqrt(distance.sq_error / len(observed)), len(observed)
+
+
+class Generation(object):
+    def __init__(self, thetas, weights, distances, tolerance, simulations, rejected_early, days_simulated):
+        self.thetas = thetas
+        self.weights = weights
+        self.distances = distances
+        self.tolerance = tolerance
+        self.simulations = simulations
+        self.rejected_early = rejected_early
+        self.days_simulated = days_simulated
+
+    @property
+    def acceptance_rate(self):
+        return len(self.distances) / self.simulations if self.simulations else 0.0
+
+    def mean(self):
+        return np.average(self.thetas, axis=0, weights=self.weights)
+
+    def covariance(self):
+        return np.atleast_2d(np.cov(self.thetas, rowvar=False, aweights=self.weights))
+
+
+class CalibrationResult(object):
+    def __init__(self, names, series_days):
+        self.names = names
+        self.series_days = series_days
+        self.generations = []
+
+    @property
+    def posterior(self):
+        return self.generations[-1]
+
+    def summary(self):
+        posterior = self.posterior
+        std = np.sqrt(np.diag(posterior.covariance()))
+        return {
+            "posterior": {name: {"mean": float(mean), "std_dev": float(sd)}
+                          for name, mean, sd in zip(self.names, posterior.mean(), std)},
+            "generations": [{
+                "tolerance": g.tolerance if math.isfinite(g.tolerance) else None,
+                "simulations": g.simulations,
+                "acceptance_rate": g.acceptance_rate,
+                "rejected_early": g.rejected_early,
+                "days_simulated": g.days_simulated,
+                "days_saved": g.simulations * self.series_days - g.days_simulated
+            } for g in self.generations]
+        }
+
+
+def read_observed(filename):
+    # A list of grave counts, or a werewolf_report.json to take "graves" from
+    with open(filename) as infile:
+        observed = json.load(infile)
+    if isinstance(observed, dict):
+        observed = observed["graves"]
+    return [float(graves) for graves in observed]
+
+
+def default_population():
+    nodedemog = intrahost.load_nodedemog()
+    people = []
+    nodedemog.set_callback(lambda mcw, age, gender: people.append((mcw, age, gender)))
+    nodedemog.populate_from_files()
+    return people
+
+
+def calibrate(observed, priors=None, base_parameters=None, gi_params=None, population=None,
+              particles=100, generations=5, quantile=0.5, min_acceptance=0.01,
+              processes=None, seed=None):
+    priors = priors or DEFAULT_PRIORS
+    names = sorted(priors)
+    low = np.array([priors[name][0] for name in names], dtype=float)
+    high = np.array([priors[name][1] for name in names], dtype=float)
+    integer = np.array([name in INTEGER_PARAMETERS for name in names])
+    if base_parameters is None:
+        base_parameters = werewolf_params.load_parameters()
+    base_parameters = base_parameters._replace(enable_reporting=False, debug=False)
+    if gi_params is None:
+        with open("gi.json") as infile:
+            gi_params = json.load(infile)
+    if population is None:
+        population = default_population()
+    rng = np.random.default_rng(seed)
+    processes = processes or os.cpu_count() or 1
+    result = CalibrationResult(names, len(observed))
+
+    def as_theta(values):
+        return {name: int(value) if name in INTEGER_PARAMETERS else float(value)
+                for name, value in zip(names, values)}
+
+    def propose(previous, scale):
+        # Perturbed draw from the previous generation; uniform priors reject anything out of bounds for free
+        while True:
+            if previous is None:
+                values = rng.uniform(low, high)
+            else:
+                values = previous.thetas[rng.choice(len(previous.weights), p=previous.weights)]
+                values = values + rng.normal(0.0, scale)
+            values = np.where(integer, np.round(values), values)
+            if ((values >= low) & (values <= high)).all():
+                return values
+
+    with ProcessPoolExecutor(max_workers=processes, initializer=init_worker,
+                             initargs=(list(observed), base_parameters, gi_params, population)) as pool:
+        previous = None
+        tolerance = math.inf
+        scale = None
+        for generation in range(generations):
+            if previous is not None:
+                # Beaumont et al. (2009): twice the weighted variance of the last generation
+                scale = np.sqrt(2 * np.diag(previous.covariance()))
+                # A collapsed integer parameter can still step to its neighbours
+                scale = np.maximum(scale, np.where(integer, 0.5, 1e-9))
+            max_sq_error = tolerance ** 2 * len(observed)
+            accepted = []
+            simulations = rejected_early = days_simulated = 0
+            pending = {}
+            # Keep a couple of runs per worker in flight and stop as soon as there are enough particles
+            while len(accepted) < particles:
+                while len(pending) < 2 * processes:
+                    values = propose(previous, scale)
+                    future = pool.submit(simulate, as_theta(values), int(rng.integers(2 ** 32)), max_sq_error)
+                    pending[future] = values
+                done, not_done = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    values = pending.pop(future)
+                    distance, days = future.result()
+                    simulations += 1
+                    days_simulated += days
+                    if days < len(observed):
+                        rejected_early += 1
+                    if distance <= tolerance and len(accepted) < particles:
+                        accepted.append((values, distance))
+                if simulations >= particles / min_acceptance and len(accepted) < particles:
+                    break
+            for future in pending:
+                future.cancel()
+            if len(accepted) < particles:
+                # Acceptance collapsed; the previous generation is the posterior
+                break
+            thetas = np.array([values for values, distance in accepted])
+            distances = np.array([distance for values, distance in accepted])
+            if previous is None:
+                weights = np.full(particles, 1.0 / particles)
+            else:
+                # Uniform prior, so the weight is 1 over the proposal density
+                kernel = np.exp(-0.5 * (((thetas[:, None, :] - previous.thetas[None, :, :]) / scale) ** 2).sum(axis=2))
+                weights = 1.0 / (kernel @ previous.weights)
+                weights /= weights.sum()
+            previous = Generation(thetas, weights, distances, tolerance, simulations, rejected_early, days_simulated)
+            result.generations.append(previous)
+            next_tolerance = float(np.quantile(distances, quantile))
+            if next_tolerance >= tolerance or next_tolerance == 0.0:
+                break
+            tolerance = next_tolerance
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calibrate the werewolf model to observed grave counts.")
+    parser.add_argument("observed", help="JSON list of daily grave counts, or a werewolf_report.json")
+    parser.add_argument("--config", default="werewolf_config.json")
+    parser.add_argument("--gi-config", default="gi.json")
+    parser.add_argument("--particles", type=int, default=100)
+    parser.add_argument("--generations", type=int, default=5)
+    parser.add_argument("--quantile", type=float, default=0.5)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    with open(args.gi_config) as infile:
+        gi_params = json.load(infile)
+    result = calibrate(read_observed(args.observed), base_parameters=werewolf_params.load_parameters(args.config),
+                       gi_params=gi_params, particles=args.particles, generations=args.generations,
+                       quantile=args.quantile, processes=args.processes, seed=args.seed)
+    print(json.dumps(result.summary(), indent=4))
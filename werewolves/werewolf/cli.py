@@ -0,0 +1,392 @@
+# The werewolf command.
+#
+#   werewolf run --config werewolf_config.json --days 3650 --seed 7 --population 1000
+#   werewolf batch runs.jsonl        (or - for stdin; one JSON run spec per line)
+#   werewolf startup                 (checks the cold start against COLD_START_BUDGET_SECONDS)
+#   werewolf serve / werewolf submit (warm worker daemon, see daemon.py)
+#   werewolf ensemble --replicates 1000 --days 3650 --population 1000 --output ensemble.json
+#   werewolf replicates --grid feed_death_probability=0.3,0.6,0.9 --target final_graves=5 --budget 2000
+#   werewolf surrogate --bounds feed_death_probability=0.1:0.9 --output final_graves --budget 100
+#   werewolf query results.db --where feed_death_probability=0.6:0.8 --aggregate graves
+#   werewolf decode report.json --output daily.json  (report_encoding "delta" back to daily lists)
+#
+# Only the standard library is imported up front; numpy, the intrahost module
+# and the engine are imported when a run actually starts, so --help and
+# argument errors are cheap, and batch pays for them once for many runs.
+
+import argparse
+import json
+import os
+import sys
+import time
+
+COLD_START_BUDGET_SECONDS = 0.25
+# Modules a bare "werewolf" invocation must not import
+HEAVY_MODULES = ["numpy", "werewolf.engine"]
+
+
+def parse_value(text):
+    # --set values are JSON where they parse (numbers, lists, true) and strings otherwise
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def parse_override(pair):
+    name, separator, value = pair.partition("=")
+    if not separator:
+        raise argparse.ArgumentTypeError(f"expected name=value, got {pair}")
+    return name, parse_value(value)
+
+
+def spec_parameters(spec):
+    # spec keys: config, days, seed, population, incubation, parameters (config overrides),
+    # report, store (a results store the run is added to)
+    from . import werewolf_params
+    overrides = dict(spec.get("parameters") or {})
+    overrides["enable_reporting"] = True
+    if spec.get("incubation"):
+        overrides["incubation"] = spec["incubation"]
+    return werewolf_params.load_parameters(spec.get("config", "werewolf_config.json"), overrides)
+
+
+def spec_population(spec):
+    from . import population
+    if spec.get("population"):
+        return population.GaussianPopulation(spec["population"])
+    return population.DemographicsPopulation()
+
+
+def summarize(demo):
+    return {
+        "stop_reason": demo.stop_reason,
+        "stop_day": demo.stop_day,
+        "humans": demo.count_compartment("humans"),
+        "werewolves": demo.count_compartment("werewolves"),
+        "graves": demo.count_compartment("graves")
+    }
+
+
+def run_spec(spec, show_progress=False):
+    from . import engine
+    parameters = spec_parameters(spec)
+    started = time.perf_counter()
+    demo = engine.simulate(parameters, spec.get("days", 20 * engine.DAYS_YEAR), seed=spec.get("seed"),
+                           population_strategy=spec_population(spec), show_progress=show_progress)
+    result = dict(summarize(demo), seconds=time.perf_counter() - started)
+    # With a store the report file is only written when one is named
+    if spec.get("report") or not spec.get("store"):
+        result["report"] = spec.get("report") or "werewolf_report.json"
+        report = demo.write_report(result["report"])
+    else:
+        report = demo.finish_report()
+    if spec.get("store"):
+        from . import results_store
+        with results_store.ResultsStore(spec["store"]) as store:
+            result["run_id"] = store.add_run(parameters, report, seed=spec.get("seed"))
+    return result
+
+
+def read_specs(infile):
+    for line_number, line in enumerate(infile, 1):
+        line = line.strip()
+        if line and not line.startswith("#"):
+            try:
+                yield json.loads(line)
+            except ValueError as error:
+                raise ValueError(f"Line {line_number} of the batch spec is not JSON: {error}")
+
+
+def command_run(args):
+    import logging
+    if not args.quiet:
+        logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stderr)
+    spec = {
+        "config": args.config,
+        "days": args.days,
+        "seed": args.seed,
+        "population": args.population,
+        "incubation": args.incubation,
+        "parameters": dict(args.set or []),
+        "report": args.report,
+        "store": args.store
+    }
+    print(json.dumps(run_spec(spec, show_progress=not args.quiet)))
+    return 0
+
+
+def command_batch(args):
+    # One interpreter for every run: the imports and the config cache are paid for once
+    infile = sys.stdin if args.spec == "-" else open(args.spec)
+    failures = 0
+    with infile:
+        for index, spec in enumerate(read_specs(infile)):
+            if args.store:
+                spec.setdefault("store", args.store)
+            if not spec.get("store"):
+                spec.setdefault("report", f"werewolf_report_{index}.json")
+            try:
+                result = run_spec(spec)
+            except Exception as error:
+                if not args.keep_going:
+                    raise
+                failures += 1
+                result = {"report": spec.get("report"), "error": f"{type(error).__name__}: {error}"}
+            print(json.dumps(result), flush=True)
+    return 1 if failures else 0
+
+
+def command_ensemble(args):
+    from . import ensemble
+    spec = {"config": args.config, "population": args.population, "incubation": args.incubation,
+            "parameters": dict(args.set or [])}
+    started = time.perf_counter()
+    aggregator = ensemble.run_ensemble(spec_parameters(spec), args.replicates, args.days, spec_population(spec),
+                                       first_seed=args.seed or 0)
+    with open(args.output, "w") as outfile:
+        json.dump(aggregator.summary(), outfile)
+    print(json.dumps({"replicates": aggregator.runs, "output": args.output,
+                      "seconds": time.perf_counter() - started}))
+    return 0
+
+
+def parse_grid(pair):
+    # name=v1,v2,... for --grid
+    name, value = parse_override(pair)
+    if isinstance(value, list):
+        return name, value
+    return name, [parse_value(v) for v in str(value).split(",")]
+
+
+def command_replicates(args):
+    import itertools
+    from . import population, replicates
+    spec = {"config": args.config, "incubation": args.incubation, "parameters": dict(args.set or [])}
+    people = None
+    if args.population:
+        people = population.record_people(population.GaussianPopulation(args.population))
+    grid = dict(args.grid or [])
+    points = [dict(zip(grid, values)) for values in itertools.product(*grid.values())]
+    results = replicates.allocate(points, dict(args.target), spec_parameters(spec), people, args.days,
+                                  args.budget, args.min_replicates, args.confidence, args.processes, args.seed)
+    for result in results:
+        print(json.dumps(result))
+    return 0 if all(result["converged"] for result in results) else 1
+
+
+def parse_condition(pair):
+    # name=value or name=low:high for --where
+    name, value = parse_override(pair)
+    if isinstance(value, str) and ":" in value:
+        low, high = value.split(":", 1)
+        try:
+            return name, (float(low), float(high))
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"expected name=low:high, got {pair}")
+    return name, value
+
+
+def parse_bounds(pair):
+    # name=low:high for --bounds
+    name, value = parse_condition(pair)
+    if not isinstance(value, tuple):
+        raise argparse.ArgumentTypeError(f"expected name=low:high, got {pair}")
+    return name, value
+
+
+def command_surrogate(args):
+    from . import surrogate
+    spec = {"config": args.config, "incubation": args.incubation, "parameters": dict(args.set or [])}
+    started = time.perf_counter()
+    result = surrogate.explore(dict(args.bounds), args.output, spec_parameters(spec), args.days, args.initial,
+                               args.budget, processes=args.processes, seed=args.seed,
+                               population=args.population or surrogate.DEFAULT_POPULATION)
+    with open(args.save, "w") as outfile:
+        json.dump(result.summary(), outfile)
+    print(json.dumps({"runs": len(result.emulator.x), "rounds": result.rounds, "output": args.save,
+                      "seconds": time.perf_counter() - started}))
+    return 0
+
+
+def command_query(args):
+    from . import results_store
+    with results_store.ResultsStore(args.store) as store:
+        where = dict(args.where or [])
+        if args.aggregate:
+            rows = store.aggregate(args.aggregate, where, args.seed, args.code_version, args.group_by)
+        else:
+            rows = store.runs(where, args.seed, args.code_version, with_parameters=args.parameters)
+    for row in rows:
+        print(json.dumps(row))
+    return 0
+
+
+def command_decode(args):
+    from . import report_encoding
+    with open(args.report) as infile:
+        report = report_encoding.decode_report(json.load(infile), daily=not args.recorded)
+    with open(args.output, 'w') as outfile:
+        json.dump(report, outfile, indent=4, sort_keys=True)
+    return 0
+
+
+def fresh_interpreter(*arguments):
+    # A new python with this package importable, whether or not it is installed
+    import subprocess
+    package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [package_root, os.environ.get("PYTHONPATH")])))
+    return subprocess.run([sys.executable, *arguments], check=True, capture_output=True, text=True, env=env).stdout
+
+
+def cold_start_seconds(repeats=5):
+    # Best of a few fresh interpreters parsing --help, which is what every sweep worker pays
+    timings = []
+    for x in range(repeats):
+        started = time.perf_counter()
+        fresh_interpreter("-m", "werewolf", "--help")
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def heavy_imports():
+    # HEAVY_MODULES that importing the CLI and building its parser pulled in
+    return fresh_interpreter("-c", "import sys; from werewolf import cli; cli.build_parser(); "
+                                   "print(' '.join(m for m in cli.HEAVY_MODULES if m in sys.modules))").split()
+
+
+def command_startup(args):
+    seconds = cold_start_seconds(args.repeats)
+    heavy = heavy_imports()
+    over_budget = seconds > args.budget
+    print(json.dumps({"cold_start_seconds": seconds, "budget_seconds": args.budget,
+                      "over_budget": over_budget, "heavy_imports": heavy}))
+    return 1 if over_budget or heavy else 0
+
+
+def command_serve(args):
+    from . import daemon
+    daemon.serve(args.socket, args.workers)
+    return 0
+
+
+def command_submit(args):
+    from . import daemon
+    socket_path = args.socket
+    if args.status or args.shutdown:
+        result = daemon.request({"command": "status" if args.status else "shutdown"}, socket_path)
+    else:
+        spec = {
+            "config": args.config,
+            "days": args.days,
+            "seed": args.seed,
+            "population": args.population,
+            "incubation": args.incubation,
+            "parameters": dict(args.set or []),
+            "report": args.report,
+            "progress_interval_days": args.progress_interval
+        }
+        on_progress = None if args.quiet else lambda message: print(json.dumps(message), file=sys.stderr)
+        result = daemon.submit(spec, socket_path, on_progress)
+    print(json.dumps(result))
+    return 1 if result is None or result["type"] == "error" else 0
+
+
+def add_run_arguments(parser):
+    parser.add_argument("--config", default="werewolf_config.json")
+    parser.add_argument("--days", type=int, default=20 * 365)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--population", type=int, default=None,
+                        help="Gaussian population of this size instead of the demographics files")
+    parser.add_argument("--incubation", choices=["intrahost", "queue"], default=None)
+    parser.add_argument("--set", type=parse_override, action="append", metavar="NAME=VALUE",
+                        help="override a config parameter")
+    parser.add_argument("--quiet", action="store_true", help="no progress logging")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="werewolf", description="Run the werewolf model.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="one run, report written to --report")
+    add_run_arguments(run)
+    run.add_argument("--report", default=None, help="werewolf_report.json unless --store is given")
+    run.add_argument("--store", default=None, help="add the run to this results store")
+    run.set_defaults(handler=command_run)
+
+    batch = commands.add_parser("batch", help="many runs in this interpreter, one JSON spec per line")
+    batch.add_argument("spec", nargs="?", default="-", help="file of run specs, - for stdin")
+    batch.add_argument("--keep-going", action="store_true", help="report failed runs and carry on")
+    batch.add_argument("--store", default=None, help="results store for specs that do not name one")
+    batch.set_defaults(handler=command_batch)
+
+    ensemble = commands.add_parser("ensemble", help="replicates summarized as they run, seeds from --seed")
+    add_run_arguments(ensemble)
+    ensemble.add_argument("--replicates", type=int, default=100)
+    ensemble.add_argument("--output", default="werewolf_ensemble.json",
+                          help="per-day mean, std and quantiles of each compartment")
+    ensemble.set_defaults(handler=command_ensemble)
+
+    adaptive = commands.add_parser("replicates", help="replicates per grid point until the targets are met")
+    add_run_arguments(adaptive)
+    adaptive.add_argument("--grid", type=parse_grid, action="append", metavar="NAME=V1,V2,...")
+    adaptive.add_argument("--target", type=parse_override, action="append", required=True,
+                          metavar="OUTPUT=HALF_WIDTH", help="e.g. final_graves=5 or peak_werewolves=2%%")
+    adaptive.add_argument("--budget", type=int, default=1000, help="most replicates in all")
+    adaptive.add_argument("--min-replicates", type=int, default=10)
+    adaptive.add_argument("--confidence", type=float, default=0.95)
+    adaptive.add_argument("--processes", type=int, default=None)
+    adaptive.set_defaults(handler=command_replicates)
+
+    emulate = commands.add_parser("surrogate", help="Gaussian process emulator trained where it is least sure")
+    add_run_arguments(emulate)
+    emulate.add_argument("--bounds", type=parse_bounds, action="append", required=True, metavar="NAME=LOW:HIGH",
+                         help="a parameter, or population, to vary")
+    emulate.add_argument("--output", action="append", required=True, help="e.g. final_graves or peak_werewolves")
+    emulate.add_argument("--initial", type=int, default=20, help="runs in the Latin hypercube")
+    emulate.add_argument("--budget", type=int, default=100, help="most runs in all")
+    emulate.add_argument("--processes", type=int, default=None)
+    emulate.add_argument("--save", default="werewolf_surrogate.json", help="emulator, for Emulator.from_dict")
+    emulate.set_defaults(handler=command_surrogate)
+
+    query = commands.add_parser("query", help="find or aggregate runs in a results store")
+    query.add_argument("store")
+    query.add_argument("--where", type=parse_condition, action="append", metavar="NAME=VALUE|LOW:HIGH")
+    query.add_argument("--seed", type=int, default=None)
+    query.add_argument("--code-version", default=None)
+    query.add_argument("--parameters", action="store_true", help="include each run's parameters")
+    query.add_argument("--aggregate", metavar="SERIES", default=None,
+                       help="statistics of this series' final value instead of the runs")
+    query.add_argument("--group-by", choices=["parameter_key", "seed", "code_version"], default="parameter_key")
+    query.set_defaults(handler=command_query)
+
+    decode = commands.add_parser("decode", help="expand a delta encoded report into daily series")
+    decode.add_argument("report")
+    decode.add_argument("--output", required=True)
+    decode.add_argument("--recorded", action="store_true", help="only the recorded days, not every day")
+    decode.set_defaults(handler=command_decode)
+
+    startup = commands.add_parser("startup", help="measure the cold start against its budget")
+    startup.add_argument("--budget", type=float, default=COLD_START_BUDGET_SECONDS)
+    startup.add_argument("--repeats", type=int, default=5)
+    startup.set_defaults(handler=command_startup)
+
+    serve = commands.add_parser("serve", help="keep warm workers for submitted runs")
+    serve.add_argument("--socket", default=None, help="Unix socket, werewolf.sock in $XDG_RUNTIME_DIR or a private temporary directory by default")
+    serve.add_argument("--workers", type=int, default=None)
+    serve.set_defaults(handler=command_serve)
+
+    submit = commands.add_parser("submit", help="one run on a werewolf serve daemon")
+    add_run_arguments(submit)
+    submit.add_argument("--report", default=None, help="also write the report here")
+    submit.add_argument("--progress-interval", type=int, default=30, metavar="DAYS")
+    submit.add_argument("--socket", default=None)
+    submit.add_argument("--status", action="store_true", help="ask the daemon how busy it is")
+    submit.add_argument("--shutdown", action="store_true", help="stop the daemon")
+    submit.set_defaults(handler=command_submit)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
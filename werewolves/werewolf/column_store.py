@@ -0,0 +1,88 @@
+# Per-agent columns, in RAM or in memory-mapped files. With a directory, each
+# column is a flat file of one dtype that grows by extending the file (no copy),
+# so agent state is bounded by disk rather than RAM; chunks() gives the
+# fixed-size windows a daily pass should walk through in order, which keeps the
+# disk access sequential. Without a directory the columns are ordinary arrays.
+# Only the intrahost state lives here; the engine's agent indexes (agent_index,
+# weights, feeding) are python containers in RAM, roughly 120 bytes per agent,
+# and they are what caps the population an out-of-core run can hold.
+
+import os
+import shutil
+import tempfile
+import weakref
+
+import numpy as np
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+class ColumnStore(object):
+    def __init__(self, dtypes, capacity=1024, directory=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        # dtypes maps column name to dtype; directory is where a private folder for the files is made
+        self.dtypes = dict(dtypes)
+        self.capacity = capacity
+        self.chunk_size = chunk_size
+        self.directory = None
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            self.directory = tempfile.mkdtemp(prefix="werewolf_columns_", dir=directory)
+            # The files go when the store is closed, dropped or the interpreter exits, whichever is first
+            self.cleanup = weakref.finalize(self, shutil.rmtree, self.directory, ignore_errors=True)
+        self.columns = {name: self.allocate(name, capacity) for name in self.dtypes}
+
+    @property
+    def on_disk(self):
+        return self.directory is not None
+
+    def path(self, name):
+        return os.path.join(self.directory, f"{name}.col")
+
+    def allocate(self, name, capacity, mode="w+"):
+        if self.on_disk:
+            return np.memmap(self.path(name), dtype=self.dtypes[name], mode=mode, shape=(capacity,))
+        return np.zeros(capacity, dtype=self.dtypes[name])
+
+    def grow(self, capacity):
+        # New rows are zero: extended files read back as zeros
+        if capacity <= self.capacity:
+            return
+        for name in list(self.columns):
+            if self.on_disk:
+                # The old map has to go before the file is resized (Windows won't truncate a mapped file)
+                self.columns.pop(name).flush()
+                with open(self.path(name), "r+b") as outfile:
+                    outfile.truncate(capacity * np.dtype(self.dtypes[name]).itemsize)
+                self.columns[name] = self.allocate(name, capacity, mode="r+")
+            else:
+                column = self.columns[name]
+                bigger = np.zeros(capacity, dtype=column.dtype)
+                bigger[:len(column)] = column
+                self.columns[name] = bigger
+        self.capacity = capacity
+
+    def chunks(self, count):
+        for start in range(0, count, self.chunk_size):
+            yield start, min(start + self.chunk_size, count)
+
+    def nbytes(self):
+        # Bytes held in RAM by the columns; the page cache for mapped files is the OS's to manage
+        if self.on_disk:
+            return 0
+        return sum(column.nbytes for column in self.columns.values())
+
+    def disk_bytes(self):
+        if not self.on_disk:
+            return 0
+        return sum(os.path.getsize(self.path(name)) for name in self.columns)
+
+    def flush(self):
+        if self.on_disk:
+            for column in self.columns.values():
+                column.flush()
+
+    def close(self):
+        # Drops the files; the store can't be used afterwards
+        self.columns = {}
+        if self.on_disk:
+            self.cleanup()
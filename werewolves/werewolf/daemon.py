@@ -0,0 +1,236 @@
+# Local simulation daemon for interactive what-if runs.
+#
+#   werewolf serve --workers 4 &
+#   werewolf submit --days 730 --seed 3 --set feed_death_probability=0.4
+#
+# An asyncio server on a Unix socket keeps a pool of worker processes that have
+# already imported the engine and the intrahost module, and that keep each
+# baseline population they have built, so a run only pays for the simulation.
+# A client sends one JSON request line and reads JSON lines back:
+#   {"spec": {...}}        -> accepted, progress every progress_interval_days, then result or error
+#   {"command": "status"}  -> status
+#   {"command": "shutdown"}
+# Specs are the same as for werewolf batch; "return_report": true adds the report
+# to the result. Paths in a spec must be absolute, and "directory" is where the
+# client ran, for the demographics files; submit() fills them in. The socket
+# lives in a directory only its user can reach ($XDG_RUNTIME_DIR where there is one).
+
+import asyncio
+import contextlib
+import getpass
+import itertools
+import json
+import multiprocessing
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from . import cli
+
+DEFAULT_PROGRESS_INTERVAL_DAYS = 30
+PATH_FIELDS = ("config", "report", "directory")
+
+_worker = {}
+
+
+def default_socket():
+    # In a directory only this user can reach, so nobody else can connect or put a socket there first
+    directory = os.environ.get("XDG_RUNTIME_DIR")
+    if not directory:
+        directory = os.path.join(tempfile.gettempdir(), f"werewolf-{getpass.getuser()}")
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        if os.stat(directory).st_mode & 0o077:
+            raise PermissionError(f"{directory} is open to other users; remove it or pass a socket path.")
+    return os.path.join(directory, "werewolf.sock")
+
+
+@contextlib.contextmanager
+def working_directory(directory):
+    previous = os.getcwd()
+    os.chdir(directory)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def check_paths(spec):
+    # The daemon's working directory is not the client's, so relative paths would point somewhere else
+    for name in PATH_FIELDS:
+        if spec.get(name) and not os.path.isabs(spec[name]):
+            raise ValueError(f"{name} must be an absolute path, got {spec[name]}.")
+
+
+def warm_worker(progress_queue):
+    # Runs once per worker: the imports are the slow part of a cold run
+    from . import engine
+    _worker["engine"] = engine
+    _worker["progress"] = progress_queue
+    _worker["populations"] = {}
+
+
+def baseline_population(spec):
+    # Built once per worker and population spec, from a fixed seed, then replayed for every run;
+    # the demographics files are read from the client's directory
+    key = (spec.get("population"), spec.get("directory"))
+    strategy = _worker["populations"].get(key)
+    if strategy is None:
+        from . import population
+        with working_directory(spec.get("directory") or os.getcwd()):
+            people = population.record_people(cli.spec_population(spec))
+        strategy = _worker["populations"][key] = population.ReplayPopulation(people)
+    return strategy
+
+
+class ProgressObserver(object):
+    # WerewolfDemo.run observer sending the job's counts to the daemon every interval days
+    def __init__(self, job_id, interval):
+        self.job_id = job_id
+        self.interval = interval
+
+    def __call__(self, demo):
+        if self.interval and demo.time % self.interval == 0:
+            _worker["progress"].put((self.job_id, dict(cli.summarize(demo), day=demo.time)))
+
+
+def run_job(job_id, spec):
+    engine = _worker["engine"]
+    started = time.perf_counter()
+    check_paths(spec)
+    observer = ProgressObserver(job_id, spec.get("progress_interval_days", DEFAULT_PROGRESS_INTERVAL_DAYS))
+    demo = engine.simulate(cli.spec_parameters(spec), spec.get("days", 20 * engine.DAYS_YEAR), seed=spec.get("seed"),
+                           population_strategy=baseline_population(spec), observer=observer)
+    report = demo.finish_report()
+    if spec.get("report"):
+        engine.save_report(report, spec["report"])
+    result = dict(cli.summarize(demo), seconds=time.perf_counter() - started)
+    if spec.get("return_report"):
+        result["report"] = report
+    return result
+
+
+class SimulationDaemon(object):
+    def __init__(self, socket_path=None, workers=None):
+        self.socket_path = socket_path or default_socket()
+        self.workers = workers or os.cpu_count() or 1
+        self.job_ids = itertools.count(1)
+        self.listeners = {}
+        self.running = set()
+        self.completed = 0
+        self.stopping = None
+
+    def forward_progress(self, loop, progress_queue):
+        # Worker progress arrives on a multiprocessing queue; hand it to the job's asyncio queue
+        while True:
+            message = progress_queue.get()
+            if message is None:
+                return
+            job_id, fields = message
+            listener = self.listeners.get(job_id)
+            if listener is not None:
+                loop.call_soon_threadsafe(listener.put_nowait, dict(fields, type="progress", job=job_id))
+
+    async def send(self, writer, message):
+        writer.write(json.dumps(message).encode() + b"\n")
+        await writer.drain()
+
+    async def run(self, writer, spec):
+        loop = asyncio.get_running_loop()
+        job_id = next(self.job_ids)
+        listener = self.listeners[job_id] = asyncio.Queue()
+        await self.send(writer, {"type": "accepted", "job": job_id})
+        future = loop.run_in_executor(self.pool, run_job, job_id, spec)
+        self.running.add(job_id)
+        try:
+            while not future.done() or not listener.empty():
+                getter = asyncio.ensure_future(listener.get())
+                await asyncio.wait([getter, future], return_when=asyncio.FIRST_COMPLETED)
+                if getter.done():
+                    await self.send(writer, getter.result())
+                else:
+                    getter.cancel()
+            await self.send(writer, dict(future.result(), type="result", job=job_id))
+        except Exception as error:
+            await self.send(writer, {"type": "error", "job": job_id, "error": f"{type(error).__name__}: {error}"})
+        finally:
+            self.running.discard(job_id)
+            self.completed += 1
+            del self.listeners[job_id]
+
+    async def handle(self, reader, writer):
+        try:
+            request = json.loads(await reader.readline())
+            command = request.get("command", "run")
+            if command == "run":
+                await self.run(writer, request["spec"])
+            elif command == "status":
+                await self.send(writer, {"type": "status", "workers": self.workers, "running": len(self.running),
+                                         "completed": self.completed})
+            elif command == "shutdown":
+                await self.send(writer, {"type": "shutdown"})
+                self.stopping.set()
+            else:
+                await self.send(writer, {"type": "error", "error": f"Unknown command {command}."})
+        except (ValueError, KeyError) as error:
+            await self.send(writer, {"type": "error", "error": f"Bad request: {error}"})
+        finally:
+            writer.close()
+
+    async def serve(self, ready=None):
+        loop = asyncio.get_running_loop()
+        self.stopping = asyncio.Event()
+        progress_queue = multiprocessing.get_context().Queue()
+        forwarder = threading.Thread(target=self.forward_progress, args=(loop, progress_queue), daemon=True)
+        forwarder.start()
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=warm_worker,
+                                 initargs=(progress_queue,)) as self.pool:
+            # Start every worker now rather than on the first request
+            await asyncio.gather(*[loop.run_in_executor(self.pool, time.sleep, 0.01) for x in range(self.workers)])
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            server = await asyncio.start_unix_server(self.handle, path=self.socket_path)
+            os.chmod(self.socket_path, 0o600)
+            if ready is not None:
+                ready.set()
+            async with server:
+                await self.stopping.wait()
+        progress_queue.put(None)
+        os.unlink(self.socket_path)
+
+
+def request(message, socket_path=None, on_progress=None):
+    # Client side: sends one request and returns the final message
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socket_path or default_socket())
+        connection.sendall(json.dumps(message).encode() + b"\n")
+        with connection.makefile() as replies:
+            final = None
+            for line in replies:
+                reply = json.loads(line)
+                if reply["type"] == "progress":
+                    if on_progress:
+                        on_progress(reply)
+                elif reply["type"] != "accepted":
+                    final = reply
+            return final
+
+
+def submit(spec, socket_path=None, on_progress=None):
+    # Paths in the spec are the client's, so they are made absolute before they go to the daemon
+    spec = dict(spec)
+    spec.setdefault("config", "werewolf_config.json")
+    spec.setdefault("directory", os.getcwd())
+    for name in PATH_FIELDS:
+        if spec.get(name):
+            spec[name] = os.path.abspath(spec[name])
+    return request({"spec": spec}, socket_path, on_progress)
+
+
+def serve(socket_path=None, workers=None):
+    if not hasattr(socket, "AF_UNIX"):
+        sys.exit("The simulation daemon needs Unix domain sockets.")
+    asyncio.run(SimulationDaemon(socket_path, workers).serve())
@@ -0,0 +1,107 @@
+# Batch facade over the intrahost module: takes numpy arrays of agent handles and
+# returns numpy arrays. If the backend has its own batch entry points (the
+# stand-in does) they are used directly; otherwise each call falls back to one
+# loop over the per-handle dgi functions, which is no slower than the callers'
+# own loops were.
+
+import json
+
+import numpy as np
+
+
+class BatchIntrahost(object):
+    def __init__(self, dgi):
+        self.dgi = dgi
+
+    def _native(self, name):
+        return getattr(self.dgi, name, None)
+
+    def update_many(self, ids):
+        ids = np.asarray(ids, dtype=np.int64)
+        native = self._native("update_many")
+        if native:
+            native(ids)
+            return
+        update = self.dgi.update
+        for h in ids.tolist():
+            update(h)
+
+    def can_recycle(self):
+        return self._native("recreate_many") is not None
+
+    def create_many(self, sexes, ages, mcws, reuse=None):
+        # Handles are taken off the end of the reuse list first (and removed from it),
+        # if the backend can reinitialize them; the rest are newly created
+        count = len(sexes)
+        handles = []
+        if reuse and self.can_recycle():
+            # Not reuse[-count:], which is the whole list when count is 0
+            keep = max(len(reuse) - count, 0)
+            recycled = reuse[keep:]
+            del reuse[keep:]
+            self.dgi.recreate_many(np.array(recycled, dtype=np.int64), sexes[:len(recycled)],
+                                   ages[:len(recycled)], mcws[:len(recycled)])
+            handles.extend(recycled)
+        start = len(handles)
+        native = self._native("create_many")
+        if native and start < count:
+            handles.extend(native(sexes[start:], ages[start:], mcws[start:]).tolist())
+            return handles
+        create = self.dgi.create
+        for i in range(start, count):
+            handles.append(create((int(sexes[i]), float(ages[i]), float(mcws[i]))))
+        return handles
+
+    def get_ages(self, ids):
+        return self._gather("get_ages", "get_age", ids, float)
+
+    def get_sexes(self, ids):
+        # The DTK module has no getter for sex, so the fallback reads it out of serialize()
+        ids = np.asarray(ids, dtype=np.int64)
+        native = self._native("get_sexes")
+        if native:
+            return np.asarray(native(ids), dtype=int)
+        serialize = self.dgi.serialize
+        return np.fromiter((json.loads(serialize(h))["individual"]["m_gender"] for h in ids.tolist()),
+                           dtype=int, count=ids.size)
+
+    def infected_mask(self, ids):
+        return self._gather("is_infected_many", "is_infected", ids, bool)
+
+    def incubating_mask(self, ids):
+        return self._gather("is_incubating_many", "is_incubating", ids, bool)
+
+    def possible_mother_mask(self, ids):
+        return self._gather("is_possible_mother_many", "is_possible_mother", ids, bool)
+
+    def get_infectiousness(self, ids):
+        return self._gather("get_infectiousness_many", "get_infectiousness", ids, float)
+
+    def force_infect_many(self, ids):
+        ids = np.asarray(ids, dtype=np.int64)
+        native = self._native("force_infect_many")
+        if native:
+            native(ids)
+            return
+        force_infect = self.dgi.force_infect
+        for h in ids.tolist():
+            force_infect(h)
+
+    def give_intervention_many(self, ids, intervention):
+        # intervention is the intervention's JSON text, shared by every handle
+        ids = np.asarray(ids, dtype=np.int64)
+        native = self._native("give_intervention_many")
+        if native:
+            native(ids, intervention)
+            return
+        give_intervention = self.dgi.give_intervention
+        for h in ids.tolist():
+            give_intervention((h, intervention))
+
+    def _gather(self, batch_name, single_name, ids, dtype):
+        ids = np.asarray(ids, dtype=np.int64)
+        native = self._native(batch_name)
+        if native:
+            return np.asarray(native(ids), dtype=dtype)
+        single = getattr(self.dgi, single_name)
+        return np.fromiter((single(h) for h in ids.tolist()), dtype=dtype, count=ids.size)
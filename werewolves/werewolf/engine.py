@@ -0,0 +1,679 @@
+# The werewolf model. WerewolfDemo is the one simulation core; the numbered
+# scripts are variants of it that differ in their strategies:
+#   incubation - incubation.IntrahostIncubation (gi.json) or QueueIncubation (wolf_waiting_period)
+#   population - population.DemographicsPopulation (dnd) or GaussianPopulation
+#   feeding    - feeding.WellMixedFeeding or SpatialFeeding (spatial_extent)
+
+from . import intrahost
+dgi = intrahost.load_intrahost()
+from . import dgi_batch
+batch = dgi_batch.BatchIntrahost(dgi)
+from . import event_log
+from . import stop_conditions
+from . import werewolf_params
+from . import testing_campaign
+from . import agent_index
+from . import feeding
+from . import incubation
+from . import population
+from . import progress
+from . import memory_monitor
+from . import age_histogram
+from . import incidence
+from . import report_encoding
+import logging
+
+DAYS_YEAR = 365
+HALLOWEEN_DAY = 304
+LUNAR_CYCLE = 28
+FULL_MOON_NIGHTS = 2
+MIN_WEREWOLF_SPAWN = 17
+CIVILIAN = "civilian"
+HUNTER = "hunter"
+ROLES = [CIVILIAN, HUNTER]
+PREGNANCY_DAYS = 280
+import contextlib
+import sys
+import json
+
+import numpy as np
+
+
+class WerewolfDemo(object):
+    def __init__(self,
+                 config_filename="werewolf_config.json",
+                 feed_kill_ratio=None,
+                 enable_reporting=None,
+                 debug=None,
+                 event_log_filename=None,
+                 parameters=None,
+                 seed=None,
+                 incubation_strategy=None,
+                 feeding_strategy=None):
+        if parameters is None:
+            parameters = werewolf_params.load_parameters(config_filename)
+        params = parameters.override(feed_death_probability=feed_kill_ratio,
+                                     enable_reporting=enable_reporting,
+                                     debug=debug)
+        self.parameters = params
+        intrahost.use_column_store(dgi, params.column_directory, params.column_chunk_size)
+        if params.stop_conditions is not None:
+            self.stop_conditions = stop_conditions.build_stop_conditions(params.stop_condition_specs())
+        else:
+            self.stop_conditions = stop_conditions.default_stop_conditions()
+        self.stop_reason = None
+        self.stop_day = None
+        # Compartments with O(1) membership, removal and weighted totals; waiting wolves stay in humans too
+        self.humans = agent_index.AgentSet(weigh=self.weight)
+        self.time = 1
+        self.wounded_count = 0
+        self.incidence = incidence.RollingIncidence(params.incidence_windows)
+        self.werewolves = agent_index.StratifiedAgentSet(ROLES, weigh=self.weight)
+        self.waiting_wolves = agent_index.AgentSet(weigh=self.weight)
+        self.graves = []
+        self.grave_people = 0
+        self.rng = np.random.default_rng(seed)
+        self.enable_vital_dynamics = params.enable_vital_dynamics
+        self.pregnant = set()
+        self.due_dates = {}
+        self.free_slots = []
+        self.births = 0
+        self.natural_deaths = 0
+        self.campaigns = testing_campaign.build_campaigns(params.testing_campaign_specs())
+        self.tests_given = 0
+        self.positive_tests = 0
+        self.hunters = agent_index.AgentSet(weigh=self.weight)
+        self.graves_by_role = dict.fromkeys(ROLES, 0)
+        self.slain_by_role = dict.fromkeys(ROLES, 0)
+        # Monte Carlo weights, only for agents that don't stand for exactly one person
+        self.weights = {}
+        self.max_weight = 1.0
+        self.incubation = incubation_strategy or build_incubation(params)
+        self.feeding = feeding_strategy or feeding.build_feeding(params)
+        self.feed_death_probability = params.feed_death_probability
+        self.debug = params.debug
+        self.min_age_werewolf_years = params.min_age_werewolf_years
+        self.enable_reporting = params.enable_reporting
+        self.progress = progress.ProgressReporter()
+        self.memory = None
+        if params.memory_interval_days is not None:
+            self.memory = memory_monitor.MemoryMonitor(params.memory_interval_days,
+                                                       params.memory_top_allocations, intrahost=dgi)
+        self.age_histogram = None
+        if params.age_band_years is not None:
+            self.age_histogram = age_histogram.AgeHistogram(params.age_band_years, params.age_band_count, DAYS_YEAR)
+        self.event_log = None
+        if event_log_filename:
+            self.event_log = event_log.EventLog(event_log_filename)
+        self.last_report_day = None
+        self.last_report_row = None
+        if self.enable_reporting:
+            # Delta encoding keeps each series as runs from the start, not just in the written report
+            series = report_encoding.DeltaSeries if params.report_encoding == "delta" else list
+            self.report = {
+                "timestep": series(),
+                "humans": series(),
+                "waiting_wolves": series(),
+                "hunters": series(),
+                "werewolves": series(),
+                "graves": series(),
+                "births": series(),
+                "natural_deaths": series(),
+                "hunter_werewolves": series(),
+                "hunter_graves": series(),
+                "slain_werewolves": series(),
+                "tested": series(),
+                "positives": series()
+            }
+            if params.report_incidence:
+                self.report.update({name: series() for name in self.incidence.snapshot()})
+            if self.age_histogram:
+                self.report["age_bands"] = self.age_histogram.edges_years
+                self.report["age_histogram"] = {compartment: series() for compartment in age_histogram.COMPARTMENTS}
+
+    def create_person_callback(self, mcw, age, gender):
+        sampling_rate = self.parameters.sampling_rate
+        if sampling_rate < 1.0:
+            if self.rng.random() >= sampling_rate:
+                return
+            mcw /= sampling_rate
+        h = dgi.create((gender, age, mcw))
+        if mcw != 1.0:
+            self.weights[h] = mcw
+            self.max_weight = max(self.max_weight, mcw)
+        self.humans.append(h)
+        if self.age_histogram:
+            self.age_histogram.add(h, age, self.time, mcw)
+        if self.parameters.hunter_fraction and self.rng.random() < self.parameters.hunter_fraction:
+            self.hunters.add(h)
+        self.feeding.add(self, h)
+
+    def leave_humans(self, h):
+        # Drops h from the indexes that only hold humans; call after role(h) is no longer needed
+        self.hunters.discard(h)
+        self.pregnant.discard(h)
+        self.feeding.leave(h)
+
+    def role(self, h):
+        return HUNTER if h in self.hunters else CIVILIAN
+
+    def weight(self, h):
+        return self.weights.get(h, 1.0)
+
+    def set_weight(self, h, weight):
+        # Passes the change on to the running totals of the sets h is in
+        change = weight - self.weight(h)
+        if weight == 1.0:
+            self.weights.pop(h, None)
+        else:
+            self.weights[h] = weight
+        for agents in (self.humans, self.waiting_wolves, self.hunters, self.werewolves):
+            agents.reweight(h, change)
+
+    def total(self, agents):
+        # People the agents stand for; just the count while nobody is weighted
+        if not self.weights:
+            return len(agents)
+        if hasattr(agents, "people"):
+            return agents.people
+        weights = self.weights
+        return sum(weights.get(h, 1.0) for h in agents)
+
+    def agent_draws(self, people, agents):
+        # How many uniform draws over agents reach the given number of people on
+        # average; rounded stochastically so the expectation is exact
+        if not self.weights or not agents:
+            return people
+        return int(people * len(agents) / self.total(agents) + self.rng.random())
+
+    def outbreak_is_rare(self):
+        infected = self.total(self.werewolves) + self.total(self.waiting_wolves)
+        return infected < self.parameters.rare_fraction * (self.total(self.humans) + self.total(self.werewolves))
+
+    def choose_person(self):
+        # Uniform over people rather than agents, by rejection against the heaviest weight
+        while True:
+            h = self.humans[int(self.rng.integers(len(self.humans)))]
+            if self.rng.random() * self.max_weight < self.weights.get(h, 1.0):
+                return h
+
+    def split_off(self, h, people=1.0):
+        # A new agent for some of the people h stands for, with h's age, sex, role and home
+        clone = batch.create_many(batch.get_sexes([h]), batch.get_ages([h]), np.array([people]),
+                                  reuse=self.free_slots)[0]
+        self.set_weight(h, self.weights[h] - people)
+        if people != 1.0:
+            self.weights[clone] = people
+        self.humans.append(clone)
+        if self.age_histogram:
+            self.age_histogram.copy(h, clone, people)
+        if h in self.hunters:
+            self.hunters.add(clone)
+        self.feeding.add_near(clone, h)
+        return clone
+
+    def merge(self, wolves):
+        # Russian roulette: a wolf lighter than the sampling weight survives with
+        # probability weight / sampling weight and then carries the sampling weight
+        full_weight = 1.0 / self.parameters.sampling_rate
+        kept = []
+        for h in wolves:
+            w = self.weights.get(h, 1.0)
+            if w >= full_weight:
+                kept.append(h)
+            elif self.rng.random() < w / full_weight:
+                self.set_weight(h, full_weight)
+                self.max_weight = max(self.max_weight, full_weight)
+                kept.append(h)
+                if self.age_histogram:
+                    self.age_histogram.reweight(h, full_weight)
+            else:
+                self.set_weight(h, 1.0)
+                self.feeding.forget(h)
+                if self.age_histogram:
+                    self.age_histogram.remove(h)
+        return kept
+
+    def expose_lycanthrope(self):
+        future_wolves = []
+        killed = set()
+        if ((self.time % LUNAR_CYCLE) < FULL_MOON_NIGHTS):
+            if self.hunters and self.werewolves:
+                self.hunt()
+            feeds = 0
+            # While the outbreak is rare, adaptive weights make each bite hit one person
+            person_level = False
+            if self.werewolves:
+                # set number of feeds
+                feeds = round(self.total(self.werewolves) * self.parameters.feeds_per_werewolf)
+                if feeds == 0:
+                    feeds +=1
+                person_level = self.parameters.adaptive_weights and self.weights and self.outbreak_is_rare()
+                if not person_level:
+                    # feeds counts people; with weights each agent drawn stands for several
+                    feeds = self.agent_draws(feeds, self.humans)
+                pass
+            if self.debug:
+                self.progress.event(f'With {len(self.werewolves)} werewolves, {feeds} feeds.',
+                                    day=self.time, werewolves=len(self.werewolves), feeds=feeds)
+            for n in range(feeds):
+                if not self.humans:
+                    break
+                victim = self.feeding.choose_victim(self, n, person_level)
+                if victim is None:
+                    continue
+                if person_level and self.weight(victim) > 1.0 and victim not in self.waiting_wolves:
+                    victim = self.split_off(victim)
+                draw = self.rng.random()
+                if self.event_log:
+                    # Wolves take turns feeding, so no extra random draws when logging
+                    source = self.werewolves[(self.time + n) % len(self.werewolves)]
+                if draw < self.feed_death_probability:
+                    self.humans.remove(victim)
+                    self.waiting_wolves.discard(victim) # Possible to be bitten twice
+                    self.graves.append(victim)
+                    self.grave_people += self.weight(victim)
+                    self.graves_by_role[self.role(victim)] += self.weight(victim)
+                    self.leave_humans(victim)
+                    self.feeding.forget(victim)
+                    killed.add(victim)
+                    if self.age_histogram:
+                        self.age_histogram.move(victim, "graves")
+                    if self.event_log:
+                        self.event_log.log(self.time, event_log.KILLED, victim, source)
+                    if self.debug:
+                        self.progress.event("Someone died mysteriously...", day=self.time, victim=victim)
+                    self.incidence.record("deaths", self.weight(victim))
+                else:
+                    future_wolves.append(victim)
+                    self.incidence.record("bites", self.weight(victim))
+                    if self.event_log:
+                        self.event_log.log(self.time, event_log.BITTEN, victim, source)
+                    if self.debug:
+                        self.progress.event("Someone survived a bite!", day=self.time, victim=victim)
+                pass
+            pass
+        if future_wolves:
+            # Someone bitten twice only starts incubating once, and not at all if a later bite killed them
+            puppies = [p for p in dict.fromkeys(future_wolves) if p not in killed and p not in self.waiting_wolves]
+            self.incubation.start(self, puppies)
+            self.waiting_wolves.extend(puppies) # Copying them to waiting wolves for reporting
+            if self.age_histogram:
+                for p in puppies:
+                    self.age_histogram.move(p, "waiting_wolves")
+
+    def update(self):
+        self.time += 1
+        batch.update_many(self.humans)
+        if self.age_histogram:
+            self.age_histogram.advance(self.time)
+        if self.enable_vital_dynamics:
+            self.vital_dynamics()
+        turned = self.incubation.turned(self)
+        if turned:
+            self.turn_into_werewolves(turned)
+        for campaign in self.campaigns:
+            if campaign.is_active(self.time):
+                self.run_campaign(campaign)
+
+        if self.time % HALLOWEEN_DAY == 0: # It is october 31
+            if len(self.werewolves) == 0: # and there are no werewolves
+                ages = batch.get_ages(self.humans)
+                old_enough = ages > self.min_age_werewolf_years * DAYS_YEAR
+                birthdays = np.flatnonzero(old_enough & (ages % DAYS_YEAR == HALLOWEEN_DAY))
+                if birthdays.size:
+                    self.progress.event("Found a new werewolf with a Halloween Birthday.", day=self.time)
+                    self.spawn_werewolf(self.humans[birthdays[0]])
+                else:
+                    self.progress.event("No cool birthdays, just taking someone.", day=self.time)
+                    candidates = np.flatnonzero(old_enough)
+                    if candidates.size:
+                        self.spawn_werewolf(self.humans[candidates[0]])
+                        self.progress.event("Found someone old enough.", day=self.time)
+                    else:
+                        self.progress.event("No one old enough! No outbreak!", day=self.time,
+                                            oldest=float(ages.max()) if ages.size else None)
+                        self.stop("no_outbreak")
+
+    def vital_dynamics(self):
+        # Natural deaths and conceptions are vectorized draws over the humans.
+        # Werewolves are not aged by update(), so they are left out.
+        humans = np.array(self.humans)
+        params = self.parameters
+        dies = np.zeros(humans.size, dtype=bool)
+        if params.annual_mortality_rate > 0 and humans.size:
+            age_years = batch.get_ages(humans) / DAYS_YEAR
+            hazard = params.annual_mortality_rate / DAYS_YEAR * np.exp2((age_years - 40) / params.mortality_doubling_years)
+            dies = self.rng.random(humans.size) < -np.expm1(-hazard)
+            if dies.any():
+                self.remove_dead(humans[dies].tolist())
+        if params.daily_conception_probability > 0 and humans.size:
+            # Drawing for mothers who are already pregnant and then skipping them
+            # leaves every other possible mother with the right probability
+            mothers = humans[batch.possible_mother_mask(humans) & ~dies]
+            conceived = mothers[self.rng.random(mothers.size) < params.daily_conception_probability]
+            due_day = self.time + PREGNANCY_DAYS
+            for mother in conceived.tolist():
+                if mother not in self.pregnant:
+                    self.pregnant.add(mother)
+                    self.due_dates.setdefault(due_day, []).append(mother)
+        mothers = [m for m in self.due_dates.pop(self.time, []) if m in self.pregnant]
+        if mothers:
+            self.pregnant.difference_update(mothers)
+            sexes = self.rng.integers(0, 2, size=len(mothers))
+            newborns = batch.create_many(sexes, np.zeros(len(mothers)), np.ones(len(mothers)),
+                                         reuse=self.free_slots)
+            if self.weights:
+                # A newborn stands for as many people as its mother; set before it joins the humans' total
+                for mother, newborn in zip(mothers, newborns):
+                    if mother in self.weights:
+                        self.weights[newborn] = self.weights[mother]
+            self.humans.extend(newborns)
+            for mother, newborn in zip(mothers, newborns):
+                self.feeding.add_near(newborn, mother)
+                if self.age_histogram:
+                    self.age_histogram.add(newborn, 0, self.time, self.weights.get(mother, 1.0))
+            self.births += self.total(newborns)
+            if self.event_log:
+                for h in newborns:
+                    self.event_log.log(self.time, event_log.BORN, h)
+
+    def remove_dead(self, dead):
+        for h in dead:
+            self.humans.remove(h)
+            self.waiting_wolves.discard(h)
+            self.leave_humans(h)
+            self.feeding.forget(h)
+            if self.age_histogram:
+                self.age_histogram.remove(h)
+        self.natural_deaths += self.total(dead)
+        if batch.can_recycle():
+            self.free_slots.extend(dead)
+            for h in dead:
+                self.weights.pop(h, None)
+        if self.event_log:
+            for h in dead:
+                self.event_log.log(self.time, event_log.DIED, h)
+
+    def hunt(self):
+        # Each hunter gets one chance a night; wolves are drawn from the stratified index
+        kills = self.rng.binomial(round(self.total(self.hunters)), self.parameters.hunter_kill_probability)
+        kills = min(self.agent_draws(kills, self.werewolves), len(self.werewolves))
+        for n in range(kills):
+            wolf = self.werewolves.choice(self.rng)
+            self.slain_by_role[self.werewolves.stratum_of[wolf]] += self.weight(wolf)
+            self.werewolves.remove(wolf)
+            self.feeding.forget(wolf)
+            if self.age_histogram:
+                self.age_histogram.remove(wolf)
+            if self.event_log:
+                # Hunters take turns, like the feeding wolves, so logging adds no random draws
+                hunter = self.hunters[(self.time + n) % len(self.hunters)]
+                self.event_log.log(self.time, event_log.SLAIN, wolf, hunter)
+        if kills and self.debug:
+            self.progress.event(f"Hunters killed {kills} werewolves.", day=self.time, kills=kills)
+
+    def run_campaign(self, campaign):
+        tested, positives = campaign.distribute(self, batch)
+        self.tests_given += self.total(tested.tolist())
+        self.positive_tests += self.total(positives.tolist())
+        if self.event_log:
+            for h in positives.tolist():
+                self.event_log.log(self.time, event_log.TESTED_POSITIVE, h)
+
+    def turn_into_werewolves(self, turned):
+        # Pull people who've changed out of human and into werewolves
+        turned_set = set(turned)
+        for h in turned_set:
+            self.humans.discard(h)
+            self.waiting_wolves.discard(h)
+        if self.parameters.adaptive_weights and not self.outbreak_is_rare():
+            merged = self.merge(turned)
+            for h in turned_set.difference(merged):
+                self.leave_humans(h)
+            turned = merged
+        self.incidence.record("turnings", self.total(turned))
+        for h in turned:
+            self.werewolves.add(h, self.role(h))
+            self.leave_humans(h)
+            if self.age_histogram:
+                self.age_histogram.move(h, "werewolves")
+            if self.event_log:
+                self.event_log.log(self.time, event_log.TURNED, h)
+            if self.debug:
+                self.progress.event(f"Individual {h} is a wolf!", day=self.time, individual=h)
+
+    def spawn_werewolf(self, h):
+        if self.weight(h) > 1.0:
+            # Patient zero is one person, not everyone the agent stands for
+            h = self.split_off(h)
+        self.humans.remove(h)
+        self.waiting_wolves.discard(h)
+        self.werewolves.add(h, self.role(h))
+        self.leave_humans(h)
+        if self.age_histogram:
+            self.age_histogram.move(h, "werewolves")
+        if self.event_log:
+            self.event_log.log(self.time, event_log.SPAWNED, h)
+
+    def step(self):
+        # One day; returns True once a stop condition has fired
+        self.update()
+        if not self.stop_reason:
+            self.expose_lycanthrope()
+        self.incidence.end_day()
+        self.progress.update(self.time,
+                             humans=self.count_compartment("humans"),
+                             werewolves=self.count_compartment("werewolves"),
+                             graves=self.count_compartment("graves"),
+                             healing=self.count_compartment("waiting_wolves"))
+        if self.memory and self.memory.due(self.time):
+            self.memory.sample(self.time, self)
+        stopped = self.should_stop()
+        if self.enable_reporting and (stopped or self.time % self.parameters.report_interval_days == 0):
+            # End of the day, after the feed, so a stopped run records the night it stopped on
+            self.report_step(force=stopped)
+        if stopped:
+            self.progress.event(f"Stopping on day {self.stop_day}: {self.stop_reason}",
+                                day=self.stop_day, reason=self.stop_reason)
+            return True
+        return False
+
+    def run(self, days, observer=None):
+        # observer(demo) is called after every day, the stopping day included; a true return ends the run there
+        for n in range(days):
+            stopped = self.step()
+            if observer and observer(self):
+                break
+            if stopped:
+                break
+            if n % DAYS_YEAR == HALLOWEEN_DAY:
+                self.progress.event("Happy Halloween!", day=self.time)
+        return self.stop_reason
+
+    def phase(self, name):
+        # Peak memory for a stretch of the run, when memory accounting is on
+        if self.memory:
+            return self.memory.phase(name)
+        return contextlib.nullcontext()
+
+    def stop(self, reason):
+        self.stop_reason = reason
+        self.stop_day = self.time
+
+    def should_stop(self):
+        if self.stop_reason is None:
+            for condition in self.stop_conditions:
+                reason = condition.check(self)
+                if reason:
+                    self.stop(reason)
+                    break
+        return self.stop_reason is not None
+
+    def days_until_halloween(self):
+        return -self.time % HALLOWEEN_DAY
+
+    def has_patient_zero_candidate(self, days_ahead=0):
+        min_age_exposure = self.min_age_werewolf_years * DAYS_YEAR - days_ahead
+        return bool((batch.get_ages(self.humans) > min_age_exposure).any())
+
+    def count_compartment(self, compartment):
+        if compartment == "humans":
+            return self.total(self.humans) - self.total(self.waiting_wolves)
+        if compartment == "waiting_wolves":
+            return self.total(self.waiting_wolves)
+        if compartment == "werewolves":
+            return self.total(self.werewolves)
+        return self.grave_people if self.weights else len(self.graves)
+
+    def role_counts(self):
+        return {
+            "humans": {CIVILIAN: self.total(self.humans) - self.total(self.hunters), HUNTER: self.total(self.hunters)},
+            "werewolves": {role: self.total(self.werewolves.strata[role]) for role in ROLES},
+            "graves": dict(self.graves_by_role),
+            "slain_werewolves": dict(self.slain_by_role)
+        }
+
+    def report_row(self):
+        # TODO: counting humans minus incubating. Not sure what happens if incubating is bitten.
+        row = {
+            "humans": self.count_compartment("humans"),
+            "werewolves": self.count_compartment("werewolves"),
+            "waiting_wolves": self.count_compartment("waiting_wolves"),
+            "graves": self.count_compartment("graves"),
+            "births": self.births,
+            "natural_deaths": self.natural_deaths,
+            "hunters": self.total(self.hunters),
+            "hunter_werewolves": self.total(self.werewolves.strata[HUNTER]),
+            "hunter_graves": self.graves_by_role[HUNTER],
+            "slain_werewolves": sum(self.slain_by_role.values()),
+            "tested": self.tests_given,
+            "positives": self.positive_tests
+        }
+        if self.parameters.report_incidence:
+            row.update(self.incidence.snapshot())
+        if self.age_histogram:
+            row["age_histogram"] = self.age_histogram.snapshot()
+        return row
+
+    def report_step(self, force=False):
+        # With report_changes_only a day is only recorded when some series moved
+        row = self.report_row()
+        if self.parameters.report_changes_only and row == self.last_report_row and not force:
+            return
+        self.last_report_row = row
+        self.last_report_day = self.time
+        self.report["timestep"].append(self.time)
+        for name, value in row.items():
+            if name == "age_histogram":
+                for compartment, counts in value.items():
+                    self.report["age_histogram"][compartment].append(counts)
+            else:
+                self.report[name].append(value)
+
+    def finish_report(self):
+        # Closes the event log and adds the end-of-run entries; returns the report
+        if self.event_log:
+            self.event_log.close()
+        params = self.parameters
+        if (params.report_interval_days > 1 or params.report_changes_only) and self.last_report_day != self.time:
+            # A sparse cadence still records the last day, so decoding knows where the run ended
+            self.report_step(force=True)
+        for name, value in list(self.report.items()):
+            if isinstance(value, report_encoding.DeltaSeries):
+                self.report[name] = value.to_dict()
+            elif name == "age_histogram":
+                self.report[name] = {compartment: series.to_dict() if isinstance(series, report_encoding.DeltaSeries)
+                                     else series for compartment, series in value.items()}
+        self.report["stop_reason"] = self.stop_reason
+        self.report["stop_day"] = self.stop_day
+        if self.memory:
+            self.memory.sample(self.time, self)
+            self.memory.stop()
+            self.report["memory"] = self.memory.summary()
+        return self.report
+
+    def write_report(self, filename="werewolf_report.json"):
+        save_report(self.finish_report(), filename)
+        return self.report
+
+    def terminate_report(self):
+        self.write_report()
+        sys.exit()
+
+class DtkPerson(object):
+    def __init__(self, person_id:int):
+        self.id = person_id
+        pass
+
+    def serialize_me(self):
+        my_j = json.loads(dgi.serialize(self.id))
+        self.individual_json = my_j["individual"]
+
+    def get_age(self):
+        self.serialize_me()
+        return self.individual_json["m_age"]
+
+    def is_male(self):
+        self.serialize_me()
+        gender_int = self.individual_json["m_gender"]
+        if gender_int == 1:
+            return True
+        else:
+            return False
+
+    def get_mcw(self):
+        self.serialize_me()
+        return self.individual_json["m_mc_weight"]
+    pass
+
+
+def save_report(report, filename="werewolf_report.json"):
+    # For a report that's already finished; write_report() finishes and saves in one go
+    with open(filename,'w') as outfile:
+        json.dump(report, outfile, indent=4, sort_keys=True)
+
+
+def build_incubation(parameters):
+    if parameters.incubation == "queue":
+        return incubation.QueueIncubation(parameters.wolf_waiting_period)
+    return incubation.IntrahostIncubation(batch)
+
+
+def simulate(parameters, days=20 * DAYS_YEAR, seed=None, population_strategy=None, show_progress=False,
+             observer=None):
+    # One run in this interpreter; the intrahost module is reset first so runs can follow each other.
+    # Every way of running the model (cli, daemon, ensemble, replicates, surrogate, calibration) comes here.
+    dgi.reset()
+    if seed is not None and hasattr(dgi, "seed"):
+        dgi.seed(seed)
+    demo = WerewolfDemo(parameters=parameters, seed=seed)
+    if demo.memory:
+        demo.memory.start()
+    with demo.phase("population"):
+        (population_strategy or population.DemographicsPopulation()).populate(demo)
+    with (demo.progress if show_progress else contextlib.nullcontext()), demo.phase("run"):
+        demo.run(days, observer)
+    if demo.parameters.column_directory is not None:
+        # Out-of-core column files are as big as the population; don't keep them past the run
+        dgi.reset()
+        dgi.use_column_store(None)
+    return demo
+
+
+def main(population_strategy=None, incubation_kind=None, config_filename="werewolf_config.json",
+         days=20 * DAYS_YEAR):
+    # What each numbered script runs: a reporting run of one variant, written to werewolf_report.json
+    parameters = werewolf_params.load_parameters(config_filename).override(
+        incubation=incubation_kind, debug=False, enable_reporting=True)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    demo = simulate(parameters, days, population_strategy=population_strategy, show_progress=True)
+    demo.terminate_report()
+
+
+# DONE: Move to using intrahost: Incubation for 'waiting werewolves'
+# TODO: use infectiousness for hunger
+# DONE: Move to using node demographics to create population
+# DONE: Fertility / mortality, as vital_dynamics (rates from the parameters, not node demographics)
+# DONE: Hunters, as an index in the engine rather than individual properties
+# DONE: Diagnostic intervention for 'werewolf test?' (testing_campaign)
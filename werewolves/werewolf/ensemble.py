@@ -0,0 +1,166 @@
+# Streaming summaries of many replicates. EnsembleAggregator takes each run's
+# compartment counts one day at a time and keeps, per day and compartment, a
+# Welford running mean and variance and a P-square sketch (Jain and Chlamtac,
+# 1985) for each quantile: five markers whose heights track the quantile
+# without keeping the observations. Memory depends on days x compartments x
+# quantiles, not on the number of replicates, and the summary is ready when the
+# last run ends.
+#
+#   aggregator = EnsembleAggregator(days=3650)
+#   for seed in range(10000):
+#       engine.simulate(parameters, 3650, seed, population, observer=aggregator.observe)
+#       aggregator.end_run()
+#   aggregator.summary()
+#
+# Only the current run is held in full; at its end every day, compartment and
+# quantile is updated at once with array operations.
+
+import numpy as np
+
+COMPARTMENTS = ("humans", "waiting_wolves", "werewolves", "graves")
+QUANTILES = (0.05, 0.5, 0.95)
+# P-square marker count
+MARKERS = 5
+
+
+class EnsembleAggregator(object):
+    def __init__(self, compartments=COMPARTMENTS, quantiles=QUANTILES, days=None):
+        # With days set, a run that stops early keeps its last counts to the end of the
+        # horizon (stops are absorbing: extinction, the outbreak dying out); otherwise
+        # each day only summarizes the runs that reached it.
+        self.compartments = tuple(compartments)
+        self.quantiles = np.asarray(quantiles, dtype=float)
+        self.days = days
+        self.runs = 0
+        self.current = []
+        shape = (0, len(self.compartments))
+        self.count = np.zeros(0, dtype=np.int64)
+        self.mean = np.zeros(shape)
+        self.m2 = np.zeros(shape)
+        # Marker heights and positions (1-based), per day, compartment and quantile
+        self.heights = np.zeros(shape + (len(self.quantiles), MARKERS))
+        self.positions = np.zeros(shape + (len(self.quantiles), MARKERS))
+        # Desired-position increments per quantile, as in the paper
+        p = self.quantiles[:, None]
+        self.increments = np.hstack([np.zeros_like(p), p / 2, p, (1 + p) / 2, np.ones_like(p)])
+
+    def observe(self, demo):
+        # Fits WerewolfDemo.run's observer hook: one day of the current run
+        self.current.append([demo.count_compartment(compartment) for compartment in self.compartments])
+
+    def end_run(self):
+        if self.current:
+            self.add_run(self.current)
+        self.current = []
+
+    def grow(self, days):
+        extra = days - len(self.count)
+        if extra <= 0:
+            return
+        self.count = np.concatenate([self.count, np.zeros(extra, dtype=np.int64)])
+        for name in ("mean", "m2", "heights", "positions"):
+            values = getattr(self, name)
+            setattr(self, name, np.concatenate([values, np.zeros((extra,) + values.shape[1:])]))
+
+    def add_run(self, counts):
+        # counts is days x compartments for one replicate
+        counts = np.asarray(counts, dtype=float).reshape(-1, len(self.compartments))
+        if self.days is not None:
+            counts = counts[:self.days]
+            if len(counts) < self.days:
+                counts = np.concatenate([counts, np.repeat(counts[-1:], self.days - len(counts), axis=0)])
+        days = len(counts)
+        self.grow(days)
+        self.runs += 1
+        self.count[:days] += 1
+        n = self.count[:days, None]
+        delta = counts - self.mean[:days]
+        self.mean[:days] += delta / n
+        self.m2[:days] += delta * (counts - self.mean[:days])
+        self.update_sketches(counts, self.count[:days])
+
+    def update_sketches(self, counts, n):
+        heights = self.heights[:len(counts)]
+        positions = self.positions[:len(counts)]
+        x = np.broadcast_to(counts[:, :, None], heights.shape[:-1])
+        # The first five observations of a day are kept as they are, then sorted into markers
+        filling = n <= MARKERS
+        if filling.any():
+            days = np.flatnonzero(filling)
+            heights[days, ..., n[days] - 1] = x[days]
+            ready = days[n[days] == MARKERS]
+            heights[ready] = np.sort(heights[ready], axis=-1)
+            positions[ready] = np.arange(1, MARKERS + 1)
+        days = np.flatnonzero(~filling)
+        if len(days):
+            # Fancy indexing copies, so the updated markers are written back
+            q, positions_now = heights[days], positions[days]
+            self.step_markers(q, positions_now, x[days], n[days])
+            heights[days] = q
+            positions[days] = positions_now
+
+    def step_markers(self, q, positions, x, n):
+        # One P-square update for every cell at once; q and positions are cells x 5
+        q = q.reshape(-1, MARKERS)
+        positions = positions.reshape(-1, MARKERS)
+        shape = x.shape
+        x = x.reshape(-1)
+        cells = np.arange(len(x))
+        q[:, 0] = np.minimum(q[:, 0], x)
+        q[:, -1] = np.maximum(q[:, -1], x)
+        # Cell k holds x when q[k] <= x < q[k+1]
+        k = np.clip((x[:, None] >= q[:, 1:-1]).sum(axis=1), 0, MARKERS - 2)
+        positions += np.arange(MARKERS) > k[:, None]
+        # Desired positions after n observations
+        desired = (1 + (np.broadcast_to(n[:, None, None], shape) - 1)[..., None] * self.increments)
+        desired = desired.reshape(-1, MARKERS)
+        for i in range(1, MARKERS - 1):
+            d = desired[:, i] - positions[:, i]
+            move = ((d >= 1) & (positions[:, i + 1] - positions[:, i] > 1)) | \
+                   ((d <= -1) & (positions[:, i - 1] - positions[:, i] < -1))
+            if not move.any():
+                continue
+            d = np.sign(d[move])
+            rows = cells[move]
+            qm, qi, qp = q[rows, i - 1], q[rows, i], q[rows, i + 1]
+            nm, ni, np_ = positions[rows, i - 1], positions[rows, i], positions[rows, i + 1]
+            parabolic = qi + d / (np_ - nm) * ((ni - nm + d) * (qp - qi) / (np_ - ni) +
+                                               (np_ - ni - d) * (qi - qm) / (ni - nm))
+            neighbour = np.where(d > 0, qp, qm)
+            neighbour_position = np.where(d > 0, np_, nm)
+            linear = qi + d * (neighbour - qi) / (neighbour_position - ni)
+            q[rows, i] = np.where((qm < parabolic) & (parabolic < qp), parabolic, linear)
+            positions[rows, i] += d
+
+    def variance(self):
+        return self.m2 / np.maximum(self.count[:, None] - 1, 1)
+
+    def quantile(self, index):
+        # Estimate of self.quantiles[index] per day and compartment; exact up to five runs a day
+        estimate = self.heights[:, :, index, MARKERS // 2].copy()
+        for day in np.flatnonzero(self.count <= MARKERS):
+            if self.count[day]:
+                seen = self.heights[day, :, index, :self.count[day]]
+                estimate[day] = np.quantile(seen, self.quantiles[index], axis=-1)
+        return estimate
+
+    def summary(self):
+        summary = {"runs": self.runs, "count": self.count.tolist()}
+        std = np.sqrt(self.variance())
+        estimates = [self.quantile(index) for index in range(len(self.quantiles))]
+        for c, compartment in enumerate(self.compartments):
+            summary[compartment] = {"mean": self.mean[:, c].tolist(), "std": std[:, c].tolist()}
+            for p, estimate in zip(self.quantiles, estimates):
+                summary[compartment][f"q{round(100 * p):02d}"] = estimate[:, c].tolist()
+        return summary
+
+
+def run_ensemble(parameters, replicates, days, population_strategy=None, first_seed=0, aggregator=None):
+    # Replicates one after another in this interpreter, without keeping their reports
+    from . import engine
+    aggregator = aggregator or EnsembleAggregator(days=days)
+    parameters = parameters.override(enable_reporting=False)
+    for seed in range(first_seed, first_seed + replicates):
+        engine.simulate(parameters, days, seed, population_strategy, observer=aggregator.observe)
+        aggregator.end_run()
+    return aggregator
@@ -0,0 +1,95 @@
+# Append-only binary log of per-agent events, for rebuilding transmission chains.
+# Each event is a fixed-width 13 byte record: day (uint32), event type (uint8),
+# agent (uint32) and source werewolf (int32, NO_SOURCE if there isn't one).
+# Records are packed into a preallocated buffer and written out a batch at a time.
+
+import struct
+
+import numpy as np
+
+BITTEN = 1   # survived a bite, now incubating
+KILLED = 2   # died from a bite
+TURNED = 3   # finished incubating, now a werewolf
+SPAWNED = 4  # Halloween patient zero
+BORN = 5     # newborn, possibly in a recycled agent slot
+DIED = 6     # natural death, the agent's slot may be reused by a later birth
+TESTED_POSITIVE = 7  # positive "werewolf test?" diagnostic
+SLAIN = 8    # werewolf killed by a hunter, source is the hunter
+
+EVENT_NAMES = {
+    BITTEN: "bitten",
+    KILLED: "killed",
+    TURNED: "turned",
+    SPAWNED: "spawned",
+    BORN: "born",
+    DIED: "died",
+    TESTED_POSITIVE: "tested_positive",
+    SLAIN: "slain"
+}
+
+NO_SOURCE = -1
+
+RECORD = struct.Struct('<IBIi')
+RECORD_DTYPE = np.dtype([('day', '<u4'), ('event', 'u1'), ('agent', '<u4'), ('source', '<i4')])
+
+
+class EventLog(object):
+    def __init__(self, filename, batch_size=65536):
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be positive, got {batch_size}.")
+        self.filename = filename
+        self.batch_size = batch_size
+        self.buffer = bytearray(batch_size * RECORD.size)
+        self.pending = 0
+        self.total = 0
+        self.outfile = open(filename, 'wb')
+
+    def log(self, day, event, agent, source=NO_SOURCE):
+        RECORD.pack_into(self.buffer, self.pending * RECORD.size, day, event, agent, source)
+        self.pending += 1
+        if self.pending == self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            self.outfile.write(memoryview(self.buffer)[:self.pending * RECORD.size])
+            self.total += self.pending
+            self.pending = 0
+        self.outfile.flush()
+
+    def close(self):
+        if not self.outfile.closed:
+            self.flush()
+            self.outfile.close()
+
+    def count(self):
+        return self.total + self.pending
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def read_events(filename):
+    return np.fromfile(filename, dtype=RECORD_DTYPE)
+
+
+def transmission_tree(events):
+    # victim -> (source werewolf, day bitten), for every survived bite with a known source
+    bites = events[(events['event'] == BITTEN) & (events['source'] != NO_SOURCE)]
+    return {int(e['agent']): (int(e['source']), int(e['day'])) for e in bites}
+
+
+def infection_chain(tree, agent):
+    # Walks back from agent to the werewolf at the root of its chain
+    chain = [agent]
+    seen = {agent}
+    while chain[-1] in tree:
+        source = tree[chain[-1]][0]
+        if source in seen:
+            break
+        chain.append(source)
+        seen.add(source)
+    return chain
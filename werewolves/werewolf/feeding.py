@@ -0,0 +1,63 @@
+# Who a werewolf feeds on. WellMixedFeeding draws from every human; SpatialFeeding
+# gives each agent a home in a square world and wolves feed within a radius of
+# their own. The engine tells the strategy when people arrive, stop being human
+# (leave) or are gone for good (forget).
+
+from .spatial_index import SpatialGrid
+
+
+class WellMixedFeeding(object):
+    def add(self, demo, h):
+        pass
+
+    def add_near(self, h, relative):
+        pass
+
+    def leave(self, h):
+        pass
+
+    def forget(self, h):
+        pass
+
+    def choose_victim(self, demo, n, person_level=False):
+        if person_level:
+            return demo.choose_person()
+        return demo.humans[int(demo.rng.integers(len(demo.humans)))]
+
+
+class SpatialFeeding(object):
+    def __init__(self, extent, feeding_radius):
+        self.extent = extent
+        self.feeding_radius = feeding_radius
+        self.grid = SpatialGrid(extent, feeding_radius)
+        self.homes = {}
+
+    def place(self, h, x, y):
+        self.homes[h] = (x, y)
+        self.grid.add(h, x, y)
+
+    def add(self, demo, h):
+        self.place(h, *(demo.rng.random(2) * self.extent))
+
+    def add_near(self, h, relative):
+        # Newborns and split-off agents live with their mother or source agent
+        self.place(h, *self.homes[relative])
+
+    def leave(self, h):
+        # Werewolves keep their home but are no longer on the menu
+        self.grid.discard(h)
+
+    def forget(self, h):
+        self.grid.discard(h)
+        self.homes.pop(h, None)
+
+    def choose_victim(self, demo, n, person_level=False):
+        # Wolves take turns feeding, each near their own home; None if nobody is in reach
+        source = demo.werewolves[(demo.time + n) % len(demo.werewolves)]
+        return self.grid.choose_near(*self.homes[source], self.feeding_radius, demo.rng)
+
+
+def build_feeding(parameters):
+    if parameters.spatial_extent is not None:
+        return SpatialFeeding(parameters.spatial_extent, parameters.feeding_radius)
+    return WellMixedFeeding()
@@ -0,0 +1,58 @@
+# Rolling-window incidence. Each event keeps the last max(windows) daily totals
+# in a fixed ring buffer plus a running sum per window: closing a day adds its
+# total to every sum and takes away the day that just left each window, so
+# updates and queries cost the number of windows, whatever the run length.
+#
+# Events: deaths (fatal bites), bites (bites survived, so infections) and
+# turnings (incubations finished). Counts are in people, so weighted agents
+# count for their weight.
+
+import numpy as np
+
+EVENTS = ("deaths", "bites", "turnings")
+WINDOWS = (7, 28, 365)
+
+
+class RollingIncidence(object):
+    def __init__(self, windows=WINDOWS, events=EVENTS):
+        self.windows = tuple(sorted(windows))
+        self.events = tuple(events)
+        self.length = max(self.windows)
+        self.buffer = np.zeros((len(self.events), self.length))
+        self.sums = np.zeros((len(self.events), len(self.windows)))
+        self.today = np.zeros(len(self.events))
+        self.days = 0
+        self.index = {event: e for e, event in enumerate(self.events)}
+        self.window_index = {window: w for w, window in enumerate(self.windows)}
+
+    def record(self, event, count=1.0):
+        self.today[self.index[event]] += count
+
+    def end_day(self):
+        slot = self.days % self.length
+        for w, window in enumerate(self.windows):
+            # The day window days back drops out; before the buffer has that many days it is a zero
+            if self.days >= window:
+                self.sums[:, w] -= self.buffer[:, (self.days - window) % self.length]
+        self.buffer[:, slot] = self.today
+        self.sums += self.today[:, None]
+        self.today[:] = 0.0
+        self.days += 1
+
+    def total(self, event, window):
+        # People over the last `window` closed days
+        if window not in self.window_index:
+            raise ValueError(f"No {window} day incidence window; the windows are {self.windows}.")
+        return float(self.sums[self.index[event], self.window_index[window]])
+
+    def rate(self, event, window):
+        # Per day, over the days seen so far while the window is still filling
+        return self.total(event, window) / max(min(window, self.days), 1)
+
+    def full(self, window):
+        return self.days >= window
+
+    def snapshot(self):
+        # {"deaths_7d": total, ...} for the report
+        return {f"{event}_{window}d": float(self.sums[e, w])
+                for e, event in enumerate(self.events) for w, window in enumerate(self.windows)}
@@ -0,0 +1,41 @@
+# How bitten people wait before turning. The engine keeps everyone waiting in
+# demo.waiting_wolves (they stay in demo.humans too); a strategy only starts
+# the wait and says who is done today.
+
+import numpy as np
+
+
+class IntrahostIncubation(object):
+    # The intrahost module's incubation period (gi.json), as in 3_lycanthrope
+    def __init__(self, batch):
+        self.batch = batch
+
+    def start(self, demo, bitten):
+        self.batch.force_infect_many(bitten)
+
+    def turned(self, demo):
+        # Only waiting wolves are infected, so only they can have turned
+        if not demo.waiting_wolves:
+            return []
+        waiting = np.array(demo.waiting_wolves)
+        return waiting[self.batch.infected_mask(waiting) & ~self.batch.incubating_mask(waiting)].tolist()
+
+
+class QueueIncubation(object):
+    # Everyone bitten on a day turns wait_days later (wolf_waiting_period), as in
+    # the 1_ and 2_ models' WaitingQueue
+    def __init__(self, wait_days):
+        if wait_days is None or wait_days < 1:
+            raise ValueError(f"QueueIncubation needs a wait of at least 1 day, got {wait_days}.")
+        self.wait_days = wait_days
+        self.due = {}
+
+    def start(self, demo, bitten):
+        self.due.setdefault(demo.time + self.wait_days, []).extend(bitten)
+
+    def turned(self, demo):
+        due = self.due.pop(demo.time, None)
+        if not due:
+            return []
+        # Some of them were killed by a later bite or died in the meantime
+        return [h for h in due if h in demo.waiting_wolves]
@@ -0,0 +1,102 @@
+# Empirical incubation period distribution for a dgi parameter set.
+# Force-infects a cohort once, advances it with the batch facade and records the
+# exact day each agent stops incubating. The cohort is split across worker
+# processes; each worker gets its own intrahost state, set up from gi_params.
+#
+#   python -m werewolf.incubation_profile gi_SPOOKY.json --agents 1000000 --processes 8
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from . import dgi_batch
+from . import intrahost
+
+NOT_TURNED = -1
+NOT_INFECTED = -2
+
+
+def profile_chunk(gi_params, agents, max_days, seed, age_days=7300):
+    dgi = intrahost.load_intrahost()
+    intrahost.configure(dgi, gi_params)
+    if seed is not None and hasattr(dgi, "seed"):
+        dgi.seed(seed)
+    batch = dgi_batch.BatchIntrahost(dgi)
+    cohort = np.array(batch.create_many(np.arange(agents) % 2, np.full(agents, float(age_days)),
+                                        np.ones(agents)), dtype=np.int64)
+    batch.force_infect_many(cohort)
+    turn_days = np.full(agents, NOT_TURNED, dtype=np.int32)
+    infected = batch.infected_mask(cohort)
+    turn_days[~infected] = NOT_INFECTED
+    waiting = np.flatnonzero(infected)
+    day = 0
+    # Day 0 catches zero length incubation; only the still-incubating agents are advanced
+    while waiting.size and day <= max_days:
+        handles = cohort[waiting]
+        turned = ~batch.incubating_mask(handles)
+        turn_days[waiting[turned]] = day
+        waiting = waiting[~turned]
+        if waiting.size:
+            batch.update_many(cohort[waiting])
+        day += 1
+    return turn_days
+
+
+class IncubationProfile(object):
+    def __init__(self, turn_days):
+        self.turn_days = turn_days
+        self.turned = turn_days[turn_days >= 0]
+        # Agents the forced infection took
+        self.infected = int(np.count_nonzero(turn_days != NOT_INFECTED))
+
+    def histogram(self):
+        # counts[d] is the number of agents whose incubation lasted exactly d days
+        return np.bincount(self.turned)
+
+    def quantiles(self, probabilities=(0.05, 0.25, 0.5, 0.75, 0.95)):
+        return dict(zip(probabilities, np.quantile(self.turned, probabilities).tolist()))
+
+    def fraction_incubating(self, day):
+        return float(np.count_nonzero((self.turn_days == NOT_TURNED) | (self.turn_days > day))) / self.turn_days.size
+
+    def summary(self):
+        return {
+            "agents": int(self.turn_days.size),
+            "infected": self.infected,
+            "not_turned": int(self.infected - self.turned.size),
+            "mean": float(self.turned.mean()) if self.turned.size else None,
+            "std_dev": float(self.turned.std()) if self.turned.size else None,
+            "quantiles": self.quantiles() if self.turned.size else {}
+        }
+
+
+def profile_incubation(gi_params, agents=100000, processes=None, max_days=3650, seed=None):
+    processes = processes or os.cpu_count() or 1
+    chunks = [len(chunk) for chunk in np.array_split(np.arange(agents), processes) if len(chunk)]
+    seeds = np.random.SeedSequence(seed).generate_state(len(chunks))
+    # Always in worker processes, even for one chunk: profiling resets the intrahost module
+    with ProcessPoolExecutor(max_workers=len(chunks)) as pool:
+        results = pool.map(profile_chunk, [gi_params] * len(chunks), chunks,
+                           [max_days] * len(chunks), [int(s) for s in seeds])
+        return IncubationProfile(np.concatenate(list(results)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Profile the incubation period of a dgi parameter set.")
+    parser.add_argument("gi_config", help="gi.json style intrahost parameters")
+    parser.add_argument("--agents", type=int, default=100000)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--max-days", type=int, default=3650)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    with open(args.gi_config) as infile:
+        gi_params = json.load(infile)
+    profile = profile_incubation(gi_params, agents=args.agents, processes=args.processes,
+                                 max_days=args.max_days, seed=args.seed)
+    print(json.dumps(profile.summary(), indent=4))
+    for day, count in enumerate(profile.histogram()):
+        if count:
+            print(f"{day}\t{count}")
@@ -0,0 +1,64 @@
+# Picks the intrahost and node demographics modules the models run against.
+# Set WEREWOLF_INTRAHOST=standin to use the pure python stand-ins
+# (standin_intrahost / standin_nodedemog) instead of the DTK wheels, e.g. on
+# machines where dtk_generic_intrahost can't be installed.
+
+import importlib
+import json
+import os
+
+BACKEND_VARIABLE = "WEREWOLF_INTRAHOST"
+BACKENDS = {
+    "dtk": ("dtk_generic_intrahost", "dtk_nodedemog"),
+    # Relative names are modules of this package
+    "standin": (".standin_intrahost", ".standin_nodedemog")
+}
+
+
+def backend_name():
+    name = os.environ.get(BACKEND_VARIABLE, "dtk").lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown {BACKEND_VARIABLE} {name}, expected one of {sorted(BACKENDS)}.")
+    return name
+
+
+def load_intrahost():
+    return importlib.import_module(BACKENDS[backend_name()][0], __package__)
+
+
+def load_nodedemog():
+    return importlib.import_module(BACKENDS[backend_name()][1], __package__)
+
+
+_scratch = {}
+
+
+def configure(dgi, gi_params):
+    # The stand-in takes parameters directly; the DTK module reads gi.json from the
+    # working directory, so the process moves into one scratch directory (made the first
+    # time) and gi.json there is rewritten whenever the parameters change.
+    if hasattr(dgi, "configure"):
+        dgi.configure(gi_params)
+    else:
+        if "directory" not in _scratch:
+            import atexit
+            import shutil
+            import tempfile
+            _scratch["directory"] = tempfile.mkdtemp(prefix="werewolf_intrahost_")
+            atexit.register(shutil.rmtree, _scratch["directory"], ignore_errors=True)
+        text = json.dumps(gi_params)
+        if _scratch.get("gi_params") != text:
+            with open(os.path.join(_scratch["directory"], "gi.json"), 'w') as outfile:
+                outfile.write(text)
+            _scratch["gi_params"] = text
+        if os.getcwd() != _scratch["directory"]:
+            os.chdir(_scratch["directory"])
+    dgi.reset()
+
+
+def use_column_store(dgi, directory, chunk_size):
+    # Out-of-core agent state; only the stand-in keeps its columns where we can put them
+    if hasattr(dgi, "use_column_store"):
+        dgi.use_column_store(directory, chunk_size)
+    elif directory is not None:
+        raise ValueError(f"column_directory needs the stand-in intrahost ({BACKEND_VARIABLE}=standin).")
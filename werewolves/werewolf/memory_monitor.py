@@ -0,0 +1,145 @@
+# Opt-in memory accounting for long runs. Every interval_days the monitor sizes
+# each container the model holds (graves, report lists, queues, indexes), asks
+# the intrahost module for its own footprint, and takes a tracemalloc snapshot of
+# the top allocating lines. phase() records the RSS change and the traced peak
+# for a stretch of the run (population, run, report). Everything ends up in summary(),
+# which the model writes into its report.
+
+import contextlib
+import sys
+import time
+import tracemalloc
+from collections import deque
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+CONTAINERS = (list, tuple, set, frozenset, dict, deque)
+
+
+def deep_size(obj, seen=None):
+    # Bytes held by obj and everything it references through containers and
+    # plain objects; numpy arrays count their buffers, shared objects count once
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, np.ndarray):
+        return sys.getsizeof(obj) + (obj.nbytes if obj.base is None else 0)
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(key, seen) + deep_size(value, seen) for key, value in obj.items())
+    elif isinstance(obj, CONTAINERS):
+        size += sum(deep_size(item, seen) for item in obj)
+    elif hasattr(obj, "__dict__") and not isinstance(obj, type):
+        size += deep_size(vars(obj), seen)
+    return size
+
+
+def structure_sizes(model):
+    # One entry per container attribute of the model, largest first
+    sizes = {}
+    for name, value in vars(model).items():
+        if isinstance(value, CONTAINERS) or (hasattr(value, "__dict__") and hasattr(value, "__len__")):
+            sizes[name] = deep_size(value)
+    return dict(sorted(sizes.items(), key=lambda item: -item[1]))
+
+
+def peak_rss_bytes():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def current_rss_bytes():
+    try:
+        with open("/proc/self/statm") as infile:
+            return int(infile.read().split()[1]) * resource.getpagesize()
+    except (OSError, AttributeError):
+        return None
+
+
+class MemoryMonitor(object):
+    def __init__(self, interval_days=30, top_allocations=10, intrahost=None):
+        if interval_days < 1:
+            raise ValueError(f"interval_days must be at least 1, got {interval_days}.")
+        self.interval_days = interval_days
+        self.top_allocations = top_allocations
+        self.intrahost = intrahost
+        self.samples = []
+        self.phases = {}
+        self.started_tracing = False
+
+    def start(self):
+        # tracemalloc slows allocation down, so it only runs when top allocators are wanted
+        if self.top_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+
+    def stop(self):
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def due(self, day):
+        return day % self.interval_days == 0
+
+    def sample(self, day, model):
+        sample = {
+            "day": day,
+            "rss_bytes": current_rss_bytes(),
+            "process_peak_rss_bytes": peak_rss_bytes(),
+            "structures": structure_sizes(model)
+        }
+        memory_bytes = getattr(self.intrahost, "memory_bytes", None)
+        if memory_bytes:
+            sample["intrahost_bytes"] = memory_bytes()
+        if tracemalloc.is_tracing():
+            sample["traced_bytes"], sample["traced_peak_bytes"] = tracemalloc.get_traced_memory()
+            if self.top_allocations:
+                statistics = tracemalloc.take_snapshot().statistics("lineno")[:self.top_allocations]
+                sample["top_allocations"] = [{
+                    "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                    "bytes": stat.size,
+                    "count": stat.count
+                } for stat in statistics]
+        self.samples.append(sample)
+        return sample
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        # ru_maxrss only ever grows, so the phase gets its RSS change and the process peak so far;
+        # the traced peak is the phase's own where tracemalloc can reset it (3.9+)
+        if tracemalloc.is_tracing() and hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        started = time.perf_counter()
+        rss_before = current_rss_bytes()
+        try:
+            yield
+        finally:
+            rss_after = current_rss_bytes()
+            phase = {
+                "seconds": time.perf_counter() - started,
+                "rss_delta_bytes": None if rss_before is None or rss_after is None else rss_after - rss_before,
+                "process_peak_rss_bytes": peak_rss_bytes()
+            }
+            if tracemalloc.is_tracing():
+                phase["traced_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+            self.phases[name] = phase
+
+    def summary(self):
+        return {"interval_days": self.interval_days, "samples": self.samples, "phases": self.phases}
@@ -0,0 +1,82 @@
+# Where the initial humans come from. Every strategy goes through
+# demo.create_person_callback, so sampling, hunters and homes apply the same way.
+
+import json
+
+import numpy as np
+
+from . import intrahost
+
+DAYS_YEAR = 365
+
+
+class DemographicsPopulation(object):
+    # The node demographics module builds the people from nd.json and its
+    # demographics files. With a population_count, demographics.json is first
+    # written from the template with a Gaussian age distribution (2_lycanthrope).
+    def __init__(self, population_count=None, age_gaussian_mean=20, age_gaussian_sigma=7,
+                 template="demo_template.json", demographics="demographics.json"):
+        self.population_count = population_count
+        self.age_gaussian_mean = age_gaussian_mean
+        self.age_gaussian_sigma = age_gaussian_sigma
+        self.template = template
+        self.demographics = demographics
+
+    def define_population(self):
+        with open(self.template) as infile:
+            demog = json.load(infile)
+        demog["Nodes"][0]["NodeAttributes"]["InitialPopulation"] = self.population_count
+        demog["Nodes"][0]["IndividualAttributes"]["AgeDistribution1"] = self.age_gaussian_mean * DAYS_YEAR
+        demog["Nodes"][0]["IndividualAttributes"]["AgeDistribution2"] = self.age_gaussian_sigma * DAYS_YEAR
+        with open(self.demographics, "w") as outfile:
+            json.dump(demog, outfile, indent=4, sort_keys=True)
+
+    def populate(self, demo):
+        if self.population_count is not None:
+            self.define_population()
+        dnd = intrahost.load_nodedemog()
+        dnd.set_callback(demo.create_person_callback)
+        dnd.populate_from_files()
+
+
+class GaussianPopulation(object):
+    # Gaussian ages and a coin flip for sex, drawn in code (1_lycanthrope)
+    def __init__(self, population_count, age_gaussian_mean=20, age_gaussian_sigma=7, probability_male=0.5):
+        self.population_count = population_count
+        self.age_gaussian_mean = age_gaussian_mean
+        self.age_gaussian_sigma = age_gaussian_sigma
+        self.probability_male = probability_male
+
+    def populate(self, demo):
+        sexes = (demo.rng.random(self.population_count) < self.probability_male).astype(int)
+        ages = (demo.rng.normal(self.age_gaussian_mean, self.age_gaussian_sigma, self.population_count)
+                * DAYS_YEAR).astype(int)
+        for sex, age in zip(sexes.tolist(), ages.tolist()):
+            demo.create_person_callback(1.0, age, sex)
+
+
+class ReplayPopulation(object):
+    # The people from record_people, created again in every run that uses it
+    def __init__(self, people):
+        self.people = people
+
+    def populate(self, demo):
+        for mcw, age, gender in self.people:
+            demo.create_person_callback(mcw, age, gender)
+
+
+class _PeopleRecorder(object):
+    # Stands in for a WerewolfDemo while a strategy runs, keeping the people
+    def __init__(self, rng):
+        self.rng = rng
+        self.people = []
+
+    def create_person_callback(self, mcw, age, gender):
+        self.people.append((mcw, age, gender))
+
+
+def record_people(strategy, seed=0):
+    # The (mcw, age, gender) a strategy creates, to replay into many runs
+    recorder = _PeopleRecorder(np.random.default_rng(seed))
+    strategy.populate(recorder)
+    return recorder.people
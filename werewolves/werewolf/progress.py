@@ -0,0 +1,80 @@
+# Progress and telemetry for long runs, kept off the simulation thread.
+# The model only ever stores its latest counts or appends an event to a bounded
+# deque; a background thread wakes up every interval_seconds and turns those into
+# structured logging records. Nothing here touches stdin or blocks the model.
+
+import logging
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger("werewolves.progress")
+
+
+class ProgressReporter(object):
+    def __init__(self, interval_seconds=1.0, max_events_per_interval=20,
+                 max_pending_events=10000, log=None):
+        self.interval_seconds = interval_seconds
+        self.max_events_per_interval = max_events_per_interval
+        self.log = log or logger
+        self.snapshot = None
+        self.last_logged_snapshot = None
+        self.events = deque(maxlen=max_pending_events)
+        self.events_seen = 0
+        self.events_logged = 0
+        self.stopping = threading.Event()
+        self.thread = None
+
+    def update(self, day, **counts):
+        # Called every simulated day, so it is just an assignment
+        self.snapshot = (day, counts)
+
+    def event(self, message, **fields):
+        self.events_seen += 1
+        self.events.append((time.time(), message, fields))
+
+    def start(self):
+        if self.thread is None:
+            self.stopping.clear()
+            self.thread = threading.Thread(target=self._run, name="werewolf-progress", daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self):
+        if self.thread is not None:
+            self.stopping.set()
+            self.thread.join()
+            self.thread = None
+        self.flush(final=True)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def _run(self):
+        while not self.stopping.wait(self.interval_seconds):
+            self.flush()
+
+    def flush(self, final=False):
+        logged = 0
+        while self.events and logged < self.max_events_per_interval:
+            timestamp, message, fields = self.events.popleft()
+            self.log.info(message, extra={"event_time": timestamp, "fields": fields})
+            self.events_logged += 1
+            logged += 1
+        if final:
+            # deque(maxlen) silently drops the oldest events when we fall behind
+            self.events.clear()
+            suppressed = self.events_seen - self.events_logged
+            if suppressed:
+                self.log.info(f"{suppressed} events were not logged.",
+                              extra={"fields": {"suppressed": suppressed}})
+                self.events_logged = self.events_seen
+        snapshot = self.snapshot
+        if snapshot is not None and snapshot is not self.last_logged_snapshot:
+            day, counts = snapshot
+            summary = "\t".join(f"{name}: {count}" for name, count in counts.items())
+            self.log.info(f"Day {day}\t{summary}", extra={"day": day, "fields": counts})
+            self.last_logged_snapshot = snapshot
@@ -0,0 +1,181 @@
+# Adaptive replicate allocation. Instead of a fixed number of replicates per
+# scenario, each parameter point gets min_replicates, and from then on every
+# free worker gets a replicate of the point whose confidence interval is widest
+# relative to its target, until every target is met or the budget runs out.
+# Low-variance points stop early and the compute goes to the noisy ones.
+#
+# Outputs are "final_<compartment>" (the count on the last day, or the stopping
+# day) and "peak_<compartment>". A target is a confidence interval half-width,
+# absolute (5) or relative to the mean ("2%").
+#
+#   result = allocate([{"feed_death_probability": p} for p in (0.3, 0.6, 0.9)],
+#                     {"final_graves": 5, "peak_werewolves": "5%"}, budget=2000)
+
+import math
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from . import ensemble
+from . import population as populations
+from . import werewolf_params
+
+STATISTICS = ("final", "peak")
+
+_worker = {}
+
+
+def normal_quantile(probability):
+    # Inverse standard normal cdf by bisection on math.erf (statistics.NormalDist needs 3.8)
+    low, high = -10.0, 10.0
+    for step in range(100):
+        middle = (low + high) / 2
+        if 0.5 * (1 + math.erf(middle / math.sqrt(2))) < probability:
+            low = middle
+        else:
+            high = middle
+    return (low + high) / 2
+
+
+def parse_output(output):
+    statistic, separator, compartment = output.partition("_")
+    if statistic not in STATISTICS or compartment not in ensemble.COMPARTMENTS:
+        raise ValueError(f"Unknown output {output}; expected one of {', '.join(STATISTICS)} "
+                         f"followed by _ and one of {', '.join(ensemble.COMPARTMENTS)}.")
+    return statistic, compartment
+
+
+def parse_target(target):
+    # (half-width, relative)
+    if isinstance(target, str) and target.endswith("%"):
+        return float(target[:-1]) / 100, True
+    return float(target), False
+
+
+class OutputTracker(object):
+    # WerewolfDemo.run observer keeping only the final and peak counts it is asked for
+    def __init__(self, outputs):
+        self.outputs = {output: parse_output(output) for output in outputs}
+        self.values = {output: -math.inf if statistic == "peak" else None
+                       for output, (statistic, compartment) in self.outputs.items()}
+
+    def __call__(self, demo):
+        for output, (statistic, compartment) in self.outputs.items():
+            count = demo.count_compartment(compartment)
+            self.values[output] = max(self.values[output], count) if statistic == "peak" else count
+
+
+def replicate_outputs(parameters, population_strategy, days, outputs, seed):
+    # One run of engine.simulate; returns the outputs in order
+    from . import engine
+    tracker = OutputTracker(outputs)
+    engine.simulate(parameters, days, seed, population_strategy, observer=tracker)
+    return [tracker.values[output] for output in outputs]
+
+
+def init_worker(base_parameters, population, days, outputs):
+    # Runs once per worker process so the tasks only carry a point and a seed
+    _worker.update(base_parameters=base_parameters, population=populations.ReplayPopulation(population),
+                   days=days, outputs=outputs)
+
+
+def run_replicate(point, seed):
+    parameters = _worker["base_parameters"]._replace(**point).validate()
+    return replicate_outputs(parameters, _worker["population"], _worker["days"], _worker["outputs"], seed)
+
+
+class PointEstimate(object):
+    def __init__(self, point, outputs, targets, z):
+        self.point = point
+        self.outputs = outputs
+        self.targets = [parse_target(targets[output]) for output in outputs]
+        self.z = z
+        # Welford mean and variance per output; each replicate is a one-day run
+        self.aggregator = ensemble.EnsembleAggregator(compartments=outputs, quantiles=())
+        self.pending = 0
+
+    @property
+    def replicates(self):
+        return self.aggregator.runs
+
+    def add(self, values):
+        self.aggregator.add_run([values])
+
+    def half_widths(self, extra=0):
+        # Confidence interval half-widths after `extra` more replicates, if the variance holds
+        n = self.replicates
+        if n < 2:
+            return np.full(len(self.outputs), math.inf)
+        return self.z * np.sqrt(self.aggregator.variance()[0] / (n + extra))
+
+    def goals(self):
+        mean = np.abs(self.aggregator.mean[0]) if self.replicates else np.zeros(len(self.outputs))
+        return np.array([width * mean[i] if relative else width
+                         for i, (width, relative) in enumerate(self.targets)])
+
+    def shortfall(self):
+        # Largest ratio of half-width to target, counting the replicates already running
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratios = self.half_widths(self.pending) / self.goals()
+        ratios = np.where(np.isnan(ratios), 0.0, ratios)
+        return float(ratios.max())
+
+    def summary(self):
+        widths = self.half_widths()
+        return {
+            "point": self.point,
+            "replicates": self.replicates,
+            "converged": bool((widths <= self.goals()).all()),
+            "outputs": {output: {"mean": float(self.aggregator.mean[0, i]),
+                                 "std": float(math.sqrt(self.aggregator.variance()[0, i])),
+                                 "half_width": float(widths[i]),
+                                 "target": float(self.goals()[i])}
+                        for i, output in enumerate(self.outputs)}
+        }
+
+
+def allocate(points, targets, base_parameters=None, population=None, days=20 * 365,
+             budget=1000, min_replicates=10, confidence=0.95, processes=None, seed=None):
+    # Returns a summary per point, in the order given
+    outputs = sorted(targets)
+    for output in outputs:
+        parse_output(output)
+    if base_parameters is None:
+        base_parameters = werewolf_params.load_parameters()
+    base_parameters = base_parameters._replace(enable_reporting=False, debug=False)
+    if population is None:
+        population = populations.record_people(populations.DemographicsPopulation())
+    z = normal_quantile(0.5 + confidence / 2)
+    estimates = [PointEstimate(dict(point), outputs, targets, z) for point in points]
+    rng = np.random.default_rng(seed)
+    processes = processes or os.cpu_count() or 1
+    launched = 0
+
+    def next_point():
+        # Points still short of min_replicates first, then the widest interval relative to its target
+        starting = [e for e in estimates if e.replicates + e.pending < min_replicates]
+        if starting:
+            return min(starting, key=lambda e: e.replicates + e.pending)
+        estimate = max(estimates, key=lambda e: e.shortfall())
+        return estimate if estimate.shortfall() > 1.0 else None
+
+    with ProcessPoolExecutor(max_workers=processes, initializer=init_worker,
+                             initargs=(base_parameters, population, days, outputs)) as pool:
+        pending = {}
+        while True:
+            while len(pending) < 2 * processes and launched < budget:
+                estimate = next_point()
+                if estimate is None:
+                    break
+                pending[pool.submit(run_replicate, estimate.point, int(rng.integers(2 ** 32)))] = estimate
+                estimate.pending += 1
+                launched += 1
+            if not pending:
+                break
+            done, not_done = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                estimate = pending.pop(future)
+                estimate.pending -= 1
+                estimate.add(future.result())
+    return [estimate.summary() for estimate in estimates]
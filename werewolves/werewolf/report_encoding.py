@@ -0,0 +1,126 @@
+# Compact report series. Compartment counts sit still for most of a lunar cycle
+# and cumulative counters climb in steps, so a daily series is mostly runs of a
+# constant difference. DeltaSeries keeps such a series as [start, delta, count]
+# runs (value k of a run is start + delta * k) while it is being appended to,
+# and a run is only extended when that formula gives the value back exactly, so
+# decoding is lossless for ints and floats alike. Rows (lists, like the age
+# histogram's bands) are encoded column by column.
+#
+#   {"encoding": "delta-rle", "length": 7300, "runs": [[1000, 0, 29], [998, 0, 30], ...]}
+#
+# decode_report() turns an encoded report back into plain lists and, by default,
+# fills in the days a sparser reporting cadence skipped (encoded or not) by
+# carrying each recorded value forward, so the result has one entry per day.
+
+ENCODING = "delta-rle"
+# Report lists that aren't one value per recorded day
+NOT_SERIES = ("age_bands",)
+
+
+class DeltaSeries(object):
+    def __init__(self):
+        self.runs = []
+        self.columns = None
+        self.length = 0
+
+    def __len__(self):
+        return self.length
+
+    def append(self, value):
+        self.length += 1
+        if isinstance(value, (list, tuple)):
+            if self.columns is None:
+                self.columns = [DeltaSeries() for v in value]
+            for column, v in zip(self.columns, value):
+                column.append(v)
+            return
+        if self.runs:
+            run = self.runs[-1]
+            start, delta, count = run
+            if count == 1:
+                # A lone value takes whatever step comes next
+                delta = value - start
+            if start + delta * count == value:
+                run[1] = delta
+                run[2] = count + 1
+                return
+        self.runs.append([value, 0, 1])
+
+    def to_dict(self):
+        if self.columns is not None:
+            return {"encoding": ENCODING, "length": self.length, "columns": [c.to_dict() for c in self.columns]}
+        return {"encoding": ENCODING, "length": self.length, "runs": self.runs}
+
+
+def is_encoded(value):
+    return isinstance(value, dict) and value.get("encoding") == ENCODING
+
+
+def encode_series(values):
+    series = DeltaSeries()
+    for value in values:
+        series.append(value)
+    return series.to_dict()
+
+
+def decode_series(encoded):
+    if not is_encoded(encoded):
+        raise ValueError(f"Not a {ENCODING} series.")
+    if "columns" in encoded:
+        columns = [decode_series(column) for column in encoded["columns"]]
+        return [list(row) for row in zip(*columns)]
+    values = []
+    for start, delta, count in encoded["runs"]:
+        values.extend(start + delta * k for k in range(count))
+    return values
+
+
+def decode_report(report, daily=True):
+    # Dense reports go through too, so a sparse cadence is filled in whether or not it was encoded
+    decoded = {}
+    for name, value in report.items():
+        if is_encoded(value):
+            decoded[name] = decode_series(value)
+        elif isinstance(value, dict) and value and all(is_encoded(v) for v in value.values()):
+            decoded[name] = {key: decode_series(series) for key, series in value.items()}
+        else:
+            decoded[name] = value
+    if daily and isinstance(decoded.get("timestep"), list):
+        fill_days(decoded)
+    return decoded
+
+
+def series_names(report):
+    # Entries with one value per recorded day: lists as long as timestep, or dicts of them
+    length = len(report["timestep"])
+    names = []
+    for name, value in report.items():
+        if name in NOT_SERIES:
+            continue
+        if isinstance(value, list) and len(value) == length:
+            names.append(name)
+        elif (isinstance(value, dict) and value
+              and all(isinstance(v, list) and len(v) == length for v in value.values())):
+            names.append(name)
+    return names
+
+
+def fill_days(report):
+    # Carries each recorded value forward over the days the cadence skipped
+    days = report["timestep"]
+    if not days or len(days) == days[-1] - days[0] + 1:
+        return report
+    index = []
+    recorded = 0
+    for day in range(days[0], days[-1] + 1):
+        while recorded + 1 < len(days) and days[recorded + 1] <= day:
+            recorded += 1
+        index.append(recorded)
+    for name in series_names(report):
+        value = report[name]
+        if isinstance(value, dict):
+            report[name] = {key: [series[i] for i in index] for key, series in value.items()}
+        else:
+            report[name] = [value[i] for i in index]
+    report["timestep"] = list(range(days[0], days[-1] + 1))
+    return report
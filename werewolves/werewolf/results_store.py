@@ -0,0 +1,242 @@
+# Results store: one SQLite file for many runs instead of a werewolf_report.json
+# per run. Each run is keyed by its parameter set (a hash of the parameters),
+# its seed and the code version. Numeric parameters are indexed one row per
+# (run, name), so range queries over any parameter use the index; every report
+# time series goes in as fixed-length chunks of raw numpy bytes, and its final
+# value into a small table that SQL can aggregate without touching the series.
+#
+#   store = ResultsStore("results.db")
+#   store.add_run(parameters, demo.finish_report(), seed=7)
+#   runs = store.runs(where={"feed_death_probability": (0.6, 0.8)})
+#   store.aggregate("graves", where={"feed_death_probability": (0.6, 0.8)})
+#   mean_graves = store.mean_series([run["id"] for run in runs], "graves")
+
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+import numpy as np
+
+from . import report_encoding
+
+CHUNK_LENGTH = 4096
+GROUP_COLUMNS = ("parameter_key", "seed", "code_version")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    parameter_key TEXT NOT NULL,
+    seed INTEGER,
+    code_version TEXT NOT NULL,
+    created REAL NOT NULL,
+    days INTEGER NOT NULL,
+    stop_reason TEXT,
+    stop_day INTEGER,
+    parameters TEXT NOT NULL,
+    extra TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_key ON runs (parameter_key, seed, code_version);
+CREATE TABLE IF NOT EXISTS run_parameters (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    value REAL,
+    text TEXT
+);
+CREATE INDEX IF NOT EXISTS run_parameters_value ON run_parameters (name, value, run_id);
+CREATE INDEX IF NOT EXISTS run_parameters_text ON run_parameters (name, text, run_id);
+CREATE TABLE IF NOT EXISTS finals (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (name, run_id)
+);
+CREATE TABLE IF NOT EXISTS series (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    chunk INTEGER NOT NULL,
+    dtype TEXT NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (run_id, name, chunk)
+);
+"""
+
+
+@functools.lru_cache(maxsize=None)
+def code_version():
+    # The git commit of the checkout (with -dirty for local changes), else the installed version
+    import subprocess
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=package_dir, check=True,
+                                capture_output=True, text=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no", "."], cwd=package_dir,
+                               check=True, capture_output=True, text=True).stdout.strip()
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    try:
+        from importlib import metadata
+        return metadata.version("werewolf")
+    except Exception:
+        return "unknown"
+
+
+def parameter_dict(parameters):
+    # WerewolfParameters or a plain dict, as JSON-friendly values
+    if hasattr(parameters, "_asdict"):
+        parameters = parameters._asdict()
+    return json.loads(json.dumps(parameters))
+
+
+def parameter_key(parameters):
+    # Reporting, debug and column storage switches do not change the model, so they are not part of the key
+    values = {name: value for name, value in parameter_dict(parameters).items()
+              if name not in ("enable_reporting", "debug", "column_directory", "column_chunk_size")}
+    return hashlib.sha1(json.dumps(values, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def is_series(value):
+    return isinstance(value, list) and all(isinstance(v, (int, float)) for v in value)
+
+
+class ResultsStore(object):
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add_run(self, parameters, report, seed=None, version=None):
+        # Delta encoded reports are expanded to daily series, so runs line up day by day
+        report = report_encoding.decode_report(report)
+        parameters = parameter_dict(parameters)
+        series = {name: value for name, value in report.items() if is_series(value)}
+        extra = {name: value for name, value in report.items() if name not in series}
+        with self.connection:
+            run_id = self.connection.execute(
+                "INSERT INTO runs (parameter_key, seed, code_version, created, days, stop_reason, stop_day, "
+                "parameters, extra) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (parameter_key(parameters), seed, version or code_version(), time.time(),
+                 len(series.get("timestep", [])), report.get("stop_reason"), report.get("stop_day"),
+                 json.dumps(parameters, sort_keys=True), json.dumps(extra, sort_keys=True))).lastrowid
+            self.connection.executemany(
+                "INSERT INTO run_parameters (run_id, name, value, text) VALUES (?, ?, ?, ?)",
+                [(run_id, name, *self.parameter_row(value)) for name, value in parameters.items()])
+            self.connection.executemany(
+                "INSERT INTO finals (run_id, name, value) VALUES (?, ?, ?)",
+                [(run_id, name, values[-1]) for name, values in series.items() if values])
+            for name, values in series.items():
+                values = np.asarray(values, dtype=np.int64 if all(isinstance(v, int) for v in values)
+                                    else np.float64)
+                self.connection.executemany(
+                    "INSERT INTO series (run_id, name, chunk, dtype, data) VALUES (?, ?, ?, ?, ?)",
+                    [(run_id, name, start // CHUNK_LENGTH, values.dtype.str,
+                      values[start:start + CHUNK_LENGTH].tobytes())
+                     for start in range(0, len(values), CHUNK_LENGTH)])
+        return run_id
+
+    @staticmethod
+    def parameter_row(value):
+        # Numbers and flags go in value, so they range-query; strings in text; lists only live in runs
+        if isinstance(value, (bool, int, float)):
+            return float(value), None
+        if isinstance(value, str):
+            return None, value
+        return None, None
+
+    def where_clause(self, where=None, seed=None, version=None, key=None):
+        # where maps a parameter name to a value or an inclusive (low, high) range
+        clauses, arguments = [], []
+        for name, condition in (where or {}).items():
+            if isinstance(condition, (tuple, list)):
+                clauses.append("id IN (SELECT run_id FROM run_parameters WHERE name = ? AND value BETWEEN ? AND ?)")
+                arguments += [name, *condition]
+            elif isinstance(condition, str):
+                clauses.append("id IN (SELECT run_id FROM run_parameters WHERE name = ? AND text = ?)")
+                arguments += [name, condition]
+            else:
+                clauses.append("id IN (SELECT run_id FROM run_parameters WHERE name = ? AND value = ?)")
+                arguments += [name, float(condition)]
+        for column, value in (("seed", seed), ("code_version", version), ("parameter_key", key)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                arguments.append(value)
+        return " AND ".join(clauses) or "1", arguments
+
+    def runs(self, where=None, seed=None, version=None, key=None, with_parameters=False):
+        clause, arguments = self.where_clause(where, seed, version, key)
+        columns = "*" if with_parameters else \
+            "id, parameter_key, seed, code_version, created, days, stop_reason, stop_day"
+        rows = self.connection.execute(f"SELECT {columns} FROM runs WHERE {clause} ORDER BY id", arguments)
+        runs = [dict(row) for row in rows]
+        if with_parameters:
+            for run in runs:
+                run["parameters"] = json.loads(run["parameters"])
+                run["extra"] = json.loads(run["extra"])
+        return runs
+
+    def aggregate(self, name, where=None, seed=None, version=None, group_by="parameter_key"):
+        # Final value of a series over the matching runs, per group, computed in SQLite.
+        # The variance takes two passes, deviations from the group mean, since
+        # AVG(x * x) - AVG(x) * AVG(x) cancels badly for large counts and can go negative
+        if group_by not in GROUP_COLUMNS:
+            raise ValueError(f"Can only group by {', '.join(GROUP_COLUMNS)}, not {group_by}.")
+        clause, arguments = self.where_clause(where, seed, version)
+        rows = self.connection.execute(
+            f"WITH matched AS (SELECT runs.{group_by} AS grp, finals.value AS value "
+            f"FROM runs JOIN finals ON finals.run_id = runs.id AND finals.name = ? WHERE {clause}), "
+            f"means AS (SELECT grp, AVG(value) AS mean FROM matched GROUP BY grp) "
+            f"SELECT matched.grp AS {group_by}, COUNT(*) AS runs, means.mean AS mean, "
+            f"AVG((matched.value - means.mean) * (matched.value - means.mean)) AS variance, "
+            f"MIN(matched.value) AS min, MAX(matched.value) AS max "
+            f"FROM matched JOIN means ON means.grp IS matched.grp "
+            f"GROUP BY matched.grp ORDER BY matched.grp", [name, *arguments])
+        return [dict(row) for row in rows]
+
+    def chunks(self, run_id, name, start=0, stop=None):
+        # (first index, array) for the chunks overlapping [start, stop)
+        arguments = [run_id, name, start // CHUNK_LENGTH]
+        bound = ""
+        if stop is not None:
+            bound = " AND chunk <= ?"
+            arguments.append((stop - 1) // CHUNK_LENGTH)
+        rows = self.connection.execute(
+            f"SELECT chunk, dtype, data FROM series WHERE run_id = ? AND name = ? AND chunk >= ?{bound} "
+            f"ORDER BY chunk", arguments)
+        for chunk, dtype, data in rows:
+            yield chunk * CHUNK_LENGTH, np.frombuffer(data, dtype=dtype)
+
+    def series(self, run_id, name, start=0, stop=None):
+        pieces = [values for first, values in self.chunks(run_id, name, start, stop)]
+        if not pieces:
+            return np.empty(0)
+        values = np.concatenate(pieces)
+        offset = start - start % CHUNK_LENGTH
+        return values[start - offset:None if stop is None else stop - offset]
+
+    def mean_series(self, run_ids, name):
+        # Day-by-day mean over runs of different lengths, one chunk in memory at a time
+        total = np.zeros(0)
+        count = np.zeros(0, dtype=np.int64)
+        for run_id in run_ids:
+            for first, values in self.chunks(run_id, name):
+                end = first + len(values)
+                if end > len(total):
+                    total = np.concatenate([total, np.zeros(end - len(total))])
+                    count = np.concatenate([count, np.zeros(end - len(count), dtype=np.int64)])
+                total[first:end] += values
+                count[first:end] += 1
+        return total / np.maximum(count, 1)
@@ -0,0 +1,84 @@
+# Uniform grid over a square world for picking nearby agents.
+# Each cell holds an AgentSet, so adding or removing an agent (a death, a turning)
+# touches one cell, and a draw near a point only looks at the handful of cells
+# overlapping the search radius.
+
+import math
+
+from .agent_index import AgentSet
+
+
+class SpatialGrid(object):
+    def __init__(self, extent, cell_size):
+        if extent <= 0 or cell_size <= 0:
+            raise ValueError(f"extent and cell_size must be positive, got {extent} and {cell_size}.")
+        self.extent = extent
+        self.cell_size = cell_size
+        self.cells_per_side = max(1, math.ceil(extent / cell_size))
+        self.cells = {}
+        self.positions = {}
+
+    def cell_of(self, x, y):
+        last = self.cells_per_side - 1
+        return (min(max(int(x // self.cell_size), 0), last), min(max(int(y // self.cell_size), 0), last))
+
+    def add(self, h, x, y):
+        self.discard(h)
+        cell = self.cell_of(x, y)
+        if cell not in self.cells:
+            self.cells[cell] = AgentSet()
+        self.cells[cell].add(h)
+        self.positions[h] = (x, y)
+
+    def remove(self, h):
+        x, y = self.positions.pop(h)
+        self.cells[self.cell_of(x, y)].remove(h)
+
+    def discard(self, h):
+        if h in self.positions:
+            self.remove(h)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, h):
+        return h in self.positions
+
+    def nearby_cells(self, x, y, radius):
+        reach = math.ceil(radius / self.cell_size)
+        cx, cy = self.cell_of(x, y)
+        cells = []
+        for i in range(max(cx - reach, 0), min(cx + reach, self.cells_per_side - 1) + 1):
+            for j in range(max(cy - reach, 0), min(cy + reach, self.cells_per_side - 1) + 1):
+                cell = self.cells.get((i, j))
+                if cell:
+                    cells.append(cell)
+        return cells
+
+    def within(self, h, x, y, radius):
+        hx, hy = self.positions[h]
+        return (hx - x) ** 2 + (hy - y) ** 2 <= radius * radius
+
+    def choose_near(self, x, y, radius, rng, attempts=8):
+        # Uniform draw among agents within radius of (x, y), or None if there are none.
+        # Cells are picked in proportion to their size, then a member is drawn and
+        # rejected if it's outside the circle; after a few misses the nearby cells
+        # are scanned outright.
+        cells = self.nearby_cells(x, y, radius)
+        if not cells:
+            return None
+        sizes = [len(cell) for cell in cells]
+        total = sum(sizes)
+        for attempt in range(attempts):
+            pick = int(rng.integers(total))
+            for cell, size in zip(cells, sizes):
+                if pick < size:
+                    h = cell[pick]
+                    break
+                pick -= size
+            if self.within(h, x, y, radius):
+                return h
+        candidates = [h for cell in cells for h in cell if self.within(h, x, y, radius)]
+        if not candidates:
+            return None
+        return candidates[int(rng.integers(len(candidates)))]
@@ -0,0 +1,418 @@
+# Pure python / numpy stand-in for dtk_generic_intrahost.
+# Covers the part of the dgi surface the models and tests use, so they can run
+# (and be benchmarked) where the DTK wheels can't be installed. Agent state lives
+# in numpy columns indexed by handle - 1; handles are reused after reset().
+# use_column_store() moves the columns into memory-mapped files for populations
+# that don't fit in RAM.
+# Incubation and infectious periods are read from gi.json in the working
+# directory, the same file the DTK module reads, or set with configure().
+
+import json
+import math
+import os
+
+import numpy as np
+
+from . import column_store
+
+MALE = 0
+FEMALE = 1
+DAYS_YEAR = 365
+MIN_MOTHER_AGE = 14 * DAYS_YEAR
+MAX_MOTHER_AGE = 45 * DAYS_YEAR
+PREGNANCY_DAYS = 280
+TIMESTEP = 1.0
+
+DEFAULT_CONFIG = {
+    "Incubation_Period_Distribution": "CONSTANT_DISTRIBUTION",
+    "Incubation_Period_Constant": 6,
+    "Infectious_Period_Distribution": "CONSTANT_DISTRIBUTION",
+    "Infectious_Period_Constant": 10000,
+    "Base_Infectivity": 1.0
+}
+
+DISTRIBUTIONS = ["CONSTANT_DISTRIBUTION", "GAUSSIAN_DISTRIBUTION",
+                 "UNIFORM_DISTRIBUTION", "EXPONENTIAL_DISTRIBUTION"]
+
+
+COLUMNS = {
+    "age": np.float64, "sex": np.int8, "mcw": np.float64, "infected": bool, "infection_age": np.float64,
+    "incubation_remaining": np.float64, "infectious_remaining": np.float64,
+    "pregnancy_remaining": np.float64, "interventions": np.int32
+}
+
+
+class _Population(object):
+    # Columns are attributes bound to the store's arrays (memory-mapped with a directory)
+    def __init__(self, capacity=1024, directory=None, chunk_size=column_store.DEFAULT_CHUNK_SIZE):
+        self.count = 0
+        self.store = column_store.ColumnStore(COLUMNS, capacity, directory, chunk_size)
+        self.bind()
+
+    def bind(self):
+        for name, column in self.store.columns.items():
+            setattr(self, name, column)
+
+    def columns(self):
+        return list(COLUMNS)
+
+    def unbind(self):
+        # Mapped files can only be resized or removed once nothing maps them
+        for name in COLUMNS:
+            setattr(self, name, None)
+
+    def grow(self, needed=0):
+        self.unbind()
+        self.store.grow(max(self.store.capacity * 2, needed))
+        self.bind()
+
+    def close(self):
+        self.unbind()
+        self.store.close()
+
+    def add(self, sex, age, mcw):
+        if self.count == len(self.age):
+            self.grow()
+        slot = self.count
+        for name in self.columns():
+            getattr(self, name)[slot] = 0
+        self.sex[slot] = sex
+        self.age[slot] = age
+        self.mcw[slot] = mcw
+        self.count += 1
+        return slot + 1
+
+
+# Where new populations keep their columns: None for RAM, or a directory for memory-mapped files
+_storage = {"directory": None, "chunk_size": column_store.DEFAULT_CHUNK_SIZE}
+_population = _Population()
+_config = dict(DEFAULT_CONFIG)
+_rng = np.random.default_rng()
+_callbacks = {}
+
+
+def memory_bytes():
+    return _population.store.nbytes()
+
+
+def use_column_store(directory=None, chunk_size=column_store.DEFAULT_CHUNK_SIZE):
+    # Out-of-core mode: agent state in memory-mapped files under directory, updated chunk_size
+    # agents at a time; None goes back to RAM. Takes effect right away, so call it before creating anyone.
+    if _storage == {"directory": directory, "chunk_size": chunk_size}:
+        return
+    if _population.count:
+        raise ValueError("The column store can only change before any individual is created.")
+    _storage.update(directory=directory, chunk_size=chunk_size)
+    reset()
+
+
+def _slot(individual_id):
+    if not 0 < individual_id <= _population.count:
+        raise ValueError(f"No individual with id {individual_id}.")
+    return individual_id - 1
+
+
+def configure(config=None):
+    # config is a dict of gi.json style parameters, a filename, or None for ./gi.json
+    global _config
+    if config is None:
+        config = "gi.json" if os.path.exists("gi.json") else {}
+    if isinstance(config, str):
+        with open(config) as infile:
+            config = json.load(infile)
+    merged = dict(DEFAULT_CONFIG)
+    merged.update(config)
+    for prefix in ("Incubation_Period", "Infectious_Period"):
+        distribution = merged[f"{prefix}_Distribution"]
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unsupported {prefix}_Distribution {distribution}, expected one of {DISTRIBUTIONS}.")
+    _config = merged
+
+
+def seed(value):
+    global _rng
+    _rng = np.random.default_rng(value)
+
+
+def draw_period(prefix, size=1):
+    distribution = _config[f"{prefix}_Distribution"]
+    if distribution == "CONSTANT_DISTRIBUTION":
+        draws = np.full(size, float(_config[f"{prefix}_Constant"]))
+    elif distribution == "GAUSSIAN_DISTRIBUTION":
+        draws = _rng.normal(_config[f"{prefix}_Gaussian_Mean"], _config[f"{prefix}_Gaussian_Std_Dev"], size=size)
+    elif distribution == "UNIFORM_DISTRIBUTION":
+        draws = _rng.uniform(_config[f"{prefix}_Min"], _config[f"{prefix}_Max"], size=size)
+    else:
+        draws = _rng.exponential(_config[f"{prefix}_Exponential"], size=size)
+    return np.maximum(draws, 0.0)
+
+
+def create(individual_tuple):
+    gender, age, mcw = individual_tuple
+    return _population.add(gender, age, mcw)
+
+
+def reset():
+    global _population
+    _population.close()
+    _population = _Population(directory=_storage["directory"], chunk_size=_storage["chunk_size"])
+
+
+def update(individual_id):
+    update1(individual_id)
+    update2(individual_id)
+
+
+def update1(individual_id):
+    # Aging and pregnancy
+    slot = _slot(individual_id)
+    _population.age[slot] += TIMESTEP
+    if _population.pregnancy_remaining[slot] > 0:
+        _population.pregnancy_remaining[slot] = max(_population.pregnancy_remaining[slot] - TIMESTEP, 0)
+
+
+def update2(individual_id):
+    # Infection progression: incubating, then infectious, then cleared
+    slot = _slot(individual_id)
+    if not _population.infected[slot]:
+        return
+    _population.infection_age[slot] += TIMESTEP
+    if _population.incubation_remaining[slot] > 0:
+        _population.incubation_remaining[slot] -= TIMESTEP
+    else:
+        _population.infectious_remaining[slot] -= TIMESTEP
+        if _population.infectious_remaining[slot] <= 0:
+            _population.infected[slot] = False
+            _population.infection_age[slot] = 0
+
+
+def force_infect(individual_id):
+    slot = _slot(individual_id)
+    if _population.infected[slot]:
+        return
+    _population.infected[slot] = True
+    _population.infection_age[slot] = 0
+    _population.incubation_remaining[slot] = draw_period("Incubation_Period")[0]
+    _population.infectious_remaining[slot] = draw_period("Infectious_Period")[0]
+
+
+def should_infect(contagion_tuple):
+    individual_id, contagion = contagion_tuple
+    slot = _slot(individual_id)
+    if _population.infected[slot]:
+        return False
+    return bool(_rng.random() < 1.0 - math.exp(-contagion * get_immunity(individual_id)))
+
+
+def get_age(individual_id):
+    return float(_population.age[_slot(individual_id)])
+
+
+def get_immunity(individual_id):
+    # Susceptibility multiplier; the stand-in has no acquired immunity
+    _slot(individual_id)
+    return 1.0
+
+
+def get_infection_age(individual_id):
+    return float(_population.infection_age[_slot(individual_id)])
+
+
+def get_infectiousness(individual_id):
+    slot = _slot(individual_id)
+    if _population.infected[slot] and _population.incubation_remaining[slot] <= 0:
+        return float(_config["Base_Infectivity"])
+    return 0.0
+
+
+def is_infected(individual_id):
+    return bool(_population.infected[_slot(individual_id)])
+
+
+def is_incubating(individual_id):
+    slot = _slot(individual_id)
+    return bool(_population.infected[slot] and _population.incubation_remaining[slot] > 0)
+
+
+def is_possible_mother(individual_id):
+    slot = _slot(individual_id)
+    age = _population.age[slot]
+    return bool(_population.sex[slot] == FEMALE and MIN_MOTHER_AGE < age < MAX_MOTHER_AGE)
+
+
+def is_pregnant(individual_id):
+    return bool(_population.pregnancy_remaining[_slot(individual_id)] > 0)
+
+
+def update_pregnancy(individual_id, duration=PREGNANCY_DAYS):
+    # Starts a pregnancy for a possible mother who isn't already pregnant
+    if is_possible_mother(individual_id) and not is_pregnant(individual_id):
+        _population.pregnancy_remaining[_slot(individual_id)] = duration
+        return True
+    return False
+
+
+def give_intervention(intervention_tuple):
+    individual_id, intervention = intervention_tuple
+    _population.interventions[_slot(individual_id)] += 1
+
+
+def serialize(individual_id):
+    slot = _slot(individual_id)
+    individual = {
+        "suid": {"id": individual_id},
+        "m_age": float(_population.age[slot]),
+        "m_gender": int(_population.sex[slot]),
+        "m_mc_weight": float(_population.mcw[slot]),
+        "m_is_infected": bool(_population.infected[slot]),
+        "m_is_pregnant": is_pregnant(individual_id),
+        "pregnancy_timer": float(_population.pregnancy_remaining[slot]),
+        "infections": [],
+        "interventions": {"count": int(_population.interventions[slot])}
+    }
+    if _population.infected[slot]:
+        individual["infections"].append({
+            "infection_age": float(_population.infection_age[slot]),
+            "incubation_timer": float(max(_population.incubation_remaining[slot], 0)),
+            "infectious_timer": float(_population.infectious_remaining[slot])
+        })
+    return json.dumps({"individual": individual})
+
+
+def get_schema():
+    return json.dumps({"config": {name: {"default": value} for name, value in DEFAULT_CONFIG.items()}})
+
+
+def set_param(param_tuple):
+    name, value = param_tuple
+    configure(dict(_config, **{name: value}))
+
+
+def set_enum_param(param_tuple):
+    set_param(param_tuple)
+
+
+# The DTK callbacks are kept so callers can register them, but the stand-in
+# never calls them: it has no natural mortality, shedding or births of its own.
+def my_set_callback(callback):
+    _callbacks["create"] = callback
+
+
+def set_deposit_callback(callback):
+    _callbacks["deposit"] = callback
+
+
+def set_mortality_callback(callback):
+    _callbacks["mortality"] = callback
+
+
+configure()
+
+
+# Batch entry points over numpy arrays of handles, picked up by dgi_batch.
+# Handles in one call must be unique.
+def _slots(individual_ids):
+    slots = np.asarray(individual_ids, dtype=np.int64) - 1
+    if slots.size and (slots.min() < 0 or slots.max() >= _population.count):
+        raise ValueError("Batch contains handles that don't belong to an individual.")
+    return slots
+
+
+def update_many(individual_ids):
+    slots = _slots(individual_ids)
+    if not _population.store.on_disk:
+        _update_slots(slice(None), slots)
+        return
+    # Out of core: one pass over the files in slot order, a chunk at a time, so the
+    # disk sees sequential reads and writes whatever order the handles came in
+    selected = np.zeros(_population.count, dtype=bool)
+    selected[slots] = True
+    for start, stop in _population.store.chunks(_population.count):
+        chunk_slots = np.flatnonzero(selected[start:stop])
+        if chunk_slots.size:
+            _update_slots(slice(start, stop), chunk_slots)
+
+
+def _update_slots(window, slots):
+    # slots index into the window of every column
+    age = _population.age[window]
+    pregnancy_remaining = _population.pregnancy_remaining[window]
+    infected = _population.infected[window]
+    infection_age = _population.infection_age[window]
+    incubation_remaining = _population.incubation_remaining[window]
+    infectious_remaining = _population.infectious_remaining[window]
+    age[slots] += TIMESTEP
+    pregnancy_remaining[slots] = np.maximum(pregnancy_remaining[slots] - TIMESTEP, 0)
+    slots = slots[infected[slots]]
+    if not slots.size:
+        return
+    infection_age[slots] += TIMESTEP
+    incubating = incubation_remaining[slots] > 0
+    incubation_remaining[slots[incubating]] -= TIMESTEP
+    infectious = slots[~incubating]
+    infectious_remaining[infectious] -= TIMESTEP
+    cleared = infectious[infectious_remaining[infectious] <= 0]
+    infected[cleared] = False
+    infection_age[cleared] = 0
+
+
+def create_many(sexes, ages, mcws):
+    count = len(sexes)
+    if _population.count + count > len(_population.age):
+        _population.grow(_population.count + count)
+    slots = np.arange(_population.count, _population.count + count)
+    _population.count += count
+    recreate_many(slots + 1, sexes, ages, mcws)
+    return slots + 1
+
+
+def recreate_many(individual_ids, sexes, ages, mcws):
+    # Reinitializes existing handles as new individuals, so dead agents' slots can be reused
+    slots = _slots(individual_ids)
+    for name in _population.columns():
+        getattr(_population, name)[slots] = 0
+    _population.sex[slots] = sexes
+    _population.age[slots] = ages
+    _population.mcw[slots] = mcws
+
+
+def get_ages(individual_ids):
+    return _population.age[_slots(individual_ids)]
+
+
+def get_sexes(individual_ids):
+    return _population.sex[_slots(individual_ids)]
+
+
+def is_infected_many(individual_ids):
+    return _population.infected[_slots(individual_ids)]
+
+
+def is_incubating_many(individual_ids):
+    slots = _slots(individual_ids)
+    return _population.infected[slots] & (_population.incubation_remaining[slots] > 0)
+
+
+def is_possible_mother_many(individual_ids):
+    slots = _slots(individual_ids)
+    age = _population.age[slots]
+    return (_population.sex[slots] == FEMALE) & (age > MIN_MOTHER_AGE) & (age < MAX_MOTHER_AGE)
+
+
+def get_infectiousness_many(individual_ids):
+    slots = _slots(individual_ids)
+    infectious = _population.infected[slots] & (_population.incubation_remaining[slots] <= 0)
+    return np.where(infectious, float(_config["Base_Infectivity"]), 0.0)
+
+
+def give_intervention_many(individual_ids, intervention):
+    _population.interventions[_slots(individual_ids)] += 1
+
+
+def force_infect_many(individual_ids):
+    slots = _slots(individual_ids)
+    slots = slots[~_population.infected[slots]]
+    _population.infected[slots] = True
+    _population.infection_age[slots] = 0
+    _population.incubation_remaining[slots] = draw_period("Incubation_Period", slots.size)
+    _population.infectious_remaining[slots] = draw_period("Infectious_Period", slots.size)
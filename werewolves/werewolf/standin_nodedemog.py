@@ -0,0 +1,64 @@
+# Pure python stand-in for dtk_nodedemog, paired with standin_intrahost.
+# Builds each node's initial population from the demographics files listed in
+# nd.json and hands every person to the callback as (mcw, age, gender).
+
+import json
+import os
+
+import numpy as np
+
+CONSTANT_DISTRIBUTION = 0
+UNIFORM_DISTRIBUTION = 1
+GAUSSIAN_DISTRIBUTION = 2
+EXPONENTIAL_DISTRIBUTION = 3
+
+_callback = None
+_rng = np.random.default_rng()
+
+
+def set_callback(callback):
+    global _callback
+    _callback = callback
+
+
+def seed(value):
+    global _rng
+    _rng = np.random.default_rng(value)
+
+
+def demographics_filenames(config_filename="nd.json"):
+    if os.path.exists(config_filename):
+        with open(config_filename) as infile:
+            return json.load(infile).get("Demographics_Filenames", ["demographics.json"])
+    return ["demographics.json"]
+
+
+def draw_ages(attributes, count):
+    flag = attributes.get("AgeDistributionFlag", CONSTANT_DISTRIBUTION)
+    first = attributes.get("AgeDistribution1", 0)
+    second = attributes.get("AgeDistribution2", 0)
+    if flag == CONSTANT_DISTRIBUTION:
+        ages = np.full(count, float(first))
+    elif flag == UNIFORM_DISTRIBUTION:
+        ages = _rng.uniform(first, second, size=count)
+    elif flag == GAUSSIAN_DISTRIBUTION:
+        ages = _rng.normal(first, second, size=count)
+    elif flag == EXPONENTIAL_DISTRIBUTION:
+        ages = _rng.exponential(1.0 / first, size=count)
+    else:
+        raise ValueError(f"Unsupported AgeDistributionFlag {flag}.")
+    return np.maximum(ages, 0.0)
+
+
+def populate_from_files(config_filename="nd.json"):
+    if _callback is None:
+        raise RuntimeError("Call set_callback() before populate_from_files().")
+    for filename in demographics_filenames(config_filename):
+        with open(filename) as infile:
+            demographics = json.load(infile)
+        for node in demographics["Nodes"]:
+            count = int(node["NodeAttributes"]["InitialPopulation"])
+            ages = draw_ages(node.get("IndividualAttributes", {}), count)
+            genders = (_rng.random(count) < 0.5).astype(int)
+            for age, gender in zip(ages, genders):
+                _callback(1.0, float(age), int(gender))
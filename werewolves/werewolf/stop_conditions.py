@@ -0,0 +1,127 @@
+# Conditions for ending a run early. Each is checked once per simulated day,
+# so check() has to be cheap: compartment lengths, not scans of the population.
+# check() returns a short reason string when the run should stop, or None.
+
+COMPARTMENTS = ["humans", "waiting_wolves", "werewolves", "graves"]
+EVENTS = ["deaths", "bites", "turnings"]
+
+
+class StopCondition(object):
+    def check(self, demo):
+        raise NotImplementedError
+
+
+class HumanExtinction(StopCondition):
+    def __init__(self, min_humans=1):
+        self.min_humans = min_humans
+
+    def check(self, demo):
+        if len(demo.humans) <= self.min_humans:
+            return "human_extinction"
+        return None
+
+
+class Extinction(StopCondition):
+    # No werewolves, nobody incubating, and nobody will be old enough to be
+    # patient zero next Halloween. Ages are only looked at while there are no
+    # wolves, and at most once per Halloween.
+    def __init__(self):
+        self.recheck_day = 0
+
+    def check(self, demo):
+        if demo.werewolves or demo.waiting_wolves:
+            self.recheck_day = 0
+            return None
+        if demo.time < self.recheck_day:
+            return None
+        days_left = demo.days_until_halloween()
+        if demo.has_patient_zero_candidate(days_left):
+            self.recheck_day = demo.time + days_left + 1
+            return None
+        return "extinction"
+
+
+class AbsorbingState(StopCondition):
+    # No compartment has changed for window_days. Feeding only happens around
+    # the full moon, so the window should be longer than a lunar cycle.
+    def __init__(self, window_days=365):
+        self.window_days = window_days
+        self.last_counts = None
+        self.last_change_day = None
+
+    def check(self, demo):
+        counts = (len(demo.humans), len(demo.waiting_wolves), len(demo.werewolves), len(demo.graves))
+        if counts != self.last_counts:
+            self.last_counts = counts
+            self.last_change_day = demo.time
+            return None
+        if demo.time - self.last_change_day >= self.window_days:
+            return "absorbing_state"
+        return None
+
+
+class CompartmentThreshold(StopCondition):
+    def __init__(self, compartment, threshold, below=False):
+        if compartment not in COMPARTMENTS:
+            raise ValueError(f"Unknown compartment {compartment}, expected one of {COMPARTMENTS}.")
+        self.compartment = compartment
+        self.threshold = threshold
+        self.below = below
+
+    def check(self, demo):
+        count = demo.count_compartment(self.compartment)
+        if self.below and count <= self.threshold:
+            return f"{self.compartment}_below_{self.threshold}"
+        if not self.below and count >= self.threshold:
+            return f"{self.compartment}_reached_{self.threshold}"
+        return None
+
+
+class IncidenceThreshold(StopCondition):
+    # A rolling incidence (deaths, bites or turnings per day over window_days)
+    # crossing a threshold; only checked once the window has filled.
+    def __init__(self, event, window_days, threshold, below=True):
+        if event not in EVENTS:
+            raise ValueError(f"Unknown incidence event {event}, expected one of {EVENTS}.")
+        self.event = event
+        self.window_days = window_days
+        self.threshold = threshold
+        self.below = below
+
+    def check(self, demo):
+        if not demo.incidence.full(self.window_days):
+            return None
+        rate = demo.incidence.rate(self.event, self.window_days)
+        if self.below and rate <= self.threshold:
+            return f"{self.event}_{self.window_days}d_below_{self.threshold}"
+        if not self.below and rate >= self.threshold:
+            return f"{self.event}_{self.window_days}d_reached_{self.threshold}"
+        return None
+
+
+CONDITION_TYPES = {
+    "human_extinction": HumanExtinction,
+    "extinction": Extinction,
+    "absorbing_state": AbsorbingState,
+    "threshold": CompartmentThreshold,
+    "incidence": IncidenceThreshold
+}
+
+
+def default_stop_conditions():
+    return [HumanExtinction(), Extinction()]
+
+
+def build_stop_conditions(condition_list):
+    # condition_list is the "stop_conditions" list from the config file, e.g.
+    # [{"type": "extinction"}, {"type": "threshold", "compartment": "graves", "threshold": 500},
+    #  {"type": "incidence", "event": "deaths", "window_days": 365, "threshold": 0.01}]
+    conditions = []
+    for spec in condition_list:
+        spec = dict(spec)
+        condition_type = spec.pop("type", None)
+        if condition_type not in CONDITION_TYPES:
+            raise ValueError(f"Unknown stop condition type {condition_type}, "
+                             f"expected one of {sorted(CONDITION_TYPES)}.")
+        conditions.append(CONDITION_TYPES[condition_type](**spec))
+    return conditions
@@ -0,0 +1,237 @@
+# Surrogate emulator of WerewolfDemo outputs over a box of parameters. A Latin
+# hypercube of runs trains one Gaussian process per output (squared exponential
+# kernel with a length scale per parameter, plus a noise term for the run to run
+# spread); then each round asks for the candidates the emulator is least sure
+# of, runs them and refits, until the budget is spent. Predictions come with a
+# standard deviation, so a dense response surface costs a few runs per corner
+# that matters instead of a full grid.
+#
+#   result = explore({"feed_death_probability": (0.1, 0.9), "wolf_waiting_period": (5, 60),
+#                     "population": (200, 2000)}, ["final_graves"], initial=20, budget=80)
+#   mean, std = result.emulator.predict([{"feed_death_probability": 0.5, ...}])
+#   werewolf surrogate --bounds feed_death_probability=0.1:0.9 --output final_graves --budget 80
+#
+# "population" is the size of a Gaussian initial population (population, when it
+# is not one of the bounds); every other name is a WerewolfParameters field. Everything is numpy; hyperparameters maximize the
+# log marginal likelihood by random search followed by coordinate steps.
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from . import population as populations
+from . import replicates
+from . import werewolf_params
+
+INTEGER_PARAMETERS = {"wolf_waiting_period", "min_age_werewolf_years", "population"}
+DEFAULT_POPULATION = 1000
+JITTER = 1e-8
+
+_worker = {}
+
+
+def latin_hypercube(n, dimensions, rng):
+    # One point in each of n equal slices of every dimension, slices shuffled per dimension
+    cuts = (np.arange(n)[:, None] + rng.random((n, dimensions))) / n
+    for d in range(dimensions):
+        cuts[:, d] = cuts[rng.permutation(n), d]
+    return cuts
+
+
+class GaussianProcess(object):
+    # Inputs in the unit cube, outputs standardized; theta is log length scales, log signal and noise variance
+    def __init__(self, x, y, theta=None, rng=None):
+        self.x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        self.y_mean = y.mean()
+        self.y_scale = y.std() or 1.0
+        self.y = (y - self.y_mean) / self.y_scale
+        self.theta = theta if theta is not None else self.fit(rng or np.random.default_rng(0))
+        self.factorize()
+
+    def kernel(self, a, b, theta=None):
+        theta = self.theta if theta is None else theta
+        scales = np.exp(theta[:-2])
+        distance = (((a[:, None, :] - b[None, :, :]) / scales) ** 2).sum(axis=-1)
+        return np.exp(theta[-2]) * np.exp(-0.5 * distance)
+
+    def log_likelihood(self, theta):
+        k = self.kernel(self.x, self.x, theta) + (np.exp(theta[-1]) + JITTER) * np.eye(len(self.x))
+        try:
+            chol = np.linalg.cholesky(k)
+        except np.linalg.LinAlgError:
+            return -math.inf
+        alpha = np.linalg.solve(chol.T, np.linalg.solve(chol, self.y))
+        return float(-0.5 * self.y @ alpha - np.log(np.diag(chol)).sum())
+
+    def fit(self, rng, samples=64, sweeps=3):
+        # Log length scales in [log 0.05, log 5], log signal variance in [-2, 2], log noise in [-8, 0]
+        dimensions = self.x.shape[1]
+        low = np.array([math.log(0.05)] * dimensions + [-2.0, -8.0])
+        high = np.array([math.log(5.0)] * dimensions + [2.0, 0.0])
+        candidates = low + latin_hypercube(samples, len(low), rng) * (high - low)
+        best = max(candidates, key=self.log_likelihood)
+        best_value = self.log_likelihood(best)
+        step = (high - low) / 8
+        for sweep in range(sweeps):
+            for i in range(len(best)):
+                for direction in (-1, 1):
+                    trial = best.copy()
+                    trial[i] = np.clip(trial[i] + direction * step[i], low[i], high[i])
+                    value = self.log_likelihood(trial)
+                    if value > best_value:
+                        best, best_value = trial, value
+            step /= 2
+        return best
+
+    def factorize(self):
+        k = self.kernel(self.x, self.x) + (np.exp(self.theta[-1]) + JITTER) * np.eye(len(self.x))
+        self.chol = np.linalg.cholesky(k)
+        self.alpha = np.linalg.solve(self.chol.T, np.linalg.solve(self.chol, self.y))
+
+    def predict(self, x, noise=False):
+        # Mean and standard deviation of the latent function (plus run noise with noise=True)
+        x = np.asarray(x, dtype=float)
+        cross = self.kernel(x, self.x)
+        mean = cross @ self.alpha
+        v = np.linalg.solve(self.chol, cross.T)
+        variance = np.exp(self.theta[-2]) - (v ** 2).sum(axis=0)
+        if noise:
+            variance += np.exp(self.theta[-1])
+        return self.y_mean + self.y_scale * mean, self.y_scale * np.sqrt(np.maximum(variance, 0.0))
+
+    def with_points(self, x):
+        # Kriging believer: the extra inputs get their predicted outputs, so the scaling stays
+        # as it is and only the variance around them shrinks
+        x = np.asarray(x, dtype=float)
+        fantasy = object.__new__(GaussianProcess)
+        fantasy.x = np.vstack([self.x, x])
+        fantasy.y = np.concatenate([self.y, (self.predict(x)[0] - self.y_mean) / self.y_scale])
+        fantasy.y_mean, fantasy.y_scale, fantasy.theta = self.y_mean, self.y_scale, self.theta
+        fantasy.factorize()
+        return fantasy
+
+
+class Emulator(object):
+    def __init__(self, bounds, outputs):
+        self.names = sorted(bounds)
+        self.low = np.array([bounds[name][0] for name in self.names], dtype=float)
+        self.high = np.array([bounds[name][1] for name in self.names], dtype=float)
+        self.outputs = list(outputs)
+        self.x = np.zeros((0, len(self.names)))
+        self.y = np.zeros((0, len(self.outputs)))
+        self.processes = []
+
+    def to_unit(self, points):
+        values = np.array([[point[name] for name in self.names] for point in points], dtype=float)
+        return (values - self.low) / (self.high - self.low)
+
+    def from_unit(self, unit):
+        values = self.low + np.asarray(unit) * (self.high - self.low)
+        return [{name: int(round(value)) if name in INTEGER_PARAMETERS else float(value)
+                 for name, value in zip(self.names, row)} for row in values]
+
+    def add(self, points, values):
+        self.x = np.vstack([self.x, self.to_unit(points)])
+        self.y = np.vstack([self.y, np.asarray(values, dtype=float).reshape(-1, len(self.outputs))])
+
+    def fit(self, rng=None):
+        rng = rng or np.random.default_rng(0)
+        self.processes = [GaussianProcess(self.x, self.y[:, i], rng=rng) for i in range(len(self.outputs))]
+
+    def predict(self, points):
+        # Arrays of points x outputs: mean and standard deviation
+        unit = self.to_unit(points)
+        predictions = [process.predict(unit) for process in self.processes]
+        return (np.column_stack([mean for mean, std in predictions]),
+                np.column_stack([std for mean, std in predictions]))
+
+    def uncertainty(self, unit, processes=None):
+        # Sum over outputs of the latent std relative to that output's spread
+        return sum(process.predict(unit)[1] / process.y_scale for process in processes or self.processes)
+
+    def most_uncertain(self, count, rng, candidates=1000):
+        # Greedy batch: after each pick, the processes treat it as already run, so picks spread out
+        pool = latin_hypercube(candidates, len(self.names), rng)
+        processes = list(self.processes)
+        picked = []
+        for n in range(count):
+            best = int(np.argmax(self.uncertainty(pool, processes)))
+            picked.append(pool[best])
+            processes = [process.with_points(pool[best:best + 1]) for process in processes]
+            pool = np.delete(pool, best, axis=0)
+        return self.from_unit(np.array(picked))
+
+    def to_dict(self):
+        return {"names": self.names, "low": self.low.tolist(), "high": self.high.tolist(),
+                "outputs": self.outputs, "x": self.x.tolist(), "y": self.y.tolist(),
+                "theta": [process.theta.tolist() for process in self.processes]}
+
+    @classmethod
+    def from_dict(cls, values):
+        emulator = cls({name: (low, high) for name, low, high in zip(values["names"], values["low"], values["high"])},
+                       values["outputs"])
+        emulator.x = np.array(values["x"])
+        emulator.y = np.array(values["y"])
+        emulator.processes = [GaussianProcess(emulator.x, emulator.y[:, i], np.array(theta))
+                              for i, theta in enumerate(values["theta"])]
+        return emulator
+
+
+def init_worker(base_parameters, days, outputs, population):
+    _worker.update(base_parameters=base_parameters, days=days, outputs=outputs, population=population,
+                   populations={})
+
+
+def simulate(point, seed):
+    # One run at a design point; returns the outputs in order
+    point = dict(point)
+    size = point.pop("population", _worker["population"])
+    strategy = _worker["populations"].get(size)
+    if strategy is None:
+        people = populations.record_people(populations.GaussianPopulation(size))
+        strategy = _worker["populations"][size] = populations.ReplayPopulation(people)
+    parameters = _worker["base_parameters"]._replace(**point).validate()
+    return replicates.replicate_outputs(parameters, strategy, _worker["days"], _worker["outputs"], seed)
+
+
+class SurrogateResult(object):
+    def __init__(self, emulator, rounds):
+        self.emulator = emulator
+        self.rounds = rounds
+
+    def summary(self):
+        return {"runs": len(self.emulator.x), "rounds": self.rounds, "emulator": self.emulator.to_dict()}
+
+
+def explore(bounds, outputs, base_parameters=None, days=20 * 365, initial=20, budget=100, batch=None,
+            processes=None, seed=None, population=DEFAULT_POPULATION):
+    for output in outputs:
+        replicates.parse_output(output)
+    for name in bounds:
+        if name != "population" and name not in werewolf_params.WerewolfParameters._fields:
+            raise ValueError(f"Unknown parameter {name}.")
+    if base_parameters is None:
+        base_parameters = werewolf_params.load_parameters()
+    base_parameters = base_parameters._replace(enable_reporting=False, debug=False)
+    rng = np.random.default_rng(seed)
+    processes = processes or os.cpu_count() or 1
+    batch = batch or processes
+    emulator = Emulator(bounds, outputs)
+    rounds = []
+    with ProcessPoolExecutor(max_workers=processes, initializer=init_worker,
+                             initargs=(base_parameters, days, list(outputs), population)) as pool:
+        points = emulator.from_unit(latin_hypercube(min(initial, budget), len(emulator.names), rng))
+        while points:
+            seeds = [int(s) for s in rng.integers(2 ** 32, size=len(points))]
+            emulator.add(points, list(pool.map(simulate, points, seeds)))
+            emulator.fit(rng)
+            remaining = budget - len(emulator.x)
+            points = emulator.most_uncertain(min(batch, remaining), rng) if remaining > 0 else []
+            if points:
+                rounds.append({"runs": len(emulator.x),
+                               "max_uncertainty": float(emulator.uncertainty(emulator.to_unit(points[:1]))[0])})
+    return SurrogateResult(emulator, rounds)
+
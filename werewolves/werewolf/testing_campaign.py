@@ -0,0 +1,86 @@
+# "Werewolf test?" campaigns: a diagnostic handed out to a targeted slice of the
+# population on a schedule. Targets are picked with numpy over the compartment
+# (ages looked up in one batch call, coverage drawn without replacement) and the
+# diagnostic is delivered in bulk through dgi.give_intervention. Whether a target
+# is really a werewolf (waiting or turned) is read from the demo's compartments.
+
+import json
+
+import numpy as np
+
+DAYS_YEAR = 365
+COMPARTMENTS = ["humans", "werewolves"]
+
+
+class TestingCampaign(object):
+    def __init__(self, coverage=0.01, compartment="humans", min_age_years=None, max_age_years=None,
+                 sensitivity=1.0, specificity=1.0, start_day=0, end_day=None, interval_days=1):
+        if compartment not in COMPARTMENTS:
+            raise ValueError(f"Unknown compartment {compartment}, expected one of {COMPARTMENTS}.")
+        for name, value in (("coverage", coverage), ("sensitivity", sensitivity), ("specificity", specificity)):
+            if not 0.0 <= value <= 1.0:
+                raise ValueError(f"{name} must be between 0 and 1, got {value}.")
+        if interval_days < 1:
+            raise ValueError(f"interval_days must be at least 1, got {interval_days}.")
+        self.coverage = coverage
+        self.compartment = compartment
+        self.min_age_years = min_age_years
+        self.max_age_years = max_age_years
+        self.sensitivity = sensitivity
+        self.specificity = specificity
+        self.start_day = start_day
+        self.end_day = end_day
+        self.interval_days = interval_days
+        self.intervention = json.dumps({
+            "class": "SimpleDiagnostic",
+            "Base_Sensitivity": sensitivity,
+            "Base_Specificity": specificity,
+            "Treatment_Fraction": 1.0
+        })
+
+    def is_active(self, day):
+        if day < self.start_day or (self.end_day is not None and day > self.end_day):
+            return False
+        return (day - self.start_day) % self.interval_days == 0
+
+    def select_targets(self, candidates, batch, rng):
+        if self.min_age_years is None and self.max_age_years is None:
+            # No age band: pick positions first and only convert the picked handles
+            count = rng.binomial(len(candidates), self.coverage)
+            picks = rng.choice(len(candidates), size=count, replace=False)
+            return np.fromiter((candidates[i] for i in picks.tolist()), dtype=np.int64, count=count)
+        candidates = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        if candidates.size:
+            ages = batch.get_ages(candidates)
+            in_band = np.ones(candidates.size, dtype=bool)
+            if self.min_age_years is not None:
+                in_band &= ages >= self.min_age_years * DAYS_YEAR
+            if self.max_age_years is not None:
+                in_band &= ages < self.max_age_years * DAYS_YEAR
+            candidates = candidates[in_band]
+        count = rng.binomial(candidates.size, self.coverage)
+        return candidates[rng.choice(candidates.size, size=count, replace=False)]
+
+    def distribute(self, demo, batch):
+        # Returns the handles tested today and the ones that tested positive
+        targets = self.select_targets(getattr(demo, self.compartment), batch, demo.rng)
+        if not targets.size:
+            return targets, targets
+        batch.give_intervention_many(targets, self.intervention)
+        infected = lycanthrope_mask(demo, targets)
+        draws = demo.rng.random(targets.size)
+        positive = np.where(infected, draws < self.sensitivity, draws >= self.specificity)
+        return targets, targets[positive]
+
+
+def lycanthrope_mask(demo, targets):
+    # The truth comes from the compartments, not from dgi: queue incubation and Halloween
+    # spawns make wolves that were never infected in the intrahost module
+    return np.fromiter((h in demo.waiting_wolves or h in demo.werewolves for h in targets.tolist()),
+                       dtype=bool, count=targets.size)
+
+
+def build_campaigns(campaign_list):
+    # campaign_list is the "testing_campaigns" list from the config file, e.g.
+    # [{"coverage": 0.05, "min_age_years": 16, "interval_days": 7}]
+    return [TestingCampaign(**spec) for spec in campaign_list]
@@ -0,0 +1,188 @@
+# Parsed, validated and immutable model parameters.
+# WerewolfParameters is a NamedTuple, so it is hashable (usable as a results
+# cache key) and pickles cheaply for worker processes. load_parameters() parses
+# each config file once and caches it by path and modification time.
+
+import json
+import os
+from typing import NamedTuple, Optional, Tuple
+
+INCUBATIONS = ["intrahost", "queue"]
+REPORT_ENCODINGS = ["dense", "delta"]
+
+
+class WerewolfParameters(NamedTuple):
+    feed_death_probability: float
+    enable_reporting: bool = False
+    debug: bool = False
+    wolf_waiting_period: Optional[int] = None
+    # "intrahost" incubates in the intrahost module (gi.json); "queue" waits
+    # exactly wolf_waiting_period days
+    incubation: str = "intrahost"
+    min_age_werewolf_years: int = 16
+    # Vital dynamics: conception is a daily probability per possible mother, natural
+    # mortality a yearly hazard at age 40 that doubles every mortality_doubling_years
+    enable_vital_dynamics: bool = False
+    daily_conception_probability: float = 0.0
+    annual_mortality_rate: float = 0.0
+    mortality_doubling_years: float = 8.0
+    # Hunters: the fraction of the initial humans who hunt, and each hunter's chance
+    # of killing a werewolf on a full moon night
+    hunter_fraction: float = 0.0
+    hunter_kill_probability: float = 0.0
+    # Spatial mode: agents live in a spatial_extent x spatial_extent square and
+    # wolves feed within feeding_radius of home. None keeps the well-mixed model.
+    spatial_extent: Optional[float] = None
+    feeding_radius: float = 1.0
+    # Feeding rule: feeds per full moon night are round(werewolves * feeds_per_werewolf),
+    # and at least one while any werewolf is left
+    feeds_per_werewolf: float = 0.5
+    # Weighted sampling: each person is kept as an agent with probability sampling_rate
+    # and the agent stands for mcw / sampling_rate people. With adaptive_weights, each
+    # bite splits its victim off into an agent of their own while fewer than
+    # rare_fraction of the people are infected, and light werewolves are merged back
+    # by Russian roulette once the outbreak is common.
+    sampling_rate: float = 1.0
+    adaptive_weights: bool = False
+    rare_fraction: float = 0.01
+    # Memory accounting: sample structure sizes (and the memory_top_allocations
+    # biggest allocating lines, 0 to skip tracemalloc) every memory_interval_days.
+    # None leaves it off.
+    memory_interval_days: Optional[int] = None
+    memory_top_allocations: int = 10
+    # Age structure: with age_band_years set, the report carries per-day counts of each
+    # compartment in age_band_count bands of that width (the last one open-ended)
+    age_band_years: Optional[int] = None
+    age_band_count: int = 10
+    # Rolling incidence of deaths, bites and turnings over these windows (days), for
+    # stop conditions; report_incidence adds each window's total to the report every day
+    incidence_windows: Tuple[int, ...] = (7, 28, 365)
+    report_incidence: bool = False
+    # Report cadence and size: a row every report_interval_days days, and with
+    # report_changes_only only when some series moved (the last day is always kept).
+    # "delta" stores each series as delta/run-length runs; report_encoding.decode_report()
+    # expands it back into daily lists.
+    report_interval_days: int = 1
+    report_changes_only: bool = False
+    report_encoding: str = "dense"
+    # Out of core: with column_directory set, per-agent intrahost state lives in memory-mapped
+    # files there and the daily update streams through them column_chunk_size agents at a time
+    column_directory: Optional[str] = None
+    column_chunk_size: int = 1 << 20
+    # Each stop condition and testing campaign is a tuple of sorted (key, value)
+    # pairs so the whole object stays hashable
+    stop_conditions: Optional[Tuple[Tuple[Tuple[str, object], ...], ...]] = None
+    testing_campaigns: Tuple[Tuple[Tuple[str, object], ...], ...] = ()
+
+    @classmethod
+    def convert(cls, parameters):
+        # Raw config values to field values: flags become bools and lists become tuples
+        unknown = set(parameters) - set(cls._fields)
+        if unknown:
+            raise ValueError(f"Unknown parameters: {sorted(unknown)}.")
+        values = dict(parameters)
+        for flag in ('enable_reporting', 'debug', 'enable_vital_dynamics', 'adaptive_weights', 'report_incidence',
+                     'report_changes_only'):
+            if flag in values:
+                values[flag] = bool(values[flag])
+        if 'incidence_windows' in values:
+            values['incidence_windows'] = tuple(values['incidence_windows'])
+        for spec_list in ('stop_conditions', 'testing_campaigns'):
+            if values.get(spec_list) is not None:
+                values[spec_list] = tuple(tuple(sorted(spec.items())) for spec in values[spec_list])
+        return values
+
+    @classmethod
+    def from_dict(cls, parameters):
+        values = cls.convert(parameters)
+        if 'feed_death_probability' not in values:
+            raise ValueError("Missing required parameter feed_death_probability.")
+        return cls(**values).validate()
+
+    def validate(self):
+        if not 0.0 <= self.feed_death_probability <= 1.0:
+            raise ValueError(f"feed_death_probability must be between 0 and 1, "
+                             f"got {self.feed_death_probability}.")
+        if self.wolf_waiting_period is not None and self.wolf_waiting_period < 1:
+            raise ValueError(f"wolf_waiting_period must be at least 1 day, got {self.wolf_waiting_period}.")
+        if self.incubation not in INCUBATIONS:
+            raise ValueError(f"Unknown incubation {self.incubation}, expected one of {INCUBATIONS}.")
+        if self.incubation == "queue" and self.wolf_waiting_period is None:
+            raise ValueError("Queue incubation needs wolf_waiting_period.")
+        if self.min_age_werewolf_years < 0:
+            raise ValueError(f"min_age_werewolf_years can't be negative, got {self.min_age_werewolf_years}.")
+        if not 0.0 <= self.daily_conception_probability <= 1.0:
+            raise ValueError(f"daily_conception_probability must be between 0 and 1, "
+                             f"got {self.daily_conception_probability}.")
+        for name in ('hunter_fraction', 'hunter_kill_probability'):
+            if not 0.0 <= getattr(self, name) <= 1.0:
+                raise ValueError(f"{name} must be between 0 and 1, got {getattr(self, name)}.")
+        if self.spatial_extent is not None and self.spatial_extent <= 0:
+            raise ValueError(f"spatial_extent must be positive, got {self.spatial_extent}.")
+        if self.feeding_radius <= 0:
+            raise ValueError(f"feeding_radius must be positive, got {self.feeding_radius}.")
+        if self.feeds_per_werewolf < 0:
+            raise ValueError(f"feeds_per_werewolf can't be negative, got {self.feeds_per_werewolf}.")
+        if not 0.0 < self.sampling_rate <= 1.0:
+            raise ValueError(f"sampling_rate must be above 0 and at most 1, got {self.sampling_rate}.")
+        if not 0.0 <= self.rare_fraction <= 1.0:
+            raise ValueError(f"rare_fraction must be between 0 and 1, got {self.rare_fraction}.")
+        if self.memory_interval_days is not None and self.memory_interval_days < 1:
+            raise ValueError(f"memory_interval_days must be at least 1, got {self.memory_interval_days}.")
+        if not self.incidence_windows or min(self.incidence_windows) < 1:
+            raise ValueError(f"incidence_windows must be one or more windows of at least a day, "
+                             f"got {self.incidence_windows}.")
+        if self.report_interval_days < 1:
+            raise ValueError(f"report_interval_days must be at least 1, got {self.report_interval_days}.")
+        if self.report_encoding not in REPORT_ENCODINGS:
+            raise ValueError(f"Unknown report_encoding {self.report_encoding}, expected one of {REPORT_ENCODINGS}.")
+        if self.age_band_years is not None and self.age_band_years <= 0:
+            raise ValueError(f"age_band_years must be positive, got {self.age_band_years}.")
+        if self.age_band_count < 1:
+            raise ValueError(f"age_band_count must be at least 1, got {self.age_band_count}.")
+        if self.column_chunk_size < 1:
+            raise ValueError(f"column_chunk_size must be at least 1, got {self.column_chunk_size}.")
+        if self.annual_mortality_rate < 0:
+            raise ValueError(f"annual_mortality_rate can't be negative, got {self.annual_mortality_rate}.")
+        if self.mortality_doubling_years <= 0:
+            raise ValueError(f"mortality_doubling_years must be positive, got {self.mortality_doubling_years}.")
+        for spec in self.testing_campaign_specs():
+            for name in ('coverage', 'sensitivity', 'specificity'):
+                if name in spec and not 0.0 <= spec[name] <= 1.0:
+                    raise ValueError(f"Testing campaign {name} must be between 0 and 1, got {spec[name]}.")
+        return self
+
+    def override(self, **overrides):
+        # Keyword arguments left as None keep the value from the config file
+        changes = {key: value for key, value in overrides.items() if value is not None}
+        if not changes:
+            return self
+        return self._replace(**changes).validate()
+
+    def stop_condition_specs(self):
+        if self.stop_conditions is None:
+            return None
+        return [dict(spec) for spec in self.stop_conditions]
+
+    def testing_campaign_specs(self):
+        return [dict(spec) for spec in self.testing_campaigns]
+
+
+_parameter_cache = {}
+
+
+def load_parameters(config_filename="werewolf_config.json", overrides=None):
+    # overrides is a dict of raw config values applied on top of the file's, e.g. from the
+    # command line; the file itself still comes from the cache
+    path = os.path.abspath(config_filename)
+    mtime = os.stat(path).st_mtime_ns
+    cached = _parameter_cache.get(path)
+    if cached and cached[0] == mtime:
+        parameters = cached[1]
+    else:
+        with open(path) as infile:
+            parameters = WerewolfParameters.from_dict(json.load(infile)['parameters'])
+        _parameter_cache[path] = (mtime, parameters)
+    if overrides:
+        return parameters._replace(**WerewolfParameters.convert(overrides)).validate()
+    return parameters